@@ -0,0 +1,107 @@
+import io
+import subprocess
+from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+from kslingo.audio.assets import silence
+from kslingo.audio.encoder import FLUSH_BYTES
+
+
+class PcmAssembler:
+    """
+    Assembles a track from decoded clips in one fixed sample format.
+
+    Every clip is converted once to raw PCM (frame_rate / channels / sample_width)
+    and appended to a growable buffer, so appending is amortized O(1) instead of
+    copying the whole accumulated track on every phrase like `AudioSegment +=`.
+    Silence blocks come from the shared asset registry.
+
+    With a `sink` (e.g. a StreamEncoder), the buffer is handed to the sink
+    whenever it holds FLUSH_BYTES, so only that much of the track is in
+    memory; call flush() at the end.
+    """
+
+    def __init__(self, frame_rate: int = 44100, channels: int = 2, sample_width: int = 2, sink=None):
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_width = channels * sample_width
+        self.buffer = bytearray()
+        self.sink = sink
+        self.flushed = 0
+
+    def to_pcm(self, segment: AudioSegment) -> bytes:
+        """
+        Converts an AudioSegment to raw PCM in the assembler sample format.
+        """
+        segment = segment.set_sample_width(self.sample_width)
+        segment = segment.set_channels(self.channels)
+        segment = segment.set_frame_rate(self.frame_rate)
+        return segment.raw_data
+
+    def decode(self, data: bytes, format: str) -> bytes:
+        """
+        Decodes an in-memory clip once into raw PCM in the assembler sample format.
+
+        WAV is parsed in-process. Other formats are piped through a single ffmpeg
+        call that decodes and resamples straight to raw PCM, without temp files
+        or the extra ffprobe run pydub does for file-like input.
+        """
+        if format == "wav":
+            return self.to_pcm(AudioSegment.from_file(io.BytesIO(data), format="wav"))
+
+        command = [
+            AudioSegment.converter, "-hide_banner", "-loglevel", "error",
+            "-f", format, "-i", "pipe:0",
+            "-vn", "-f", f"s{self.sample_width * 8}le",
+            "-ac", str(self.channels), "-ar", str(self.frame_rate),
+            "pipe:1",
+        ]
+        result = subprocess.run(command, input=data, capture_output=True)
+        if result.returncode != 0 or not result.stdout:
+            raise CouldntDecodeError(
+                f"Decoding failed. ffmpeg returned error code: {result.returncode}\n\n"
+                f"{result.stderr.decode(errors='ignore')}"
+            )
+
+        # keep whole frames only
+        pcm = result.stdout
+        return pcm[:len(pcm) - len(pcm) % self.frame_width]
+
+    def silence(self, duration_ms: int) -> bytes:
+        """
+        Returns a (memoized) block of silence of the given duration.
+        """
+        return silence(duration_ms, self.frame_rate, self.channels, self.sample_width)
+
+    def append(self, pcm: bytes) -> None:
+        self.buffer += pcm
+        if self.sink is not None and len(self.buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def append_silence(self, duration_ms: int) -> None:
+        self.append(self.silence(duration_ms))
+
+    def flush(self) -> None:
+        """
+        Hands the buffered PCM to the sink.
+        """
+        if self.buffer:
+            self.sink.write(self.buffer)
+            self.flushed += len(self.buffer)
+            self.buffer = bytearray()
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.flushed + len(self.buffer)) / self.frame_width / self.frame_rate * 1000
+
+    def to_segment(self) -> AudioSegment:
+        # Wraps the buffer without copying it (the whole track only without a sink)
+        return AudioSegment(
+            data=self.buffer,
+            sample_width=self.sample_width,
+            frame_rate=self.frame_rate,
+            channels=self.channels,
+        )
+
+    def export(self, out_file: str, format: str = "mp3") -> None:
+        self.to_segment().export(out_file, format=format)
@@ -0,0 +1,86 @@
+import json
+import os
+from functools import lru_cache
+from kslingo.utils.fs import get_resource_path
+
+
+# Gap lengths are in milliseconds.
+#   lead_in           silence at the start of every track
+#   gap               silence after every spoken clip
+#   after_end_sound   silence after the end sound of a pair
+TIMING_PROFILES = {
+    "default": {
+        "lead_in": 1000,
+        "gap": 800,
+        "after_end_sound": 1200,
+        "end_sound": "assets/end_sound.wav",
+        "end_sound_gain": -10,
+    },
+    "fast": {
+        "lead_in": 500,
+        "gap": 500,
+        "after_end_sound": 800,
+        "end_sound": "assets/end_sound.wav",
+        "end_sound_gain": -10,
+    },
+    "slow": {
+        "lead_in": 1500,
+        "gap": 1500,
+        "after_end_sound": 2000,
+        "end_sound": "assets/end_sound.wav",
+        "end_sound_gain": -10,
+    },
+}
+
+
+def get_timing_profile(name: str = "default", end_sound: str | None = None) -> dict:
+    """
+    Returns a timing profile by name, or loaded from a JSON file path.
+    Keys missing from a JSON profile fall back to the default profile.
+
+    Args:
+        name (str): Profile name (see TIMING_PROFILES) or path to a .json file.
+        end_sound (str | None): Optional end sound file overriding the profile.
+
+    Raises:
+        ValueError: If the profile name is unknown.
+    """
+    profile = dict(TIMING_PROFILES["default"])
+
+    if name in TIMING_PROFILES:
+        profile.update(TIMING_PROFILES[name])
+    elif name.lower().endswith(".json") and os.path.isfile(name):
+        with open(name, encoding="utf-8") as f:
+            profile.update(json.load(f))
+    else:
+        raise ValueError(f"Unknown timing profile '{name}'. Choose one of: {', '.join(TIMING_PROFILES)} or a .json file")
+
+    if end_sound:
+        profile["end_sound"] = end_sound
+    return profile
+
+
+@lru_cache(maxsize=None)
+def load_end_sound(path: str, gain_db: float, frame_rate: int, channels: int, sample_width: int) -> bytes:
+    """
+    Loads, gain-adjusts and converts the end sound to raw PCM, once per process
+    for every (file, gain, sample format) combination.
+    """
+    from pydub import AudioSegment
+
+    if not os.path.isabs(path) and not os.path.isfile(path):
+        path = get_resource_path(path)
+    segment = AudioSegment.from_file(path).apply_gain(gain_db)
+    segment = segment.set_sample_width(sample_width)
+    segment = segment.set_channels(channels)
+    segment = segment.set_frame_rate(frame_rate)
+    return segment.raw_data
+
+
+@lru_cache(maxsize=None)
+def silence(duration_ms: int, frame_rate: int, channels: int, sample_width: int) -> bytes:
+    """
+    Returns a block of silence as raw PCM, memoized per duration and sample format.
+    """
+    frames = int(frame_rate * duration_ms / 1000.0)
+    return bytes(frames * channels * sample_width)
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import unicodedata
+from kslingo.utils.fs import ensure_dir, get_cache_dir
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024   # 2 GiB
+DEFAULT_MAX_AGE_DAYS = 180
+
+
+def normalize_clip_text(text: str) -> str:
+    """
+    Normalizes phrase text before synthesis and cache lookup, so that
+    whitespace or unicode composition differences don't produce new clips.
+
+    Args:
+        text (str): Raw phrase text.
+
+    Returns:
+        str: NFC-normalized text with collapsed whitespace.
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def clip_key(engine: str, lang: str, text: str, params: dict | None = None) -> str:
+    """
+    Builds a content-addressed cache key for one synthesized clip.
+
+    Args:
+        engine (str): TTS engine name (e.g. 'gtts').
+        lang (str): Language code passed to the engine.
+        text (str): Phrase text (normalized by this function).
+        params (dict | None): Extra voice parameters that change the audio.
+
+    Returns:
+        str: Hex sha256 digest.
+    """
+    payload = json.dumps(
+        [engine, lang, normalize_clip_text(text), params or {}],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ClipCache:
+    """
+    Persistent on-disk cache of synthesized clips.
+
+    Entries are stored as <cache_dir>/<key[:2]>/<key>.<ext>. The file mtime is
+    refreshed on every hit, so pruning by size evicts least recently used clips.
+    """
+
+    def __init__(self, cache_dir: str | None = None,
+                 max_bytes: int | None = DEFAULT_MAX_BYTES,
+                 max_age_days: float | None = DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir or get_cache_dir("clips")
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        ensure_dir(self.cache_dir)
+
+    def __getstate__(self):
+        # Locks can't be pickled; worker processes get their own
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, ext: str = "mp3") -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{ext}")
+
+    def get(self, key: str, ext: str = "mp3") -> bytes | None:
+        """
+        Returns the cached clip bytes, or None on a miss.
+        """
+        path = self.path_for(key, ext)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes, ext: str = "mp3") -> None:
+        """
+        Stores freshly synthesized clip bytes in the cache.
+        The write is atomic, so concurrent writers never expose a partial file.
+        """
+        path = self.path_for(key, ext)
+        ensure_dir(os.path.dirname(path))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def stats(self) -> dict:
+        """
+        Returns cache statistics: entry count, total size, age range and
+        the hit/miss counters of this instance.
+        """
+        entries = self._entries()
+        mtimes = [m for _, _, m in entries]
+        return {
+            "cache_dir": self.cache_dir,
+            "entries": len(entries),
+            "bytes": sum(s for _, s, _ in entries),
+            "oldest": min(mtimes) if mtimes else None,
+            "newest": max(mtimes) if mtimes else None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def prune(self, max_bytes: int | None = None, max_age_days: float | None = None) -> int:
+        """
+        Evicts clips older than max_age_days, then least recently used clips
+        until the cache is below max_bytes. Falls back to the instance limits.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+
+        entries = sorted(self._entries(), key=lambda e: e[2])  # oldest first
+        removed = 0
+        kept = []
+
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+            for entry in entries:
+                if entry[2] < cutoff:
+                    removed += self._remove(entry[0])
+                else:
+                    kept.append(entry)
+        else:
+            kept = entries
+
+        if max_bytes is not None:
+            total = sum(s for _, s, _ in kept)
+            for path, size, _ in kept:
+                if total <= max_bytes:
+                    break
+                removed += self._remove(path)
+                total -= size
+
+        return removed
+
+    def clear(self) -> int:
+        """
+        Removes every cached clip.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        count = len(self._entries())
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        ensure_dir(self.cache_dir)
+        return count
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
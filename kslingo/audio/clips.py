@@ -0,0 +1,168 @@
+import threading
+from collections import OrderedDict
+from kslingo.audio.assembler import PcmAssembler
+from kslingo.audio.cache import clip_key, normalize_clip_text
+from kslingo.audio.pool import get_rate_limiter, retry_with_backoff, run_ordered
+from kslingo.utils.profiling import count, span
+
+
+DEFAULT_PCM_BUDGET = 256 * 1024 * 1024   # decoded clips kept in memory (bytes)
+
+
+def synthesize_clips(requests, engine, cache=None, jobs=1):
+    """
+    Synthesizes a list of clips in memory, going through the clip cache if given.
+
+    Cache misses are sent to the engine in batches when the engine supports it,
+    otherwise one request per clip, on up to `jobs` concurrent workers.
+
+    Args:
+        requests (list): (text, lang) tuples.
+        engine (TTSEngine): TTS engine.
+        cache (ClipCache | None): Optional persistent clip cache.
+        jobs (int): Number of concurrent TTS requests.
+
+    Returns:
+        list[bytes]: Encoded clips (engine.format) in the order of requests.
+    """
+    params = {}   # lang -> engine.params(lang)
+    clips = [None] * len(requests)
+    misses = []
+
+    for idx, (text, lang) in enumerate(requests):
+        text = normalize_clip_text(text)
+        if cache is not None and lang not in params:
+            params[lang] = engine.params(lang)
+        key = clip_key(engine.name, lang, text, params[lang]) if cache is not None else None
+        cached = cache.get(key, engine.format) if cache is not None else None
+        if cached:
+            clips[idx] = cached
+        else:
+            misses.append((idx, text, lang, key))
+
+    if cache is not None:
+        count("clips.cache_hits", len(requests) - len(misses))
+        count("clips.cache_misses", len(misses))
+
+    size = max(1, engine.batch_size)
+    batches = [misses[i:i + size] for i in range(0, len(misses), size)]
+    limiter = get_rate_limiter(engine.name)
+    retry_errors = engine.retry_errors()
+
+    def run_batch(batch):
+        # Every request goes through the engine rate limiter and is retried on transient failures
+        def request():
+            limiter.acquire()
+            if len(batch) == 1:
+                return [engine.synthesize(batch[0][1], batch[0][2])]
+            return engine.synthesize_batch([(text, lang) for _, text, lang, _ in batch])
+
+        return retry_with_backoff(request, exceptions=retry_errors)
+
+    with span("tts.synthesize", engine=engine.name, clips=len(misses)):
+        for batch, results in zip(batches, run_ordered(run_batch, batches, jobs)):
+            for (idx, _text, _lang, key), data in zip(batch, results):
+                clips[idx] = data
+                if cache is not None:
+                    cache.put(key, data, engine.format)
+    count("clips.synthesized", len(misses))
+
+    return clips
+
+
+class ClipTable:
+    """
+    In-run interning of clips: one synthesis and one decode per unique (lang, text).
+
+    Encoded clips (small mp3/wav bytes) are kept for the whole run. Decoded PCM
+    is much larger, so it's kept in an LRU bounded by `pcm_budget` bytes.
+    All returned data is shared and must be treated as read-only.
+    A table can be shared by threads (concurrent jobs in `kslingo serve`).
+    """
+
+    def __init__(self, engine, cache=None, jobs: int = 1,
+                 decoder: PcmAssembler | None = None, pcm_budget: int = DEFAULT_PCM_BUDGET):
+        self.engine = engine
+        self.cache = cache
+        self.jobs = jobs
+        self.decoder = decoder or PcmAssembler()
+        self.pcm_budget = pcm_budget
+        self._encoded = {}
+        self._pcm = OrderedDict()
+        self._pcm_bytes = 0
+        self.uses = 0
+        self.decodes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, lang: str) -> tuple[str, str]:
+        return lang, normalize_clip_text(text)
+
+    def prefetch(self, items: list[tuple[str, str]]) -> None:
+        """
+        Synthesizes every (text, lang) item not seen yet in this run.
+        Duplicates within `items` are requested only once.
+        """
+        missing = []
+        seen = set()
+        for text, lang in items:
+            key = self.key(text, lang)
+            if key not in self._encoded and key not in seen:
+                seen.add(key)
+                missing.append(key)
+
+        if not missing:
+            return
+
+        clips = synthesize_clips([(text, lang) for lang, text in missing], self.engine, self.cache, self.jobs)
+        with self._lock:
+            self._encoded.update(zip(missing, clips))
+
+    def encoded(self, text: str, lang: str) -> bytes:
+        """
+        Returns the encoded clip (engine.format), synthesizing it if needed.
+        """
+        key = self.key(text, lang)
+        if key not in self._encoded:
+            self.prefetch([(text, lang)])
+        return self._encoded[key]
+
+    def pcm(self, text: str, lang: str) -> bytes:
+        """
+        Returns the decoded clip in the decoder sample format.
+        """
+        key = self.key(text, lang)
+        with self._lock:
+            self.uses += 1
+            pcm = self._pcm.get(key)
+            if pcm is not None:
+                self._pcm.move_to_end(key)
+                return pcm
+
+        data = self.encoded(text, lang)
+        with span("decode", format=self.engine.format):
+            pcm = self.decoder.decode(data, self.engine.format)
+        count("clips.decoded")
+
+        with self._lock:
+            self.decodes += 1
+            if key not in self._pcm:
+                self._pcm[key] = pcm
+                self._pcm_bytes += len(pcm)
+            while self._pcm_bytes > self.pcm_budget and len(self._pcm) > 1:
+                _, old = self._pcm.popitem(last=False)
+                self._pcm_bytes -= len(old)
+        return pcm
+
+    def stats(self) -> dict:
+        """
+        Returns dedup statistics: clip uses, unique clips, decodes and the
+        dedup ratio (uses per unique clip).
+        """
+        unique = len(self._encoded)
+        return {
+            "uses": self.uses,
+            "unique": unique,
+            "decodes": self.decodes,
+            "dedup_ratio": self.uses / unique if unique else 0.0,
+        }
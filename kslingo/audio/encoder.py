@@ -0,0 +1,182 @@
+import os
+import subprocess
+import tempfile
+
+
+# codec -> (ffmpeg encoder, muxer, file extension)
+CODECS = {
+    "mp3": ("libmp3lame", "mp3", ".mp3"),
+    "opus": ("libopus", "ogg", ".opus"),
+    "aac": ("aac", "ipod", ".m4a"),
+}
+
+DEFAULT_ENCODING = {"codec": "mp3", "bitrate": None, "vbr": None, "channels": None, "sample_rate": None}
+
+# bytes of PCM buffered before a write to the encoder pipe
+FLUSH_BYTES = 256 * 1024
+
+
+def get_encoding(codec: str = "mp3", bitrate: str | None = None, vbr: int | None = None,
+                 channels: int | None = None, sample_rate: int | None = None) -> dict:
+    """
+    Returns validated encoder settings for section audio.
+
+    Args:
+        codec (str): Output codec (see CODECS).
+        bitrate (str | None): Bitrate, e.g. "96k" (constant for mp3, the
+            target of libopus' VBR for opus); None keeps ffmpeg's default.
+        vbr (int | None): mp3 only: LAME VBR quality, 0 (best) to 9 (smallest).
+        channels (int | None): 1 downmixes to mono; None keeps the clips' channels.
+        sample_rate (int | None): Output sample rate in Hz; None keeps the clips' rate.
+
+    Raises:
+        ValueError: If a setting is invalid.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}'. Choose one of: {', '.join(CODECS)}")
+    if bitrate is not None and not (bitrate[:-1] if bitrate[-1:] in "kK" else bitrate).isdigit():
+        raise ValueError(f"Invalid bitrate '{bitrate}', expected e.g. 96k or 96000")
+    if vbr is not None:
+        if codec != "mp3":
+            raise ValueError(f"VBR quality levels are only supported for mp3 ({codec}: use a bitrate)")
+        if not 0 <= vbr <= 9:
+            raise ValueError(f"Invalid VBR quality {vbr}, expected 0 (best) to 9 (smallest)")
+        if bitrate is not None:
+            raise ValueError("Use either a bitrate or a VBR quality, not both")
+    if channels is not None and channels not in (1, 2):
+        raise ValueError(f"Invalid channel count {channels}, expected 1 or 2")
+    if sample_rate is not None and not 8000 <= sample_rate <= 192000:
+        raise ValueError(f"Invalid sample rate {sample_rate}")
+    if codec == "opus" and sample_rate is not None and sample_rate not in (8000, 12000, 16000, 24000, 48000):
+        raise ValueError(f"Opus doesn't support a sample rate of {sample_rate} Hz (8000, 12000, 16000, 24000 or 48000)")
+
+    return {"codec": codec, "bitrate": bitrate and bitrate.lower(), "vbr": vbr, "channels": channels,
+            "sample_rate": sample_rate}
+
+
+def encoding_ext(encoding: dict | None) -> str:
+    """
+    Returns the file extension of encoded output (e.g. ".mp3").
+    """
+    return CODECS[(encoding or DEFAULT_ENCODING)["codec"]][2]
+
+
+def encoder_command(out_file: str, encoding: dict, frame_rate: int, channels: int, sample_width: int) -> list[str]:
+    """
+    Returns the ffmpeg command encoding raw PCM from stdin into `out_file`.
+    """
+    from pydub import AudioSegment
+
+    encoder, muxer, _ = CODECS[encoding["codec"]]
+    command = [
+        AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-y",
+        "-f", f"s{sample_width * 8}le", "-ar", str(frame_rate), "-ac", str(channels), "-i", "pipe:0",
+        "-c:a", encoder,
+    ]
+    if encoding["bitrate"]:
+        command += ["-b:a", encoding["bitrate"]]
+    if encoding["vbr"] is not None:
+        command += ["-q:a", str(encoding["vbr"])]
+    if encoding["channels"]:
+        command += ["-ac", str(encoding["channels"])]
+    if encoding["sample_rate"]:
+        command += ["-ar", str(encoding["sample_rate"])]
+    return command + ["-f", muxer, out_file]
+
+
+class StreamEncoder:
+    """
+    Encodes a track while it is being assembled: raw PCM is piped into one
+    ffmpeg process per output file, which encodes it as it arrives.
+
+    Unlike exporting a finished AudioSegment, the track is never held in
+    memory (nor written to a temporary WAV file), and encoding overlaps
+    with decoding and assembly; a full pipe makes write() wait for ffmpeg.
+
+    The output is written to a temporary name and renamed by close(), so
+    a failed or interrupted encode never leaves a partial file.
+
+    Usage:
+        with StreamEncoder(out_file, encoding, 44100, 2, 2) as encoder:
+            encoder.write(pcm)
+            ...
+    """
+
+    def __init__(self, out_file: str, encoding: dict | None, frame_rate: int, channels: int, sample_width: int):
+        self.out_file = out_file
+        self.encoding = encoding or DEFAULT_ENCODING
+        self.bytes_in = 0
+        base, ext = os.path.splitext(out_file)
+        self._tmp_file = f"{base}.tmp{ext}"
+        self._stderr = tempfile.TemporaryFile()
+        command = encoder_command(self._tmp_file, self.encoding, frame_rate, channels, sample_width)
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                             stderr=self._stderr)
+        except Exception:
+            self._stderr.close()
+            raise
+
+    def write(self, pcm) -> None:
+        try:
+            self._process.stdin.write(pcm)
+        except BrokenPipeError:
+            self.close()   # raises with ffmpeg's error
+            raise
+        self.bytes_in += len(pcm)
+
+    def close(self) -> None:
+        """
+        Finishes encoding and moves the output into place.
+
+        Raises:
+            CouldntEncodeError: If ffmpeg failed.
+        """
+        from pydub.exceptions import CouldntEncodeError
+
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = process.wait()
+        self._stderr.seek(0)
+        error = self._stderr.read().decode(errors="ignore")
+        self._stderr.close()
+
+        if returncode != 0 or not os.path.isfile(self._tmp_file):
+            self._remove_tmp()
+            raise CouldntEncodeError(f"Encoding failed. ffmpeg returned error code: {returncode}\n\n{error}")
+        os.replace(self._tmp_file, self.out_file)
+
+    def abort(self) -> None:
+        """
+        Stops the encoder and discards the output.
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        process.kill()
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        process.wait()
+        self._stderr.close()
+        self._remove_tmp()
+
+    def _remove_tmp(self) -> None:
+        if os.path.isfile(self._tmp_file):
+            os.remove(self._tmp_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
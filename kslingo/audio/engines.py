@@ -0,0 +1,303 @@
+import array
+import glob
+import hashlib
+import io
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+
+
+class TTSEngine:
+    """
+    Common contract for text-to-speech backends.
+
+    synthesize(text, lang) returns the encoded clip as bytes, in the container
+    named by `format` ('mp3' or 'wav'). Engines that can synthesize several
+    phrases in one call set batch_size > 1; synthesize_batch() is then called
+    with up to batch_size items at a time. Requests failing with one of
+    retry_errors() are retried with backoff; other errors (bad language,
+    missing voice model, ...) are raised at once.
+    """
+
+    name = ""
+    format = "mp3"
+    batch_size = 1
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        raise NotImplementedError
+
+    def synthesize_batch(self, items: list[tuple[str, str]]) -> list[bytes]:
+        """
+        Synthesizes a list of (text, lang) items, returning clips in the same order.
+        """
+        return [self.synthesize(text, lang) for text, lang in items]
+
+    def params(self, lang: str | None = None) -> dict:
+        """
+        Voice parameters that change the produced audio: with `lang`, those of
+        that language's clips (part of their clip cache key), otherwise those
+        of every language (part of the build manifest).
+        """
+        return {}
+
+    def retry_errors(self) -> tuple:
+        """
+        Exception types of transient failures, worth retrying.
+        """
+        return (ConnectionError, TimeoutError)
+
+
+class GttsEngine(TTSEngine):
+    """
+    Google Translate TTS (network).
+
+    gTTS opens (and closes) a new HTTP session for every clip. Its sessions
+    share one process-wide keep-alive connection pool instead (see
+    _use_pooled_sessions()), so connections to the backend are reused across
+    clips, threads (--jobs) and jobs in `kslingo serve`, while gTTS' public
+    API does the requests and parses the responses.
+    """
+
+    name = "gtts"
+    format = "mp3"
+
+    def __init__(self, timeout: float | None = 30):
+        self.timeout = timeout
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        from gtts import gTTS
+
+        _use_pooled_sessions()
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang, timeout=self.timeout).write_to_fp(buf)
+        return buf.getvalue()
+
+    def retry_errors(self) -> tuple:
+        import requests
+        from gtts.tts import gTTSError
+
+        return (gTTSError, requests.RequestException, ConnectionError, TimeoutError)
+
+
+# Keep-alive connections kept per host; more concurrent requests (--jobs)
+# still work, the extra connections are just closed after use
+HTTP_POOL_SIZE = 32
+
+_pooled_lock = threading.Lock()
+
+
+def _use_pooled_sessions() -> None:
+    # Replaces the `requests` module seen by gtts.tts (only there) with a
+    # proxy whose Session() mounts one long-lived HTTPAdapter, shared by all
+    # threads (urllib3 pools are thread-safe), and leaves it open on close().
+    # Everything else is the real module.
+    import requests
+    import requests.adapters
+    import gtts.tts
+
+    with _pooled_lock:
+        if isinstance(gtts.tts.requests, _PooledRequests):
+            return
+
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE)
+
+        class PooledSession(requests.Session):
+            def __init__(self):
+                super().__init__()
+                self.mount("https://", adapter)
+                self.mount("http://", adapter)
+
+            def close(self):
+                pass   # the adapter's connections are kept for the next clip
+
+        proxy = _PooledRequests(requests)
+        proxy.Session = PooledSession
+        gtts.tts.requests = proxy
+
+
+class _PooledRequests:
+    # The `requests` module, as seen by gtts.tts
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+
+class EspeakEngine(TTSEngine):
+    """
+    Local eSpeak NG synthesizer (offline). Requires `espeak-ng` or `espeak` in PATH.
+    """
+
+    name = "espeak"
+    format = "wav"
+
+    def __init__(self, speed: int = 150):
+        self.speed = speed
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("espeak engine requires 'espeak-ng' or 'espeak' in PATH")
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        result = subprocess.run(
+            [self.binary, "-v", lang, "-s", str(self.speed), "--stdout", text],
+            check=True,
+            capture_output=True,
+        )
+        return result.stdout
+
+    def params(self, lang: str | None = None) -> dict:
+        return {"speed": self.speed}
+
+
+class PiperEngine(TTSEngine):
+    """
+    Local Piper neural TTS (offline). Requires the `piper` binary and one voice
+    model per language named '<lang>_*.onnx' (with its .onnx.json config) in
+    KSLINGO_PIPER_MODELS (default: ~/.local/share/piper).
+
+    Batches run one piper process per language, so a voice model is loaded
+    once per batch instead of once per clip.
+    """
+
+    name = "piper"
+    format = "wav"
+    batch_size = 32
+
+    def __init__(self, model_dir: str | None = None):
+        self.model_dir = model_dir or os.environ.get(
+            "KSLINGO_PIPER_MODELS", os.path.join(os.path.expanduser("~"), ".local", "share", "piper")
+        )
+        self.binary = shutil.which("piper")
+        if not self.binary:
+            raise RuntimeError("piper engine requires 'piper' in PATH")
+        self._sample_rates = {}
+
+    def _model_for(self, lang: str) -> str:
+        models = sorted(glob.glob(os.path.join(self.model_dir, f"{lang}_*.onnx")))
+        if not models:
+            raise FileNotFoundError(f"No piper voice model for '{lang}' in {self.model_dir}")
+        return models[0]
+
+    def _sample_rate(self, model: str) -> int:
+        rate = self._sample_rates.get(model)
+        if rate is None:
+            with open(f"{model}.json", encoding="utf-8") as f:
+                rate = self._sample_rates[model] = json.load(f)["audio"]["sample_rate"]
+        return rate
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        model = self._model_for(lang)
+        result = subprocess.run(
+            [self.binary, "--model", model, "--output-raw"],
+            input=text.encode("utf-8"),
+            check=True,
+            capture_output=True,
+        )
+        return pcm_to_wav(result.stdout, self._sample_rate(model))
+
+    def synthesize_batch(self, items: list[tuple[str, str]]) -> list[bytes]:
+        """
+        Synthesizes the items with one piper process per language: one JSON
+        line in and one wav file out per item.
+        """
+        by_lang = {}
+        for idx, (_text, lang) in enumerate(items):
+            by_lang.setdefault(lang, []).append(idx)
+
+        clips = [None] * len(items)
+        with tempfile.TemporaryDirectory(prefix="kslingo-piper-") as tmp_dir:
+            for lang, indices in by_lang.items():
+                lines = "".join(
+                    json.dumps({"text": items[idx][0], "output_file": os.path.join(tmp_dir, f"{idx}.wav")},
+                               ensure_ascii=False) + "\n"
+                    for idx in indices
+                )
+                subprocess.run(
+                    [self.binary, "--model", self._model_for(lang), "--json-input", "--output_dir", tmp_dir],
+                    input=lines.encode("utf-8"),
+                    check=True,
+                    capture_output=True,
+                )
+                for idx in indices:
+                    with open(os.path.join(tmp_dir, f"{idx}.wav"), "rb") as f:
+                        clips[idx] = f.read()
+        return clips
+
+    def params(self, lang: str | None = None) -> dict:
+        # the voice model files, so replacing or adding a model changes the key
+        if lang is not None:
+            return {"model": self._model_id(self._model_for(lang))}
+        models = sorted(glob.glob(os.path.join(self.model_dir, "*_*.onnx")))
+        return {"models": self.model_dir, "voices": [self._model_id(model) for model in models]}
+
+    @staticmethod
+    def _model_id(model: str) -> str:
+        st = os.stat(model)
+        return f"{os.path.basename(model)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class FakeEngine(TTSEngine):
+    """
+    Deterministic offline engine for tests and benchmarks.
+
+    Produces a sine tone whose pitch is derived from (lang, text) and whose
+    length is proportional to the text length, so the whole audio pipeline
+    can be exercised without network access.
+    """
+
+    name = "fake"
+    format = "wav"
+
+    SAMPLE_RATE = 16000
+    BASE_MS = 200
+    MS_PER_CHAR = 60
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        digest = hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).digest()
+        freq = 220 + int.from_bytes(digest[:2], "big") % 660
+        n = self.SAMPLE_RATE * (self.BASE_MS + self.MS_PER_CHAR * len(text)) // 1000
+
+        step = 2 * math.pi * freq / self.SAMPLE_RATE
+        samples = array.array("h", (int(8000 * math.sin(step * i)) for i in range(n)))
+        return pcm_to_wav(samples.tobytes(), self.SAMPLE_RATE)
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    Wraps raw little-endian PCM samples into a WAV container.
+    """
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+ENGINES = {
+    "gtts": GttsEngine,
+    "espeak": EspeakEngine,
+    "piper": PiperEngine,
+    "fake": FakeEngine,
+}
+
+
+def get_engine(name: str = "gtts", **options) -> TTSEngine:
+    """
+    Creates a TTS engine by its registry name.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    try:
+        engine_cls = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown TTS engine '{name}'. Choose one of: {', '.join(ENGINES)}")
+    return engine_cls(**options)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+
+MANIFEST_NAME = ".kslingo-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(*parts) -> str:
+    """
+    Returns a stable sha256 hex digest of JSON-serializable parts.
+    """
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str) -> str | None:
+    """
+    Returns the sha256 hex digest of a file's content, or None if it doesn't exist.
+    """
+    if not os.path.isfile(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildManifest:
+    """
+    Records which content produced every output file of an audio build,
+    so reruns only regenerate outputs whose inputs changed.
+
+    Stored as JSON in <out_dir>/.kslingo-manifest.json (or `name`, e.g. one
+    per shard, so each build only removes its own stale outputs):
+        {"version": 1, "outputs": {"<file name>": "<content hash>", ...}}
+    """
+
+    def __init__(self, out_dir: str, name: str = MANIFEST_NAME):
+        self.out_dir = out_dir
+        self.path = os.path.join(out_dir, name)
+        self.outputs = {}
+        self._previous = {}
+
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self._previous = dict(data.get("outputs", {}))
+            except (OSError, ValueError):
+                log.warning(f"ignoring unreadable manifest {self.path}")
+
+    def is_fresh(self, name: str, digest: str) -> bool:
+        """
+        True if output `name` exists and was built from content `digest`.
+        """
+        return self._previous.get(name) == digest and os.path.isfile(os.path.join(self.out_dir, name))
+
+    def reuse_moved(self, name: str, digest: str) -> bool:
+        """
+        If another existing output was built from the same content (e.g. the
+        section moved and its file index changed), renames it to `name`.
+        Outputs already recorded for this build are never taken over.
+        """
+        for old_name, old_digest in list(self._previous.items()):
+            if old_digest != digest or old_name in self.outputs:
+                continue
+            old_path = os.path.join(self.out_dir, old_name)
+            if os.path.isfile(old_path):
+                os.replace(old_path, os.path.join(self.out_dir, name))
+                self._previous[name] = digest
+                del self._previous[old_name]
+                return True
+        return False
+
+    def record(self, name: str, digest: str) -> None:
+        self.outputs[name] = digest
+
+    def remove_stale(self) -> list[str]:
+        """
+        Deletes outputs from the previous build that weren't produced by this one.
+
+        Returns:
+            list[str]: Names of removed files.
+        """
+        removed = []
+        for name in self._previous:
+            if name in self.outputs:
+                continue
+            path = os.path.join(self.out_dir, name)
+            if os.path.isfile(path):
+                os.remove(path)
+                removed.append(name)
+        return removed
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "outputs": self.outputs}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
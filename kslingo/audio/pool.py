@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+
+# Max requests per second sent to each TTS engine (None = unlimited).
+ENGINE_RATE_LIMITS = {
+    "gtts": 5.0,
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_rate_share = 1
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least 1/rate seconds apart.
+    """
+
+    def __init__(self, rate: float | None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def get_rate_limiter(engine: str) -> RateLimiter:
+    """
+    Returns the process-wide rate limiter shared by all requests to an engine.
+    """
+    with _limiters_lock:
+        if engine not in _limiters:
+            rate = ENGINE_RATE_LIMITS.get(engine)
+            _limiters[engine] = RateLimiter(rate / _rate_share if rate else None)
+        return _limiters[engine]
+
+
+def share_rate_limits(processes: int) -> None:
+    """
+    Limits this process to 1/processes of every engine rate limit, for one
+    of `processes` render workers synthesizing in parallel (the limiters
+    are per process, so the workers together stay within the limit).
+    """
+    global _rate_share
+    with _limiters_lock:
+        _rate_share = max(1, processes)
+        _limiters.clear()
+
+
+def retry_with_backoff(fn, *args, retries: int = 4, base_delay: float = 0.5,
+                       max_delay: float = 8.0, exceptions=(ConnectionError, TimeoutError)):
+    """
+    Calls fn(*args), retrying with exponential backoff on the given exceptions.
+
+    Args:
+        fn: Callable to run.
+        retries (int): Number of retries after the first failed attempt.
+        base_delay (float): Delay before the first retry, doubled on every retry.
+        max_delay (float): Upper bound for a single delay.
+        exceptions (tuple): Exception types that trigger a retry (transient
+            failures only: other errors are raised at once).
+
+    Returns:
+        Whatever fn returns. The last exception is re-raised when retries run out.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args)
+        except exceptions as e:
+            if attempt == retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            log.warning(f"{e} -> retry {attempt + 1}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def run_ordered(fn, items: list, jobs: int = 1) -> list:
+    """
+    Applies fn to every item using a bounded thread pool.
+
+    Results are returned in the order of items, regardless of completion order,
+    so callers can assemble output deterministically. With jobs <= 1 the items
+    are processed sequentially in the calling thread.
+
+    Args:
+        fn: Callable taking one item.
+        items (list): Work items.
+        jobs (int): Maximum number of concurrent workers.
+
+    Returns:
+        list: fn(item) for every item, in input order.
+    """
+    if jobs <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(fn, items))
@@ -1,124 +1,552 @@
-from gtts import gTTS
-from pydub import AudioSegment
-from kslingo.utils.fs import get_resource_path
+import contextlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from kslingo.utils.fs import ensure_dir
-from kslingo.utils.fs import create_temp_dir, remove_dir_if_exists
 from kslingo.utils.text import split_pair
 from kslingo.parsers.txt import ReadFromTxtFile
-from kslingo.parsers.markdown import get_phrases_markdown, generate_output_md_from_phrases
+from kslingo.parsers.markdown import IncrementalMarkdownParser, iter_sections_markdown, write_section_md
+from kslingo.parsers.deck import is_deck, load_deck
+from kslingo.model import select_sections
 from kslingo.convert.file import Generate_pdf_from_md
+from kslingo.audio.engines import get_engine
+from kslingo.audio.assembler import PcmAssembler
+from kslingo.audio.encoder import StreamEncoder, encoding_ext
+from kslingo.audio.clips import ClipTable
+from kslingo.audio.assets import get_timing_profile, load_end_sound
+from kslingo.audio.pool import share_rate_limits
+from kslingo.audio.manifest import MANIFEST_NAME, BuildManifest, content_hash, file_hash
+from kslingo.utils.profiling import count, profiler, span, stage
+from kslingo.utils.log import Progress, get_logger, logging_config, setup_logging
+from kslingo.utils.batch import SUMMARY_NAME, find_files, in_shard, output_path, shard_name, write_batch_summary
+from kslingo.utils.watch import DEFAULT_DEBOUNCE, FileWatcher
 
-def Generate_Txt_Audio_mp3(input_file, out_dir, learn_lang, native_lang):
-    print("start Generate_Txt_Audio_mp3")
 
-    out_file = f"{out_dir}/simple.mp3"
+log = get_logger(__name__)
+
+
+def Generate_Txt_Audio_mp3(input_file, out_dir, learn_lang, native_lang, cache=None, jobs=1, engine=None, debug_dir=None, timing=None, clips=None, encoding=None):
+    log.debug("start Generate_Txt_Audio_mp3")
+
+    out_file = f"{out_dir}/simple{encoding_ext(encoding)}"
 
     # sanity
     ensure_dir(out_dir)
         
     phrases = ReadFromTxtFile(input_file)
     if not phrases:
-        print("ERROR: phrases is empty array!")
+        log.error("phrases is empty array!")
         return
         
-    generate_mp3_from_phrases(phrases, out_file, learn_lang, native_lang)
+    with stage("render"):
+        generate_mp3_from_phrases(phrases, out_file, learn_lang, native_lang, cache, jobs, engine, debug_dir, clips, timing, encoding)
+    log.info(f"Finish! File saved: {out_file}")
     
 
-def Generate_Markdown_Audio_mp3(input_file, out_dir, learn_lang, native_lang):
-    print("start Generate_Markdown_Audio_mp3")
+def Generate_Markdown_Audio_mp3(input_file, out_dir, learn_lang, native_lang, cache=None, jobs=1, engine=None, procs=1, force=False, debug_dir=None, timing=None, clips=None, executor=None, sections=None, query=None, shard=None, encoding=None):
+    """
+    Builds the section mp3 files, cleaned.md and cleaned.pdf of one markdown
+    file or compiled deck (see Compile_deck).
+
+    `clips` and `executor` let several files share one clip table or one
+    render process pool (see Generate_Vault_Audio_mp3). `sections` are the
+    already parsed sections of input_file (see Watch_Markdown_Audio_mp3).
+
+    `query` (a PhraseQuery) keeps only the matching phrases, e.g. levels
+    A1,A2; sections without any are left out. A query build goes to its own
+    subdirectory (out_dir/<query.slug>/, see query_out_dir()), with its own
+    manifest, so it never replaces or removes the full build's outputs.
+    `shard` (K, N) renders only
+    the sections of shard K of N (see in_shard()), so N machines can split
+    a build. Shards keep their own manifest and only shard 1 writes
+    cleaned.md and cleaned.pdf, so they may share out_dir. `encoding` selects
+    the codec and encoder settings (see get_encoding(); default mp3).
+
+    Returns:
+        dict: Counts of parsed, rendered and up-to-date sections (and of
+        sections left to other shards).
+    """
+    log.debug("start Generate_Markdown_Audio_mp3")
 
     # sanity
+    out_dir = query_out_dir(out_dir, query)
     ensure_dir(out_dir)
 
-    phrases = get_phrases_markdown(input_file, learn_lang, native_lang)
+    engine = engine or get_engine("gtts")
+    timing = timing or get_timing_profile()
+    manifest = BuildManifest(out_dir, shard_name(MANIFEST_NAME, shard))
+    write_md = shard is None or shard[0] == 1
 
-    if not phrases:
-        print("ERROR: phrases is empty array!")
-        return
+    # Sections are parsed, written to cleaned.md and rendered as a stream,
+    # so audio rendering starts before parsing ends
+    out_md=f"{out_dir}/cleaned.md"
+    settings = render_settings(engine, timing, encoding, query)
+    counts = {"parsed": 0, "up_to_date": 0}
+    if shard:
+        counts["other_shards"] = 0
+
+    try:
+        with contextlib.ExitStack() as stack:
+            md_file = stack.enter_context(open(f"{out_md}.tmp", "w", encoding="utf-8")) if write_md else None
+            if sections is None and is_deck(input_file):
+                sections = stack.enter_context(load_deck(input_file))
+                if sections.learn_lang and (sections.learn_lang, sections.native_lang) != (learn_lang, native_lang):
+                    log.warning(f"Deck was compiled for {sections.learn_lang} - {sections.native_lang}, "
+                                f"not {learn_lang} - {native_lang}")
+            elif sections is None:
+                sections = iter_sections_markdown(input_file, learn_lang, native_lang)
+            outdated = _outdated_sections(select_sections(sections, query), out_dir, md_file, learn_lang, native_lang,
+                                          manifest, settings, force, counts, shard, encoding_ext(encoding))
+            # the render stage includes parsing, which is streamed into it
+            with stage("render"):
+                results = render_sections(outdated, learn_lang, native_lang, cache, jobs, engine, procs, debug_dir, timing,
+                                          clips, executor, encoding)
+    except BaseException:
+        # a failed build (e.g. one file of a vault, or a watch rebuild) leaves no partial cleaned.md
+        if write_md and os.path.isfile(f"{out_md}.tmp"):
+            os.remove(f"{out_md}.tmp")
+        raise
+    counts["rendered"] = len(results)
+
+    if not counts["parsed"]:
+        if write_md:
+            os.remove(f"{out_md}.tmp")
+        if query is None or query.is_empty:
+            log.error("phrases is empty array!")
+        else:
+            log.error(f"No phrases match {query}")
+        return counts
+    if counts["up_to_date"]:
+        log.info(f"{counts['up_to_date']} sections up to date")
+    if shard:
+        log.info(f"Shard {shard[0]}/{shard[1]}: {counts['other_shards']} sections left to other shards")
+
+    if write_md:
+        os.replace(f"{out_md}.tmp", out_md)
+
+        # PDF is rebuilt only when cleaned.md changed
+        out_pdf=f"{out_dir}/cleaned.pdf"
+        md_digest = file_hash(out_md)
+        manifest.record("cleaned.pdf", md_digest)
+        if force or not manifest.is_fresh("cleaned.pdf", md_digest):
+            Generate_pdf_from_md(out_md, out_pdf)
+
+    for name in manifest.remove_stale():
+        log.info(f"Removed stale output: {name}")
+    manifest.save()
+    return counts
+
+
+def Generate_Vault_Audio_mp3(vault_dir, out_dir, learn_lang, native_lang, cache=None, jobs=1, engine=None, procs=1, force=False, debug_dir=None, timing=None, clips=None, query=None, shard=None, encoding=None):
+    """
+    Builds audio for every markdown file of a vault directory in one process.
+
+    Every file gets its own output directory mirroring its path in the vault
+    (vault/a/b.md -> out_dir/a/b/, or out_dir/a/b/<query.slug>/). All files share the clip table (or, with
+    procs > 1, one render process pool), so a phrase used in several files is
+    synthesized and decoded once. A failing file doesn't stop the batch.
+    `query`, `shard` and `encoding` apply to every file (see Generate_Markdown_Audio_mp3).
+
+    Returns:
+        list[dict]: Per-file results, also written to <out_dir>/batch-summary.json
+        (batch-summary-KofN.json for shard K of N, batch-summary-<query.slug>.json
+        for a query).
+    """
+    log.debug("start Generate_Vault_Audio_mp3")
+
+    engine = engine or get_engine("gtts")
+    procs = procs or os.cpu_count() or 1
+    files = find_files(vault_dir, ".md", exclude=[out_dir])
+    log.info(f"Vault: {len(files)} markdown files in {vault_dir}")
 
+    clips = clips or ClipTable(engine, cache, jobs)
+    executor = create_render_pool(engine, cache, jobs, procs) if procs > 1 else None
+    results = []
 
-    for i, section in enumerate(phrases):
-        if not section or not section.get("phrases"):
+    try:
+        for input_file in files:
+            file_out_dir = output_path(input_file, vault_dir, out_dir)
+            file_debug_dir = output_path(input_file, vault_dir, debug_dir) if debug_dir else None
+            log.info(f"Building {input_file} -> {file_out_dir}")
+            start = time.perf_counter()
+            result = {"input": input_file, "out_dir": query_out_dir(file_out_dir, query)}
+            try:
+                counts = Generate_Markdown_Audio_mp3(input_file, file_out_dir, learn_lang, native_lang, cache, jobs, engine,
+                                                     procs, force, file_debug_dir, timing, clips, executor,
+                                                     query=query, shard=shard, encoding=encoding)
+                result.update(counts)
+                result["status"] = "ok" if counts["parsed"] else "empty"
+            except Exception as e:
+                log.debug("build failed", exc_info=True)
+                result["status"] = "failed"
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["seconds"] = round(time.perf_counter() - start, 3)
+            results.append(result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    summary_name = shard_name(SUMMARY_NAME, shard)
+    if query is not None and not query.is_empty:
+        stem, ext = os.path.splitext(summary_name)
+        summary_name = f"{stem}-{query.slug}{ext}"
+    write_batch_summary(results, out_dir, summary_name)
+    return results
+
+
+def Watch_Markdown_Audio_mp3(input_file, out_dir, learn_lang, native_lang, cache=None, jobs=1, engine=None, procs=1, debug_dir=None, timing=None, debounce=DEFAULT_DEBOUNCE, poll=False, query=None, encoding=None):
+    """
+    Builds a markdown file, then rebuilds it after every save until interrupted.
+
+    Only the sections whose text changed are reparsed, and only the sections
+    whose audio changed are rendered (build manifest). Clips stay in memory
+    between rebuilds, and with procs > 1 the render pool stays up, so an
+    edit costs about one section render.
+    """
+    log.debug("start Watch_Markdown_Audio_mp3")
+
+    engine = engine or get_engine("gtts")
+    procs = procs or os.cpu_count() or 1
+    parser = IncrementalMarkdownParser(input_file, learn_lang, native_lang)
+    clips = ClipTable(engine, cache, jobs)
+    executor = create_render_pool(engine, cache, jobs, procs) if procs > 1 else None
+
+    def build():
+        start = time.perf_counter()
+        try:
+            reparsed = parser.update()
+            if reparsed is None and os.path.isfile(os.path.join(query_out_dir(out_dir, query), "cleaned.md")):
+                log.info("No section changed")
+                return
+            log.info(f"Reparsed {len(reparsed or [])} of {len(parser.sections)} sections")
+            Generate_Markdown_Audio_mp3(input_file, out_dir, learn_lang, native_lang, cache, jobs, engine, procs,
+                                        False, debug_dir, timing, clips, executor, parser.sections, query,
+                                        encoding=encoding)
+        except Exception as e:
+            # keep watching: the next save may fix it
+            log.debug("build failed", exc_info=True)
+            log.error(f"Build failed: {type(e).__name__}: {e}")
+            return
+        log.info(f"Build finished in {time.perf_counter() - start:.2f}s")
+
+    try:
+        with FileWatcher(input_file, debounce, poll=poll) as watcher:
+            build()
+            log.info(f"Watching {input_file} ({watcher.mode}), press Ctrl+C to stop")
+            while True:
+                watcher.wait()
+                log.info(f"{input_file} changed")
+                build()
+    except KeyboardInterrupt:
+        log.info("Stopped watching")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _outdated_sections(sections, out_dir, md_file, learn_lang, native_lang, manifest, settings, force, counts, shard=None, ext=".mp3"):
+    # Streams (title, pairs, out_file) of the sections that need rendering.
+    # `sections` are (position, section) pairs (see select_sections()). Every
+    # section is also written to md_file (unless None) and, if it is in the
+    # shard, recorded in the manifest; sections whose content hash matches
+    # the manifest are not rendered again.
+    for i, section in sections:
+        counts["parsed"] += 1
+        if md_file is not None:
+            write_section_md(md_file, section, learn_lang, native_lang)
+
+        if not section.phrases:
             continue
 
-        section_title = section.get("title", f"section_{i}")
+        section_title = section.title
+        if not in_shard(section_title, shard):
+            counts["other_shards"] += 1
+            continue
         hu_title, sr_title = split_pair(section_title)
 
         # audio list of pairs [(hu, sr)]
         pairs = [(hu_title, sr_title)]
 
-        for phrase in section["phrases"]:
-            # if phrase.get("only_learn"):
-            #     continue
+        for hu, sr in zip(section.texts(learn_lang), section.texts(native_lang)):
+            pairs.append((hu.strip(), sr.strip()))
 
-            hu = phrase.get(learn_lang, "").strip()
-            sr = phrase.get(native_lang, "")
-            sr = sr.strip() if sr else ""
+        if len(pairs) <= 1:
+            log.info(f"SKIP section (no valid audio pairs): {section_title}")
+            continue
 
-            # if not hu or not sr:
-            #     print(f"SKIP (incomplete): hu='{hu}' | sr='{sr}'")
-            #     continue
+        safe_title = section_title.replace(" ", "_").replace("/", "_")
+        out_file = f"{out_dir}/{i:02d}_{safe_title}{ext}"
 
-            pairs.append((hu, sr))
+        # --- INCREMENTAL BUILD ---
+        name = os.path.basename(out_file)
+        digest = content_hash(section_title, pairs, learn_lang, native_lang, settings)
+        manifest.record(name, digest)
 
-        if len(pairs) <= 1:
-            print(f"SKIP section (no valid audio pairs): {section_title}")
+        if not force and (manifest.is_fresh(name, digest) or manifest.reuse_moved(name, digest)):
+            log.debug(f"UP-TO-DATE: {name}")
+            counts["up_to_date"] += 1
             continue
 
-        safe_title = section_title.replace(" ", "_").replace("/", "_")
-        out_file = f"{out_dir}/{i:02d}_{safe_title}.mp3"
+        yield section_title, pairs, out_file
 
-        generate_mp3_from_phrases(pairs, out_file, learn_lang, native_lang)
 
-    out_md=f"{out_dir}/cleaned.md"
-    generate_output_md_from_phrases(phrases, out_md, learn_lang, native_lang)
-    
-    out_pdf=f"{out_dir}/cleaned.pdf"
-    Generate_pdf_from_md(out_md, out_pdf)
+def query_out_dir(out_dir, query=None) -> str:
+    """
+    Returns the output directory of a build with `query`: out_dir itself for
+    no (or an empty) query, otherwise out_dir/<query.slug>.
+    """
+    if query is None or query.is_empty:
+        return out_dir
+    return os.path.join(out_dir, query.slug)
 
 
-def generate_mp3_from_phrases(phrases, out_file, learn_lang, native_lang):
-    print(f"start generate_mp3_from_phrases {learn_lang} -> {native_lang}")
+def render_settings(engine, timing, encoding=None, query=None) -> dict:
+    """
+    Returns the render settings that affect section audio, for the build manifest.
+    """
+    settings = {
+        "engine": engine.name,
+        "engine_params": engine.params(),
+        "timing": timing,
+        "format": (encoding or {}).get("codec", "mp3"),
+    }
+    # default encoder settings don't change the hash of earlier builds
+    options = {name: value for name, value in (encoding or {}).items() if name != "codec" and value is not None}
+    if options:
+        settings["encoding"] = options
+    if query is not None and not query.is_empty:
+        settings["query"] = query.settings()
+    return settings
 
-    wav_path = get_resource_path("assets/end_sound.wav")
-    end_sound = AudioSegment.from_file(wav_path)
-    end_sound = end_sound.apply_gain(-10)
-    final_audio = AudioSegment.silent(duration=1000)
-    temp_dir = create_temp_dir()
-    
-    print(f"Temp directory created : {temp_dir}")
-    
-    # sanity
-    ensure_dir(temp_dir)
 
-    for i, (left, right) in enumerate(phrases):
-        print(f"Generating: {left} - {right}")
-        
-        # left generate always (learn lang)
-        left_path = f"{temp_dir}/{learn_lang}_{i}.mp3"
-        gTTS(text=left, lang=learn_lang).save(left_path)
-        left_audio = AudioSegment.from_file(left_path)
+def render_sections(sections, learn_lang, native_lang, cache=None, jobs=1, engine=None, procs=1, debug_dir=None, timing=None, clips=None, executor=None, encoding=None):
+    """
+    Renders independent sections, each into its own audio file.
+
+    `sections` may be a list or a stream; every section is started as soon as
+    it arrives. Clips are interned for the whole run: every unique (lang, text)
+    is synthesized and decoded once and shared by all sections.
+
+    With procs > 1 the sections are spread over a process pool (decode, assembly
+    and encode are CPU-bound). Each worker keeps its own clip table; when a clip
+    cache is used, clips are synthesized in this process before a section is
+    submitted, so workers only read them from the cache. Worker hit/miss counts
+    are added back to `cache`.
+
+    Args:
+        sections (iterable): (title, pairs, out_file) tuples.
+        procs (int): Number of worker processes; 0 means one per CPU core.
+        debug_dir (str | None): Keep synthesized clips in a subdirectory per section.
+        timing (dict | None): Timing profile (see kslingo.audio.assets).
+        clips (ClipTable | None): Clip table to use (and keep) instead of a new one.
+        executor (ProcessPoolExecutor | None): Render pool from create_render_pool()
+            to use instead of starting one; it is left running.
+        encoding (dict | None): Encoder settings (see kslingo.audio.encoder).
+
+    Returns:
+        list[dict]: Per-section results (title, out_file, seconds), in section order.
+    """
+    engine = engine or get_engine("gtts")
+    procs = procs or os.cpu_count() or 1
+    results = []
+    start = time.perf_counter()
+
+    clips = clips or ClipTable(engine, cache, jobs)
+    pooled = executor is not None or procs > 1
+    plays = 0
+    queued = 0
+    unique = set()
+
+    # phrases/s and ETA: the total is known up front for lists, and for streams
+    # once all sections are submitted to the pool
+    total = sum(len(pairs) - 1 for _, pairs, _ in sections) if hasattr(sections, "__len__") else None
+    progress = Progress(total, label="Rendering: ")
+
+    def report(done, result):
+        log.debug(f"[{done}] {result['title']} ({result['seconds']:.2f}s)")
+        progress.update(result["phrases"])
+
+    def tasks():
+        nonlocal plays, queued
+        for title, pairs, out_file in sections:
+            queued += len(pairs) - 1
+            requests = _clip_requests(pairs, learn_lang, native_lang)
+            plays += sum(3 if right else 1 for _, right in pairs)
+            unique.update(ClipTable.key(text, lang) for text, lang in requests)
+            if not pooled or cache is not None:
+                clips.prefetch(requests)
+            yield title, pairs, out_file, learn_lang, native_lang, debug_dir, timing, encoding
+
+    if not pooled:
+        for idx, task in enumerate(tasks()):
+            results.append(_render_section(task, clips))
+            report(idx + 1, results[idx])
+    else:
+        own_executor = executor is None
+        executor = executor or create_render_pool(engine, cache, jobs, procs)
+        try:
+            futures = [executor.submit(_render_section, task) for task in tasks()]
+            progress.total = queued
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                if cache is not None:
+                    cache.hits += result["hits"]
+                    cache.misses += result["misses"]
+                profiler.merge(result.pop("profile"))
+                report(done, result)
+            results = [future.result() for future in futures]
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    progress.close()
+
+    if results:
+        decodes = sum(r["decodes"] for r in results)
+        log.info(f"Clip dedup: {plays} plays, {len(unique)} unique clips (ratio {plays / len(unique):.2f}), {decodes} decodes")
+
+    log.info(f"Rendered {len(results)} sections in {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def create_render_pool(engine, cache=None, jobs=1, procs=0):
+    """
+    Starts a section render process pool (see render_sections).
+    The caller owns the pool and must shut it down.
+
+    Workers are started by a fork server (spawned where there is none),
+    never forked from this process: it may run other threads (`kslingo
+    serve`, TTS jobs) whose locks would be copied into the workers held.
+    """
+    procs = procs or os.cpu_count() or 1
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=procs, mp_context=multiprocessing.get_context(method), initializer=_init_worker,
+                               initargs=(engine, cache, jobs, profiler.enabled, logging_config(), procs))
+
+
+_worker_clips = None
 
+
+def _init_worker(engine, cache, jobs, profiling=False, log_config=None, procs=1):
+    # One clip table per worker process, shared by the sections it renders.
+    # Workers synthesize in parallel (without a clip cache), so each gets its
+    # share of the engine rate limit.
+    global _worker_clips
+    share_rate_limits(procs)
+    _worker_clips = ClipTable(engine, cache, jobs)
+    if log_config:
+        setup_logging(**log_config)
+    if profiling:
+        profiler.enable()
+
+
+def _render_section(task, clips=None):
+    title, pairs, out_file, learn_lang, native_lang, debug_dir, timing, encoding = task
+    in_worker = clips is None
+    clips = clips or _worker_clips
+    cache = clips.cache
+
+    if debug_dir:
+        debug_dir = os.path.join(debug_dir, os.path.splitext(os.path.basename(out_file))[0])
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    decodes = clips.decodes
+    start = time.perf_counter()
+
+    with span("section", title=title):
+        generate_mp3_from_phrases(pairs, out_file, learn_lang, native_lang, cache, clips.jobs, clips.engine, debug_dir, clips, timing,
+                                  encoding)
+    count("sections.rendered")
+
+    result = {
+        "title": title,
+        "out_file": out_file,
+        "phrases": len(pairs) - 1,
+        "seconds": time.perf_counter() - start,
+        "hits": cache.hits - hits if cache is not None else 0,
+        "misses": cache.misses - misses if cache is not None else 0,
+        "decodes": clips.decodes - decodes,
+    }
+    if in_worker:
+        # spans and counters go back to the parent with the result
+        result["profile"] = profiler.drain()
+    return result
+
+
+def _clip_requests(phrases, learn_lang, native_lang):
+    # (text, lang) of every clip a list of pairs needs, in playing order
+    requests = []
+    for left, right in phrases:
+        # left generate always (learn lang)
+        requests.append((left, learn_lang))
         if right != "":
-            # Means that exist phrases on both langs (learn lang - native lang)
-            # Then generate left and right.
-            right_path = f"{temp_dir}/{native_lang}_{i}.mp3"
-            gTTS(text=right, lang=native_lang).save(right_path)
-            right_audio = AudioSegment.from_file(right_path)
-
-            # LEARN-LANG -> NATIVE-LANG -> LEARN-LANG -> End Sound
-            final_audio += left_audio + AudioSegment.silent(duration=800)
-            final_audio += right_audio + AudioSegment.silent(duration=800)
-            final_audio += left_audio + AudioSegment.silent(duration=800)
-            final_audio += end_sound + AudioSegment.silent(duration=1200)
+            requests.append((right, native_lang))
+    return requests
 
-        else:
-            # LEARN-LANG -> End Sound
-            final_audio += left_audio + AudioSegment.silent(duration=800)
 
-    final_audio.export(out_file, format="mp3")
+def generate_mp3_from_phrases(phrases, out_file, learn_lang, native_lang, cache=None, jobs=1, engine=None, debug_dir=None, clips=None, timing=None, encoding=None):
+    log.debug(f"start generate_mp3_from_phrases {learn_lang} -> {native_lang}")
+
+    engine = engine or get_engine("gtts")
+    timing = timing or get_timing_profile()
+    gap = timing["gap"]
+
+    # clips shared across sections of a run, or private to this file
+    clips = clips or ClipTable(engine, cache, jobs)
+    decoder = clips.decoder
+    end_sound = load_end_sound(timing["end_sound"], timing["end_sound_gain"],
+                               decoder.frame_rate, decoder.channels, decoder.sample_width)
+
+    # --- SYNTHESIS STAGE ---
+    # All unique clips are requested up front (concurrently when jobs > 1);
+    # assembly order doesn't depend on completion order, so the audio is
+    # identical to the sequential path.
+    requests = _clip_requests(phrases, learn_lang, native_lang)
+    clips.prefetch(requests)
+
+    if debug_dir:
+        # Only for debugging: keep every synthesized clip on disk
+        ensure_dir(debug_dir)
+        for n, (text, lang) in enumerate(requests):
+            with open(f"{debug_dir}/{n:04d}_{lang}.{engine.format}", "wb") as f:
+                f.write(clips.encoded(text, lang))
+        log.info(f"Clips saved to : {debug_dir}")
+
+    # --- ASSEMBLY STAGE ---
+    # PCM is streamed into the encoder as it is assembled (see StreamEncoder)
+    with StreamEncoder(out_file, encoding, decoder.frame_rate, decoder.channels, decoder.sample_width) as encoder:
+        assembler = PcmAssembler(decoder.frame_rate, decoder.channels, decoder.sample_width, sink=encoder)
+        assembler.append_silence(timing["lead_in"])
+
+        with span("assemble", phrases=len(phrases)):
+            for i, (left, right) in enumerate(phrases):
+                log.debug(f"Generating: {left} - {right}")
+        
+                left_audio = clips.pcm(left, learn_lang)
+
+                if right != "":
+                    # Means that exist phrases on both langs (learn lang - native lang)
+                    # Then generate left and right.
+                    right_audio = clips.pcm(right, native_lang)
+
+                    # LEARN-LANG -> NATIVE-LANG -> LEARN-LANG -> End Sound
+                    assembler.append(left_audio)
+                    assembler.append_silence(gap)
+                    assembler.append(right_audio)
+                    assembler.append_silence(gap)
+                    assembler.append(left_audio)
+                    assembler.append_silence(gap)
+                    assembler.append(end_sound)
+                    assembler.append_silence(timing["after_end_sound"])
 
-    remove_dir_if_exists(temp_dir)
+                else:
+                    # LEARN-LANG -> End Sound
+                    assembler.append(left_audio)
+                    assembler.append_silence(gap)
+            assembler.flush()
 
-    print(f"\nFinish! File saved: {out_file}")
+        with span("export", format=encoder.encoding["codec"]):
+            encoder.close()
+    count("audio.bytes_encoded", os.path.getsize(out_file))
 
+    log.debug(f"Finish! File saved: {out_file}")
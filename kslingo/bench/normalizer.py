@@ -0,0 +1,117 @@
+import argparse
+import random
+import re
+import time
+from kslingo.parsers.markdown import tokenize_markdown_line, DEFAULT_FLAGS
+from kslingo.parsers.markdown import LINE_BLANK, LINE_FENCE, LINE_HEADING, LINE_PHRASE, LINE_LEARN_ONLY, LINE_SKIP
+from kslingo.bench.vault import WORDS, NATIVE, SEPARATORS, LEVELS
+
+
+def legacy_tokenize_line(line: str):
+    """
+    Reference implementation: the per-line cleaning that get_phrases_markdown()
+    did before tokenize_markdown_line() (uncompiled patterns, <SEP> placeholder).
+    Returns the same (kind, flags, learn, native) tuple.
+    """
+    line = line.strip()
+    if not line:
+        return LINE_BLANK, None, None, None
+    if line.startswith("```"):
+        return LINE_FENCE, None, None, None
+
+    line = re.sub(r"\*\*(.*?)\*\*", r"\1", line)
+    line = re.sub(r"\*(.*?)\*", r"\1", line)
+    line = re.sub(r"^\s*-\s*", "", line)
+
+    line = line.strip()
+    line = re.sub(r"[–—−=]", " <SEP> ", line)
+    line = re.sub(r"(?<!\w)-{1}(?!\w)", " <SEP> ", line)
+    line = re.sub(r"\s*<SEP>\s*", " - ", line)
+    line = re.sub(r"\s{2,}", " ", line)
+    line = line.strip()
+
+    if line.startswith("###"):
+        return LINE_HEADING, None, line.lstrip("#").strip(), None
+
+    if " - " in line:
+        flags_match = re.match(r'^%%(?P<flags>.*?)%%\s*(.+)', line)
+        if flags_match:
+            flags_str = flags_match.group("flags")
+            content = re.sub(r"^\s*-\s*", "", flags_match.group(2))
+        else:
+            flags_str = DEFAULT_FLAGS
+            content = re.sub(r"^\s*-\s*", "", line)
+        hu, sr = content.rsplit(" - ", 1)
+        flags = [f.strip() for f in flags_str.split(",") if f.strip()]
+        return LINE_PHRASE, flags, hu.strip(), sr.strip()
+
+    if "%%" in line:
+        return LINE_SKIP, None, None, None
+    return LINE_LEARN_ONLY, DEFAULT_FLAGS.split(","), re.sub(r"^\s*-\s*", "", line), None
+
+
+def sample_lines(count: int, seed: int = 0) -> list[str]:
+    """
+    Generates a deterministic corpus of markdown lines in the shapes found in real vaults.
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for n in range(count):
+        i = rnd.randrange(len(WORDS))
+        left, right, sep = WORDS[i], NATIVE[i], rnd.choice(SEPARATORS)
+        shape = n % 10
+        if shape == 0:
+            lines.append(f"### SECTION {n}{sep}Odeljak {n}")
+        elif shape == 1:
+            lines.append(f"- *{left}*")
+        elif shape == 2:
+            lines.append("")
+        elif shape == 3:
+            lines.append(f"%%{rnd.choice(LEVELS)},P,E%% *I like to **{left}** history.{sep}{right}.*")
+        else:
+            flags = f"%%{rnd.choice(LEVELS)},{rnd.choice('WP')},{rnd.choice('ED')}%% "
+            bold = rnd.random() < 0.5
+            lines.append(f"- {flags}{'**' if bold else ''}{left}{'**' if bold else ''}{sep}{right} ")
+    return lines
+
+
+def bench_line_normalizer(count: int = 1_000_000, seed: int = 0) -> dict:
+    """
+    Times legacy_tokenize_line() against tokenize_markdown_line() on a synthetic
+    corpus and checks that both return identical results for every line.
+    """
+    lines = sample_lines(count, seed)
+
+    start = time.perf_counter()
+    legacy = [legacy_tokenize_line(line) for line in lines]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    current = [tokenize_markdown_line(line) for line in lines]
+    tokenizer_s = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+
+    return {
+        "lines": count,
+        "legacy_s": legacy_s,
+        "tokenizer_s": tokenizer_s,
+        "legacy_ns_per_line": legacy_s / count * 1e9,
+        "tokenizer_ns_per_line": tokenizer_s / count * 1e9,
+        "speedup": legacy_s / tokenizer_s if tokenizer_s else 0.0,
+        "mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Markdown line normalizer microbenchmark")
+    parser.add_argument("--lines", type=int, default=1_000_000, help="Corpus size (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0)")
+    args = parser.parse_args()
+
+    result = bench_line_normalizer(args.lines, args.seed)
+    print(f"lines      : {result['lines']}")
+    print(f"legacy     : {result['legacy_s']:.2f}s ({result['legacy_ns_per_line']:.0f} ns/line)")
+    print(f"tokenizer  : {result['tokenizer_s']:.2f}s ({result['tokenizer_ns_per_line']:.0f} ns/line)")
+    print(f"speedup    : {result['speedup']:.2f}x")
+    print(f"mismatches : {result['mismatches']}")
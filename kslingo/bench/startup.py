@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+
+# Modules that must not be imported by the fast commands
+HEAVY_MODULES = ["gtts", "pydub", "openpyxl", "markdown", "weasyprint", "pandas"]
+
+DEFAULT_BUDGET_MS = 150
+
+
+def import_times(args: list[str]) -> dict:
+    """
+    Runs `python -X importtime -m kslingo <args>` and parses its report.
+
+    Returns:
+        dict: {module name: (cumulative import time in microseconds, nesting level)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "kslingo", *args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"kslingo {' '.join(args)} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(cumulative), level)
+    return times
+
+
+def check_startup(budget_ms: float = DEFAULT_BUDGET_MS) -> list[dict]:
+    """
+    Measures the import cost of `kslingo --version` and of the markdown
+    reparse command, and checks it against a budget.
+
+    A command fails if it imports one of HEAVY_MODULES or if importing the
+    kslingo package and CLI takes longer than `budget_ms`.
+
+    Returns:
+        list[dict]: One result per command (command, kslingo_ms, heavy, ok).
+    """
+    with tempfile.TemporaryDirectory(prefix="kslingo_startup_") as tmp:
+        md_file = os.path.join(tmp, "in.md")
+        with open(md_file, "w", encoding="utf-8") as f:
+            f.write("### hello - zdravo\n- **hello** - zdravo\n")
+
+        commands = [
+            ["--version"],
+            ["-q", "parse", "only-reparse-markdown", "-i", md_file, "-o", os.path.join(tmp, "out.md")],
+        ]
+
+        results = []
+        for args in commands:
+            times = import_times(args)
+            # top-level kslingo imports include everything they pull in
+            kslingo_us = sum(us for name, (us, level) in times.items()
+                             if level == 0 and name.split(".")[0] == "kslingo")
+            heavy = [name for name in HEAVY_MODULES if name in times]
+            kslingo_ms = kslingo_us / 1000
+            results.append({
+                "command": " ".join(args[:3]),
+                "kslingo_ms": kslingo_ms,
+                "heavy": heavy,
+                "ok": not heavy and kslingo_ms <= budget_ms,
+            })
+        return results
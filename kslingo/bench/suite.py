@@ -0,0 +1,240 @@
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from kslingo.version import __version__
+from kslingo.bench.vault import generate_vault
+from kslingo.parsers.markdown import iter_sections_markdown, just_only_reparse_md
+from kslingo.utils.fs import ensure_dir
+from kslingo.utils.log import LOGGER_NAME, get_logger
+
+
+log = get_logger(__name__)
+
+
+BENCH_VERSION = 1
+
+LEARN_LANG = "en"
+NATIVE_LANG = "sr"
+
+
+def _stage_parse(ctx):
+    sections = list(iter_sections_markdown(ctx["md"], LEARN_LANG, NATIVE_LANG))
+    ctx["sections"] = len(sections)
+    ctx["phrases"] = sum(len(sec["phrases"]) for sec in sections)
+
+
+def _stage_reparse(ctx):
+    just_only_reparse_md(ctx["md"], os.path.join(ctx["work_dir"], "reparsed.md"))
+
+
+# Converters and the audio pipeline are imported by their stage, so importing
+# this module (for the CLI) stays cheap
+
+def _stage_md2json(ctx):
+    from kslingo.convert.file import Convert_md2json
+    Convert_md2json(ctx["md"], ctx["json"], LEARN_LANG, NATIVE_LANG)
+
+
+def _stage_json2md(ctx):
+    from kslingo.convert.file import Convert_json2md
+    Convert_json2md(ctx["json"], os.path.join(ctx["work_dir"], "json2md.md"), LEARN_LANG, NATIVE_LANG)
+
+
+def _stage_json2xlsx(ctx):
+    from kslingo.convert.file import Convert_json2xlsx
+    Convert_json2xlsx(ctx["json"], ctx["xlsx"])
+
+
+def _stage_xlsx2json(ctx):
+    from kslingo.convert.file import Convert_xlsx2json
+    Convert_xlsx2json(ctx["xlsx"], os.path.join(ctx["work_dir"], "xlsx2json.json"))
+
+
+def _stage_compile(ctx):
+    from kslingo.convert.file import Compile_deck
+    Compile_deck(ctx["md"], ctx["deck"], LEARN_LANG, NATIVE_LANG, force=True)
+
+
+def _stage_deck2md(ctx):
+    from kslingo.convert.file import Convert_json2md
+    Convert_json2md(ctx["deck"], os.path.join(ctx["work_dir"], "deck2md.md"), LEARN_LANG, NATIVE_LANG)
+
+
+def _stage_pdf(ctx):
+    from kslingo.convert.file import Generate_pdf_from_md
+    Generate_pdf_from_md(ctx["md"], os.path.join(ctx["work_dir"], "vault.pdf"))
+
+
+def _stage_audio(ctx):
+    from kslingo.audio.tts import Generate_Markdown_Audio_mp3
+    from kslingo.audio.engines import get_engine
+
+    # Cold build every run: fresh output dir, no clip cache
+    out_dir = os.path.join(ctx["work_dir"], "audio")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    Generate_Markdown_Audio_mp3(ctx["md"], out_dir, LEARN_LANG, NATIVE_LANG,
+                                engine=get_engine("fake"), force=True)
+
+
+# Stage name: (function, stage whose output it reads)
+STAGES = {
+    "parse": (_stage_parse, None),
+    "reparse": (_stage_reparse, None),
+    "md2json": (_stage_md2json, None),
+    "json2md": (_stage_json2md, "md2json"),
+    "json2xlsx": (_stage_json2xlsx, "md2json"),
+    "xlsx2json": (_stage_xlsx2json, "json2xlsx"),
+    "compile": (_stage_compile, None),
+    "deck2md": (_stage_deck2md, "compile"),
+    "pdf": (_stage_pdf, None),
+    "audio": (_stage_audio, None),
+}
+
+
+@contextlib.contextmanager
+def _quiet(verbose: bool):
+    # Stage output is limited to warnings and errors unless verbose
+    logger = logging.getLogger(LOGGER_NAME)
+    level = logger.level
+    if not verbose:
+        logger.setLevel(max(level, logging.WARNING))
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def run_bench(
+    stages: list[str] | None = None,
+    input_file: str | None = None,
+    repeat: int = 3,
+    work_dir: str | None = None,
+    verbose: bool = False,
+    **vault_options,
+) -> dict:
+    """
+    Times every pipeline stage on a synthetic (or given) markdown vault.
+
+    Stages run in STAGES order. A stage that reads another stage's output runs
+    that stage first, untimed, if it wasn't selected. A stage that fails (e.g.
+    ffmpeg or pango missing) is reported with its error and doesn't stop the run.
+
+    Args:
+        stages (list[str] | None): Stage names to time (default: all).
+        input_file (str | None): Benchmark this markdown file instead of a synthetic vault.
+        repeat (int): Timed runs per stage.
+        work_dir (str | None): Directory for stage outputs (default: a temp dir, removed afterwards).
+        verbose (bool): Show the output of the stages.
+        **vault_options: Options for generate_vault (sections, phrases, seed, ...).
+
+    Returns:
+        dict: Environment, input description and per-stage timings.
+    """
+    stages = stages or list(STAGES)
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown bench stage(s) {', '.join(unknown)}. Choose from: {', '.join(STAGES)}")
+
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="kslingo_bench_")
+    ensure_dir(work_dir)
+
+    ctx = {
+        "work_dir": work_dir,
+        "md": os.path.join(work_dir, "vault.md"),
+        "json": os.path.join(work_dir, "md2json.json"),
+        "xlsx": os.path.join(work_dir, "json2xlsx.xlsx"),
+        "deck": os.path.join(work_dir, "vault.kdeck"),
+    }
+
+    try:
+        if input_file:
+            shutil.copyfile(input_file, ctx["md"])
+            vault = {"source": input_file, "bytes": os.path.getsize(ctx["md"])}
+        else:
+            vault = {"source": "synthetic", "options": vault_options, **generate_vault(ctx["md"], **vault_options)}
+
+        # Vault statistics (also warms up imports and the file cache)
+        with _quiet(verbose):
+            _stage_parse(ctx)
+        vault["sections"] = ctx["sections"]
+        vault["phrases"] = ctx["phrases"]
+
+        results = {}
+        done = set()
+
+        def prepare(name):
+            dependency = STAGES[name][1]
+            if dependency and dependency not in done:
+                prepare(dependency)
+                with _quiet(verbose):
+                    STAGES[dependency][0](ctx)
+                done.add(dependency)
+
+        for name in STAGES:
+            if name not in stages:
+                continue
+            func = STAGES[name][0]
+            runs = []
+            try:
+                prepare(name)
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    with _quiet(verbose):
+                        func(ctx)
+                    runs.append(time.perf_counter() - start)
+                done.add(name)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+
+            best = min(runs)
+            results[name] = {
+                "runs_s": runs,
+                "min_s": best,
+                "median_s": statistics.median(runs),
+                "phrases_per_s": vault["phrases"] / best if best else 0.0,
+            }
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "bench_version": BENCH_VERSION,
+        "kslingo_version": __version__,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "vault": vault,
+        "stages": results,
+    }
+
+
+def write_report(report: dict, json_path: str) -> None:
+    parent = os.path.dirname(json_path)
+    if parent:
+        ensure_dir(parent)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def print_report(report: dict) -> None:
+    vault = report["vault"]
+    log.info(f"Vault   : {vault['source']}, {vault['sections']} sections, {vault['phrases']} phrases, "
+             f"{vault['bytes'] / 1024:.0f} KB")
+    for name, result in report["stages"].items():
+        if "error" in result:
+            log.warning(f"{name:<10}: FAILED ({result['error']})")
+        else:
+            log.info(f"{name:<10}: {result['min_s'] * 1000:9.1f} ms min, {result['median_s'] * 1000:9.1f} ms median, "
+                     f"{result['phrases_per_s']:10.0f} phrases/s")
@@ -0,0 +1,140 @@
+import random
+
+
+WORDS = ["ambitious", "chatty", "easy-going", "hard-working", "team-mate", "kind-hearted",
+         "read about", "talk about", "stranger", "open", "lazy", "have the same sense of humor"]
+NATIVE = ["ambiciozan", "pričljiv", "opušten", "vredan", "član tima", "dobrog srca",
+          "čitati o nečemu", "pričati o", "stranac", "otvoren, iskren", "lenj", "imati isti smisao za humor"]
+SEPARATORS = [" - ", " – ", " — ", " = ", " − "]
+LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+
+LEARN_SYLLABLES = ["ka", "ro", "ten", "mi", "sha", "lo", "ver", "dan", "pe", "tri", "gos", "ul"]
+NATIVE_SYLLABLES = ["ča", "ro", "đe", "mi", "ša", "lo", "ve", "žan", "pe", "ći", "go", "nj"]
+
+
+def _word(rnd: random.Random, syllables: list[str]) -> str:
+    return "".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 4)))
+
+
+def _phrase(rnd: random.Random, syllables: list[str]) -> str:
+    words = [_word(rnd, syllables) for _ in range(rnd.randint(1, 4))]
+    # compound words must survive separator normalization
+    if len(words) > 1 and rnd.random() < 0.2:
+        words[0] = f"{words[0]}-{words[1]}"
+        del words[1]
+    return " ".join(words)
+
+
+def vault_lines(
+    sections: int = 20,
+    phrases: int = 25,
+    seed: int = 0,
+    flag_ratio: float = 0.8,
+    unicode_ratio: float = 0.5,
+    code_blocks: float = 0.2,
+):
+    """
+    Yields the lines of a deterministic synthetic markdown vault.
+
+    Every section has a '### learn - native' heading and `phrases` phrase lines
+    mixing explicit %%flags%%, default flags, bold/italic markup, learn-only
+    lines and '%%' comments, as found in real vaults.
+
+    Args:
+        sections (int): Number of sections.
+        phrases (int): Phrase lines per section.
+        seed (int): Random seed; the same arguments always give the same vault.
+        flag_ratio (float): Share of phrase lines with an explicit %%flags%% prefix.
+        unicode_ratio (float): Share of separators that are – — − or = instead of ' - '.
+        code_blocks (float): Chance of a fenced code block (with phrase-like content) after a section.
+    """
+    rnd = random.Random(seed)
+
+    def separator():
+        return rnd.choice(SEPARATORS[1:]) if rnd.random() < unicode_ratio else SEPARATORS[0]
+
+    for s in range(sections):
+        yield f"### SECTION {s} {_word(rnd, LEARN_SYLLABLES).upper()}{separator()}Odeljak {s} {_word(rnd, NATIVE_SYLLABLES)}"
+
+        for _ in range(phrases):
+            learn = _phrase(rnd, LEARN_SYLLABLES)
+            native = _phrase(rnd, NATIVE_SYLLABLES)
+            shape = rnd.random()
+
+            if shape < 0.05:
+                yield f"- *{learn}*"
+                continue
+            if shape < 0.08:
+                yield f"%% note: {learn} %%"
+                continue
+
+            if rnd.random() < 0.5:
+                learn = f"**{learn}**"
+            prefix = "- " if rnd.random() < 0.7 else ""
+            if rnd.random() < flag_ratio:
+                flags = f"%%{rnd.choice(LEVELS)},{rnd.choice('WP')},{rnd.choice('ED')}%% "
+                line = f"{prefix}{flags}{learn}{separator()}{native}"
+            else:
+                line = f"{prefix}{learn}{separator()}{native}"
+            yield line + (" " if rnd.random() < 0.3 else "")
+
+        yield ""
+        if rnd.random() < code_blocks:
+            yield "```"
+            yield f"{_phrase(rnd, LEARN_SYLLABLES)} - {_phrase(rnd, NATIVE_SYLLABLES)}"
+            yield "### not a heading"
+            yield "```"
+            yield ""
+
+
+def generate_vault(path: str, **options) -> dict:
+    """
+    Writes a synthetic vault (see vault_lines) to a markdown file.
+
+    Returns:
+        dict: Size of the written vault (lines, bytes).
+    """
+    lines = 0
+    size = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for line in vault_lines(**options):
+            data = f"{line}\n"
+            f.write(data)
+            lines += 1
+            size += len(data.encode("utf-8"))
+    return {"lines": lines, "bytes": size}
+
+
+def deck_blocks(phrases: int = 100_000, per_category: int = 25, seed: int = 0, langs: list[str] | None = None):
+    """
+    Yields the category blocks of a deterministic synthetic JSON deck
+    (the md2json format), with `phrases` phrases in total.
+
+    Args:
+        phrases (int): Number of phrases.
+        per_category (int): Phrases per category.
+        seed (int): Random seed.
+        langs (list[str] | None): Translation languages (default: supported languages);
+            the first gets learn-language text, the others native-language text.
+    """
+    from kslingo.support import get_supported_languages
+
+    rnd = random.Random(seed)
+    langs = langs or get_supported_languages()
+
+    def translations():
+        return {lang: _phrase(rnd, LEARN_SYLLABLES if i == 0 else NATIVE_SYLLABLES) for i, lang in enumerate(langs)}
+
+    for start in range(0, phrases, per_category):
+        yield {
+            "category": translations(),
+            "phrases": [
+                {
+                    "level": rnd.choice(LEVELS),
+                    "enabled": rnd.random() < 0.5,
+                    "isword": rnd.random() < 0.5,
+                    "translations": translations(),
+                }
+                for _ in range(min(per_category, phrases - start))
+            ],
+        }
@@ -0,0 +1,225 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from kslingo.bench.vault import deck_blocks
+from kslingo.parsers.json import JsonArrayWriter
+from kslingo.support import get_supported_languages
+
+
+def legacy_json2xlsx(json_path: str, xlsx_path: str) -> None:
+    """
+    Reference implementation: Convert_json2xlsx() before write-only mode
+    (full in-memory workbook, styles set per cell, conditional formatting
+    added and the workbook saved twice).
+    """
+    from openpyxl import Workbook
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+    from openpyxl.utils import get_column_letter
+
+    supported_langs = get_supported_languages()
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    wb = Workbook()
+    ws = wb.active
+
+    category_font = Font(size=13, bold=True)
+    phrase_font = Font(size=12, bold=False)
+
+    category_fill = PatternFill(fill_type="solid", fgColor="D9EAF7")
+    red_fill = PatternFill(fill_type="solid", fgColor="FFC7CE")
+    green_fill = PatternFill(fill_type="solid", fgColor="C6EFCE")
+
+    gray_border = Border(
+        left=Side(style="thin", color="B0B0B0"),
+        right=Side(style="thin", color="B0B0B0"),
+        top=Side(style="thin", color="B0B0B0"),
+        bottom=Side(style="thin", color="B0B0B0")
+    )
+
+    # Header row
+    header_row = ["Enabled", "Level", "IsWord"] + [lang.upper() for lang in supported_langs]
+    ws.append(header_row)
+    ws.freeze_panes = "A2"
+
+    # Set fixed width on language columns
+    for i, lang in enumerate(supported_langs, start=4):  # Columns D, E, ...
+        col_letter = get_column_letter(i)
+        ws.column_dimensions[col_letter].width = 30
+
+    # Center align header
+    for cell in ws[1]:
+        cell.alignment = Alignment(horizontal="center")
+
+    for block in data:
+        category = block["category"]
+        phrases = block["phrases"]
+
+        # CATEGORY ROW
+        category_row = ["", "", ""] + [category.get(lang, "") for lang in supported_langs]
+        ws.append(category_row)
+
+        for cell in ws[ws.max_row]:
+            cell.font = category_font
+            cell.fill = category_fill
+            cell.border = gray_border
+
+        # PHRASES
+        for phrase in phrases:
+            row = [
+                "1" if phrase.get("enabled", False) else "0",
+                phrase.get("level", ""),
+                "1" if phrase.get("isword", False) else "0",
+            ] + [
+                phrase["translations"].get(lang, "") for lang in supported_langs
+            ]
+
+            ws.append(row)
+            current_row = ws[ws.max_row]
+            is_disabled = row[0] == "0"
+
+            for i, cell in enumerate(current_row, start=1):
+                cell.border = gray_border
+                cell.font = phrase_font
+                if i in (1, 2, 3):  # Enabled, Level, IsWord
+                    cell.alignment = Alignment(horizontal="center")
+
+                cell.fill = red_fill if is_disabled else green_fill
+
+        # Empty row between categories
+        ws.append([])
+
+    # Conditional formatting
+    max_row = ws.max_row
+    last_col = get_column_letter(3 + len(supported_langs))  # Example: "F", "G", ...
+    ws.conditional_formatting.add(
+        f"A2:{last_col}{max_row}",
+        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=1)'], fill=green_fill)
+    )
+    ws.conditional_formatting.add(
+        f"A2:{last_col}{max_row}",
+        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=0)'], fill=red_fill)
+    )
+
+    wb.save(xlsx_path)
+
+
+
+    # Dodaj uslovno formatiranje koje reaguje na vrednost A u svakom redu
+    max_row = ws.max_row
+    ws.conditional_formatting.add(
+        f"A2:F{max_row}",
+        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=1)'], fill=green_fill)
+    )
+
+    ws.conditional_formatting.add(
+        f"A2:F{max_row}",
+        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=0)'], fill=red_fill)
+    )
+
+    # Save to XLSX file
+    wb.save(xlsx_path)
+
+
+EXPORTERS = {
+    "legacy": legacy_json2xlsx,
+    "write-only": None,   # Convert_json2xlsx, imported in the measuring process
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024)
+
+
+def _measure(name: str, json_path: str, xlsx_path: str, results) -> None:
+    # Runs in a fresh process, so peak memory belongs to one export only
+    from kslingo.convert.file import Convert_json2xlsx
+    import openpyxl  # noqa: F401 (import cost isn't export memory)
+
+    export = EXPORTERS[name] or Convert_json2xlsx
+    with open(json_path, encoding="utf-8") as f:
+        # the deck itself is loaded by both exporters; measure it apart
+        json.load(f)
+    loaded_mb = _peak_rss_mb()
+
+    start = time.perf_counter()
+    export(json_path, xlsx_path)
+    results.put({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": _peak_rss_mb(),
+        "deck_rss_mb": loaded_mb,
+    })
+
+
+def _sheet_rows(xlsx_path: str):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True)
+    try:
+        for row in wb.active.iter_rows(values_only=True):
+            # empty rows are stored differently by the two writers
+            row = list(row or ())
+            while row and row[-1] is None:
+                row.pop()
+            yield tuple(row)
+    finally:
+        wb.close()
+
+
+def bench_xlsx_export(phrases: int = 50_000, seed: int = 0, exporters: list[str] | None = None,
+                      work_dir: str | None = None, check: bool = True) -> dict:
+    """
+    Times the XLSX exporters on a synthetic deck and measures their peak
+    memory, each in its own process. With check, the sheets of all exporters
+    must hold the same cell values.
+    """
+    exporters = exporters or list(EXPORTERS)
+    with tempfile.TemporaryDirectory(prefix="kslingo_xlsx_", dir=work_dir) as tmp:
+        json_path = os.path.join(tmp, "deck.json")
+        with JsonArrayWriter(json_path) as writer:
+            for block in deck_blocks(phrases, seed=seed):
+                writer.write(block)
+
+        context = multiprocessing.get_context("spawn")
+        results = {"phrases": phrases, "langs": len(get_supported_languages()),
+                   "json_mb": os.path.getsize(json_path) / (1024 * 1024), "exporters": {}}
+        for name in exporters:
+            xlsx_path = os.path.join(tmp, f"{name}.xlsx")
+            queue = context.Queue()
+            process = context.Process(target=_measure, args=(name, json_path, xlsx_path, queue))
+            process.start()
+            result = queue.get()
+            process.join()
+            result["xlsx_mb"] = os.path.getsize(xlsx_path) / (1024 * 1024)
+            results["exporters"][name] = result
+
+        if check and len(exporters) > 1:
+            sheets = [_sheet_rows(os.path.join(tmp, f"{name}.xlsx")) for name in exporters]
+            results["mismatched_rows"] = sum(1 for rows in itertools.zip_longest(*sheets, fillvalue=()) if any(row != rows[0] for row in rows))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="XLSX export benchmark: legacy vs write-only")
+    parser.add_argument("--phrases", type=int, default=50_000, help="Deck size (default: 50000)")
+    parser.add_argument("--seed", type=int, default=0, help="Deck seed (default: 0)")
+    parser.add_argument("--exporters", default=",".join(EXPORTERS), help=f"Comma separated (default: {','.join(EXPORTERS)})")
+    parser.add_argument("--no-check", action="store_true", help="Don't compare the exported cell values")
+    args = parser.parse_args()
+
+    result = bench_xlsx_export(args.phrases, args.seed, args.exporters.split(","), check=not args.no_check)
+    print(f"phrases    : {result['phrases']} x {result['langs']} languages ({result['json_mb']:.1f} MB JSON)")
+    for name, r in result["exporters"].items():
+        print(f"{name:<11}: {r['seconds']:7.2f}s, peak RSS {r['peak_rss_mb']:7.1f} MB "
+              f"(+{r['peak_rss_mb'] - r['deck_rss_mb']:.1f} MB over the loaded deck), {r['xlsx_mb']:.1f} MB xlsx")
+    if "mismatched_rows" in result:
+        print(f"mismatches : {result['mismatched_rows']} rows")
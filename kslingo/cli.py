@@ -1,25 +1,109 @@
 import argparse
 import os
 from kslingo.version import __version__
-from kslingo.audio.tts import Generate_Txt_Audio_mp3, Generate_Markdown_Audio_mp3
 from kslingo.utils.fs import ensure_dir
-from kslingo.convert.file import Convert_json2md, Convert_md2json, Convert_json2xlsx, Convert_xlsx2json
-from kslingo.parsers.markdown import just_only_reparse_md
+from kslingo.audio.cache import ClipCache
+from kslingo.audio.engines import ENGINES, get_engine
+from kslingo.audio.assets import TIMING_PROFILES, get_timing_profile
+from kslingo.audio.encoder import CODECS, get_encoding
+from kslingo.bench.suite import STAGES, run_bench, write_report, print_report
+from kslingo.bench.vault import generate_vault
+from kslingo.bench.startup import DEFAULT_BUDGET_MS, check_startup
+from kslingo.model import PhraseQuery
+from kslingo.utils.batch import parse_shard
+from kslingo.utils.profiling import profiler, stage
+from kslingo.utils.log import get_logger, setup_logging
+
+# Only lightweight modules are imported here. Command handlers import the
+# audio pipeline and converters (pydub, openpyxl, markdown, WeasyPrint) when
+# they run, so --version and the parse commands start fast.
+
+log = get_logger(__name__)
 
 def main():
     parser = argparse.ArgumentParser(prog="kslingo", description="Multilingual audio generator and converter")
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="More output (-v: debug messages)")
+    parser.add_argument("-q", "--quiet", action="count", default=0, help="Less output (-q: warnings and errors only, -qq: errors only)")
+    parser.add_argument("--log-json", action="store_true", help="Write log messages and progress as JSON lines")
+    parser.add_argument("--profile", metavar="FILE", help="Write a trace of the run (Chrome trace JSON, opens in Perfetto/speedscope)")
+    parser.add_argument("--cprofile", metavar="DIR", help="Also dump cProfile stats per stage to DIR/<stage>.prof")
     
     subparsers = parser.add_subparsers(dest="command", required=True)
     
     # === AUDIO COMMAND ===
     audio_parser = subparsers.add_parser("audio", help="Generate audio from txt or markdown.")
-    audio_parser.add_argument("--txt", metavar="FILE", help="Run in simple txt mode.")
-    audio_parser.add_argument("--markdown", metavar="FILE", help="Run in markdown mode.")
+    audio_input = audio_parser.add_mutually_exclusive_group(required=True)
+    audio_input.add_argument("--txt", metavar="FILE", help="Run in simple txt mode.")
+    audio_input.add_argument("--markdown", metavar="FILE", help="Run in markdown mode (a markdown file or a compiled deck).")
+    audio_input.add_argument("--vault", metavar="DIR", help="Batch markdown mode: every .md file under DIR, output mirrored under -o")
     audio_parser.add_argument("-o", metavar="DIR", default="output", help="Output directory (default: ./output)")
     audio_parser.add_argument("-learn", required=True, help="Language you are learning")
     audio_parser.add_argument("-native", required=True, help="Your native language")
+    audio_parser.add_argument("--cache-dir", metavar="DIR", help="Clip cache directory (default: ~/.cache/kslingo/clips)")
+    audio_parser.add_argument("--no-cache", action="store_true", help="Always synthesize clips, don't use the clip cache")
+    audio_parser.add_argument("--jobs", type=int, default=1, metavar="N", help="Number of concurrent TTS requests (default: 1)")
+    audio_parser.add_argument("--procs", type=int, default=1, metavar="N", help="Render markdown sections in N processes (0 = all cores, default: 1)")
+    audio_parser.add_argument("--force", action="store_true", help="Rebuild every section, ignoring the build manifest")
+    audio_parser.add_argument("--keep-clips", metavar="DIR", help="Debug: also save every synthesized clip to DIR")
+    audio_parser.add_argument("--timing", default="default", metavar="PROFILE", help=f"Timing profile: {', '.join(TIMING_PROFILES)} or a .json file (default: default)")
+    audio_parser.add_argument("--end-sound", metavar="FILE", help="Sound played after every phrase pair (default: assets/end_sound.wav)")
+    audio_parser.add_argument("--engine", choices=list(ENGINES), default="gtts", help="TTS engine (default: gtts)")
+    audio_parser.add_argument("--codec", choices=list(CODECS), default="mp3", help="Output codec (default: mp3)")
+    audio_parser.add_argument("--bitrate", metavar="RATE", help="Encoder bitrate, e.g. 64k (constant for mp3, VBR target for opus)")
+    audio_parser.add_argument("--vbr", type=int, metavar="Q", help="mp3 VBR quality, 0 (best) to 9 (smallest), instead of --bitrate")
+    audio_parser.add_argument("--channels", type=int, choices=[1, 2], help="Output channels (1 = mono downmix, default: as synthesized)")
+    audio_parser.add_argument("--sample-rate", type=int, metavar="HZ", help="Output sample rate (default: as synthesized)")
+    audio_parser.add_argument("--level", metavar="LEVELS", help="Only phrases of these comma separated levels (e.g. A1,A2)")
+    audio_parser.add_argument("--enabled-only", action="store_true", help="Only enabled phrases (E flag)")
+    audio_parser.add_argument("--words-only", action="store_true", help="Only words (W flag)")
+    audio_parser.add_argument("--translated-only", action="store_true", help="Skip phrases without a translation")
+    audio_parser.add_argument("--shard", metavar="K/N", help="Render only shard K of N (sections split by title, the same on every machine)")
+    add_watch_arguments(audio_parser, "--markdown FILE")
+    
+    # === CACHE COMMAND ===
+    cache_parser = subparsers.add_parser("cache", help="Inspect or clean the TTS clip cache")
+    cache_parser.add_argument("cache_command", choices=["stats", "prune", "clear"], help="Cache action")
+    cache_parser.add_argument("--cache-dir", metavar="DIR", help="Clip cache directory (default: ~/.cache/kslingo/clips)")
+    cache_parser.add_argument("--max-size", type=float, metavar="MB", help="prune: keep the cache below this size")
+    cache_parser.add_argument("--max-age", type=float, metavar="DAYS", help="prune: remove clips unused for this many days")
     
+    # === BENCH COMMAND ===
+    bench_parser = subparsers.add_parser("bench", help="Benchmark the pipeline stages on a synthetic vault")
+    bench_parser.add_argument("-o", metavar="FILE", default="output/bench.json", help="JSON results file (default: output/bench.json)")
+    bench_parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma separated stages (default: {','.join(STAGES)})")
+    bench_parser.add_argument("--repeat", type=int, default=3, metavar="N", help="Timed runs per stage (default: 3)")
+    bench_parser.add_argument("--input", metavar="FILE", help="Benchmark this markdown file instead of a synthetic vault")
+    bench_parser.add_argument("--generate", metavar="FILE", help="Only write the synthetic vault to FILE and exit")
+    bench_parser.add_argument("--work-dir", metavar="DIR", help="Keep stage outputs in DIR (default: temp dir)")
+    bench_parser.add_argument("--sections", type=int, default=20, metavar="N", help="Synthetic vault: number of sections (default: 20)")
+    bench_parser.add_argument("--phrases", type=int, default=25, metavar="N", help="Synthetic vault: phrases per section (default: 25)")
+    bench_parser.add_argument("--seed", type=int, default=0, help="Synthetic vault: random seed (default: 0)")
+    bench_parser.add_argument("--flag-ratio", type=float, default=0.8, metavar="F", help="Synthetic vault: share of lines with %%%%flags%%%% (default: 0.8)")
+    bench_parser.add_argument("--unicode-ratio", type=float, default=0.5, metavar="F", help="Synthetic vault: share of – — − = separators (default: 0.5)")
+    bench_parser.add_argument("--code-blocks", type=float, default=0.2, metavar="F", help="Synthetic vault: chance of a code block per section (default: 0.2)")
+    bench_parser.add_argument("--verbose", action="store_true", help="Show the output of the benchmarked stages")
+    bench_parser.add_argument("--startup", action="store_true", help="Check CLI startup: no heavy imports and kslingo import time within --budget-ms")
+    bench_parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, metavar="MS", help=f"Startup import time budget (default: {DEFAULT_BUDGET_MS})")
+
+    # === SERVE COMMAND ===
+    serve_parser = subparsers.add_parser("serve", help="Run a warm local server with a parse/convert/audio job queue (JSON over HTTP)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765, 0 = any free port)")
+    serve_parser.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket instead of a TCP port")
+    serve_parser.add_argument("--workers", type=int, default=1, metavar="N", help="Jobs running at the same time (default: 1)")
+    serve_parser.add_argument("--max-queue", type=int, default=100, metavar="N", help="Jobs allowed to wait; more are refused with 503 (default: 100)")
+    serve_parser.add_argument("--cache-dir", metavar="DIR", help="Clip cache directory (default: ~/.cache/kslingo/clips)")
+    serve_parser.add_argument("--jobs", type=int, default=1, metavar="N", help="Concurrent TTS requests per job (default: 1)")
+
+    # === COMPILE COMMAND ===
+    compile_parser = subparsers.add_parser("compile", help="Compile a markdown, JSON or XLSX deck to a binary deck that loads without parsing")
+    compile_parser.add_argument("-i", required=True, help="Input markdown, JSON, JSON lines or XLSX file")
+    compile_parser.add_argument("-o", metavar="DIR", default="output", help="Output directory (default: ./output), the deck is <DIR>/<input name>.kdeck")
+    compile_parser.add_argument("-learn", help="Language you are learning (required for markdown)")
+    compile_parser.add_argument("-native", help="Your native language (required for markdown)")
+    compile_parser.add_argument("--force", action="store_true", help="Compile even if the deck is up to date")
+
     # === CONVERT COMMAND ===
     convert_parser = subparsers.add_parser("convert", help="Convert between formats")
     convert_subparsers = convert_parser.add_subparsers(dest="convert_command", required=True)
@@ -31,7 +115,7 @@ def main():
 
     # --- JSON to MARKDOWN ---
     json2md_parser = convert_subparsers.add_parser("json2md", help="Convert JSON to Markdown")
-    json2md_parser.add_argument("-i", help="Input JSON file")
+    json2md_parser.add_argument("-i", help="Input JSON, JSON lines or compiled deck file")
     json2md_parser.add_argument("-o", metavar="DIR", default="output", help="Output directory (default: ./output)")
     json2md_parser.add_argument("-learn", required=True, help="First language")
     json2md_parser.add_argument("-native", required=True, help="Second language")
@@ -50,14 +134,25 @@ def main():
     
     # --- JSON to XLSX ---
     json2xlsx_parser = convert_subparsers.add_parser("json2xlsx", help="Convert JSON to XLSX")
-    json2xlsx_parser.add_argument("-i", help="Input json file")
+    json2xlsx_parser.add_argument("-i", help="Input JSON, JSON lines or compiled deck file")
     json2xlsx_parser.add_argument("-o", metavar="DIR", default="output", help="Output directory (default: ./output)")
 
     # --- XLSX to JSON ---
     xlsx2json_parser = convert_subparsers.add_parser("xlsx2json", help="Convert XLSX to JSON")
     xlsx2json_parser.add_argument("-i", help="Input xlsx file")
     xlsx2json_parser.add_argument("-o", metavar="DIR", default="output", help="Output directory (default: ./output)")
+    xlsx2json_parser.add_argument("--all-sheets", action="store_true", help="Convert every deck sheet, each to xlsx2json-<sheet>.json (default: the active sheet only)")
     
+    add_watch_arguments(md2json_parser, "-i FILE")
+
+    for json_output_parser in (md2json_parser, xlsx2json_parser):
+        json_output_parser.add_argument("--jsonl", action="store_true", help="Write JSON lines (.jsonl, one compact category per line) instead of a JSON array")
+
+    # --- batch options of every conversion ---
+    for conversion_parser in (json2md_parser, md2json_parser, json2xlsx_parser, xlsx2json_parser):
+        conversion_parser.add_argument("--glob", metavar="PATTERN", help="Batch mode: convert every file matching PATTERN ('**' for subdirectories), output mirrored under -o")
+        conversion_parser.add_argument("--procs", type=int, default=1, metavar="N", help="Batch mode: convert in N processes (0 = all cores, default: 1)")
+
     # # --- MD to MD ---
     # md2md_parser = convert_subparsers.add_parser("md2md", help="Convert MD to MD")
     # md2md_parser.add_argument("-i", help="Input md file")
@@ -66,33 +161,173 @@ def main():
 
     # --- PARSE MARKDOWN ---
     parse_parser = parse_subparsers.add_parser("only-reparse-markdown", help="Description...")
-    parse_parser.add_argument("-i", help="Input markdown file")
+    parse_parser.add_argument("-i", help="Input markdown file or compiled deck")
     parse_parser.add_argument("-o", default="output/Only-Reparsed.md", help="Output markdown file")
 
 
     args = parser.parse_args()
+    if getattr(args, "watch", False) and (args.command == "audio" and not args.markdown or getattr(args, "glob", None)):
+        parser.error("--watch needs a single markdown file (audio --markdown FILE or convert md2json -i FILE)")
+    if getattr(args, "watch", False):
+        from kslingo.parsers.deck import is_deck
+        if is_deck(args.markdown if args.command == "audio" else args.i):
+            parser.error("--watch needs a markdown file, not a compiled deck")
+    if args.command == "audio":
+        if args.txt and (args.level or args.enabled_only or args.words_only or args.translated_only or args.shard):
+            parser.error("--level, --enabled-only, --words-only, --translated-only and --shard need --markdown or --vault")
+        if args.shard and args.watch:
+            parser.error("--shard can't be used with --watch")
+        try:
+            args.shard = parse_shard(args.shard) if args.shard else None
+            args.encoding = get_encoding(args.codec, args.bitrate, args.vbr, args.channels, args.sample_rate)
+        except ValueError as e:
+            parser.error(str(e))
+        args.query = PhraseQuery(args.level.split(",") if args.level else None, args.enabled_only,
+                                 args.words_only, args.translated_only)
     
-    print(f"kslingo v{__version__}")
+    setup_logging(args.verbose - args.quiet, args.log_json)
+    log.info(f"kslingo v{__version__}")
+
+    if args.profile or args.cprofile:
+        profiler.enable(args.cprofile)
+
+    with stage(args.command):
+        run_command(args)
+
+    if profiler.enabled:
+        print_profile_summary()
+        trace_file = args.profile or os.path.join(args.cprofile, "trace.json")
+        profiler.write_trace(trace_file)
+        log.info(f"Profile trace saved to {trace_file}")
+
+
+def add_watch_arguments(parser, watched):
+    parser.add_argument("--watch", action="store_true", help=f"Rebuild after every save of {watched} (incremental), until Ctrl+C")
+    parser.add_argument("--watch-poll", action="store_true", help="Watch by polling instead of inotify (e.g. network drives)")
+    parser.add_argument("--debounce", type=int, default=300, metavar="MS", help="Wait until saves stop for MS ms before rebuilding (default: 300)")
+
+
+def print_profile_summary():
+    log.info("Profile:")
+    for name, (seconds, calls) in sorted(profiler.totals().items(), key=lambda item: -item[1][0]):
+        log.info(f"  {name:<20} {seconds:9.3f}s  {calls:6d} calls")
+    for name, value in sorted(profiler.counters.items()):
+        log.info(f"  {name:<20} {value}")
 
+
+def run_command(args):
     if args.command == "audio":
+        from kslingo.audio.tts import Generate_Txt_Audio_mp3, Generate_Markdown_Audio_mp3, Generate_Vault_Audio_mp3, Watch_Markdown_Audio_mp3
+
         ensure_dir(args.o)
+        cache = None if args.no_cache else ClipCache(args.cache_dir)
+        engine = get_engine(args.engine)
+        timing = get_timing_profile(args.timing, args.end_sound)
+        failed = False
         if args.txt:
-            print("Running in TXT mode")
-            Generate_Txt_Audio_mp3(args.txt, args.o, args.learn, args.native)
+            log.info("Running in TXT mode")
+            Generate_Txt_Audio_mp3(args.txt, args.o, args.learn, args.native, cache, args.jobs, engine, args.keep_clips, timing,
+                                   encoding=args.encoding)
+        elif args.markdown and args.watch:
+            log.info("Running in MARKDOWN mode, watching for changes")
+            Watch_Markdown_Audio_mp3(args.markdown, args.o, args.learn, args.native, cache, args.jobs, engine, args.procs, args.keep_clips, timing,
+                                     args.debounce / 1000, args.watch_poll, args.query, args.encoding)
         elif args.markdown:
-            print("Running in MARKDOWN mode")
-            Generate_Markdown_Audio_mp3(args.markdown, args.o, args.learn, args.native)
+            log.info("Running in MARKDOWN mode")
+            Generate_Markdown_Audio_mp3(args.markdown, args.o, args.learn, args.native, cache, args.jobs, engine, args.procs, args.force, args.keep_clips, timing,
+                                        query=args.query, shard=args.shard, encoding=args.encoding)
+        elif args.vault:
+            log.info("Running in VAULT mode")
+            results = Generate_Vault_Audio_mp3(args.vault, args.o, args.learn, args.native, cache, args.jobs, engine, args.procs, args.force, args.keep_clips, timing,
+                                               query=args.query, shard=args.shard, encoding=args.encoding)
+            failed = any(result["status"] == "failed" for result in results)
+
+        if cache is not None:
+            log.info(f"Clip cache: {cache.hits} hits, {cache.misses} misses")
+            cache.prune()
+        if failed:
+            raise SystemExit(1)
+
+    elif args.command == "cache":
+        cache = ClipCache(args.cache_dir)
+        if args.cache_command == "stats":
+            st = cache.stats()
+            log.info(f"Cache directory : {st['cache_dir']}")
+            log.info(f"Entries         : {st['entries']}")
+            log.info(f"Size            : {st['bytes'] / (1024 * 1024):.1f} MB")
+        elif args.cache_command == "prune":
+            max_bytes = int(args.max_size * 1024 * 1024) if args.max_size is not None else None
+            removed = cache.prune(max_bytes, args.max_age)
+            log.info(f"Pruned {removed} clips")
+        elif args.cache_command == "clear":
+            removed = cache.clear()
+            log.info(f"Removed {removed} clips")
+
+    elif args.command == "bench":
+        vault_options = {
+            "sections": args.sections,
+            "phrases": args.phrases,
+            "seed": args.seed,
+            "flag_ratio": args.flag_ratio,
+            "unicode_ratio": args.unicode_ratio,
+            "code_blocks": args.code_blocks,
+        }
+        if args.startup:
+            results = check_startup(args.budget_ms)
+            for result in results:
+                heavy = f", imports {', '.join(result['heavy'])}" if result["heavy"] else ""
+                status = "OK" if result["ok"] else "FAILED"
+                log.info(f"{status:<6} kslingo {result['command']}: {result['kslingo_ms']:.1f} ms (budget {args.budget_ms:.0f} ms){heavy}")
+            if not all(result["ok"] for result in results):
+                raise SystemExit(1)
+        elif args.generate:
+            info = generate_vault(args.generate, **vault_options)
+            log.info(f"Synthetic vault saved to {args.generate} ({info['lines']} lines, {info['bytes']} bytes)")
         else:
-            print("Error: --txt or --markdown is required with 'audio' command")
-            
+            stages = [name.strip() for name in args.stages.split(",") if name.strip()]
+            report = run_bench(stages, args.input, args.repeat, args.work_dir, args.verbose, **vault_options)
+            print_report(report)
+            write_report(report, args.o)
+            log.info(f"Benchmark results saved to {args.o}")
+
+    elif args.command == "serve":
+        from kslingo.serve.server import serve
+
+        serve(args.host, args.port, args.socket, args.workers, args.max_queue, args.cache_dir, args.jobs)
+
+    elif args.command == "compile":
+        from kslingo.convert.file import Compile_deck
+        from kslingo.parsers.deck import DECK_EXT
+
+        ensure_dir(args.o)
+        deck_file = os.path.join(args.o, os.path.splitext(os.path.basename(args.i))[0] + DECK_EXT)
+        try:
+            Compile_deck(args.i, deck_file, args.learn, args.native, args.force)
+        except ValueError as e:
+            log.error(str(e))
+            raise SystemExit(2)
+
     elif args.command == "convert":
+        from kslingo.convert.file import Convert_json2md, Convert_md2json, Convert_json2xlsx, Convert_xlsx2json, Convert_glob, Watch_md2json
+
         ensure_dir(args.o)
-        if args.convert_command == "json2md":
+        if args.glob:
+            results = Convert_glob(args.convert_command, args.glob, args.o,
+                                   getattr(args, "learn", None), getattr(args, "native", None), args.procs,
+                                   ".jsonl" if getattr(args, "jsonl", False) else None)
+            if any(result["status"] == "failed" for result in results):
+                raise SystemExit(1)
+
+        elif args.convert_command == "json2md":
             output_file = f"{args.o}/json2md.md"
             Convert_json2md(args.i, output_file, args.learn, args.native)
 
+        elif args.convert_command == "md2json" and args.watch:
+            output_file = f"{args.o}/md2json{'.jsonl' if args.jsonl else '.json'}"
+            Watch_md2json(args.i, output_file, args.learn, args.native, args.debounce / 1000, args.watch_poll)
+
         elif args.convert_command == "md2json":
-            output_file = f"{args.o}/md2json.json"
+            output_file = f"{args.o}/md2json{'.jsonl' if args.jsonl else '.json'}"
             Convert_md2json(args.i, output_file, args.learn, args.native)
             
         # elif args.convert_command == "json2csv":
@@ -104,18 +339,20 @@ def main():
             Convert_json2xlsx(args.i, output_file)
 
         elif args.convert_command == "xlsx2json":
-            output_file = f"{args.o}/xlsx2json.json"
-            Convert_xlsx2json(args.i, output_file)
+            output_file = f"{args.o}/xlsx2json{'.jsonl' if args.jsonl else '.json'}"
+            Convert_xlsx2json(args.i, output_file, args.all_sheets)
 
             
     elif args.command == "parse":
+        from kslingo.parsers.markdown import just_only_reparse_md
+
         # ensure_dir(args.o) # odnosi se na dir, a sad je file. FIX IT!
         if args.parse_command == "only-reparse-markdown":
-            print("Just only markdown reparsing")
+            log.info("Just only markdown reparsing")
             just_only_reparse_md(args.i,args.o)
 
          
         else:
-            print("Error: json2md or md2json json2csv is required with 'convert' command")
+            log.error("json2md or md2json json2csv is required with 'convert' command")
     else:
-        print("Please choose running mode 'audio' or 'convert'")
+        log.info("Please choose running mode 'audio' or 'convert'")
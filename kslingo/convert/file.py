@@ -1,4 +1,7 @@
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from kslingo.utils.fs import ensure_dir
 import re
@@ -8,29 +11,31 @@ from kslingo.utils.text import normalize_markdown_title
 from kslingo.utils.text import normalize_separator
 from kslingo.utils.text import extract_markdown_metadata
 from kslingo.utils.text import remove_between
-from openpyxl import Workbook
-from openpyxl.formatting.rule import FormulaRule
-from openpyxl.styles import Border, Side
-from openpyxl import load_workbook
-from collections import OrderedDict
-from kslingo.parsers.json import write_json
-from kslingo.parsers.markdown import get_phrases_markdown
-import markdown
-from weasyprint import HTML
+from kslingo.parsers.json import iter_json, json_writer_class
+from kslingo.model import PhraseTable, Section
+from kslingo.parsers.markdown import IncrementalMarkdownParser, get_phrases_markdown, iter_sections_markdown
+from kslingo.parsers.deck import DECK_EXT, file_sha256, is_deck, load_deck, write_deck
 from kslingo.support import get_supported_languages
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-from openpyxl.utils import get_column_letter
+from kslingo.utils.profiling import span, traced
+from kslingo.utils.log import get_logger, logging_config, setup_logging
+from kslingo.utils.batch import expand_glob, common_root, output_path, write_batch_summary
+from kslingo.utils.watch import DEFAULT_DEBOUNCE, FileWatcher
 import json
-import pandas as pd
 from collections import defaultdict
 
+
+log = get_logger(__name__)
+
+
+@traced("json2md", is_stage=True)
 def Convert_json2md(json_path: str, md_output_path: str, learn_lang: str, native_lang: str) -> None:
     """
-    Converts a JSON file into Markdown format with flags (%%A2,W,E%%).
+    Converts a JSON (or JSON lines) file or a compiled deck into Markdown format with flags (%%A2,W,E%%).
+    Category blocks are read and written one at a time.
     If enabled=True, the phrase in the learning language is bolded.
     If isword=True, the flag W is used; otherwise, the flag P is used.
     """
-    print("start Convert_json2md")
+    log.debug("start Convert_json2md")
 
     json_path = Path(json_path)
     md_output_path = Path(md_output_path)
@@ -38,66 +43,86 @@ def Convert_json2md(json_path: str, md_output_path: str, learn_lang: str, native
     if not json_path.is_file():
         raise FileNotFoundError(f"Input file '{json_path}' doesn't exist")
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Create dir if doesn't exist
+    md_output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    lines = []
+    with open(md_output_path, "w", encoding="utf-8") as f:
+        # sections are read and written one at a time
+        for i, section in enumerate(_iter_json_blocks(json_path)):
+            lines = []
+            category = section.get("category", {})
+            lines.append(f"### {category_heading(category, learn_lang, native_lang)}")
+
+            for phrase in section.get("phrases", []):
+                level = phrase.get("level", "A1")
+                enabled = phrase.get("enabled", False)
+                isword = phrase.get("isword", False)
+                translations = phrase.get("translations")
+
+                # skip if doesn't valid
+                if not isinstance(translations, dict):
+                    continue
+
+                left = translations.get(learn_lang) or translations.get("en")
+                right = translations.get(native_lang)
+                if not left or not right:
+                    continue
+
+                left = left.strip()
+                right = right.strip()
+                if not left or not right:
+                    continue
+
+                flag_w_p = "W" if isword else "P"
+                flag_e_d = "E" if enabled else "D"
+                flags = f"%%{level},{flag_w_p},{flag_e_d}%%"
+
+                # if enabled -> bold
+                if enabled:
+                    line = f"- {flags} **{left}** - {right}"
+                else:
+                    line = f"- {flags} {left} - {right}"
 
-    for section in data:
-        category = section.get("category", {})
+                lines.append(line)
 
-        # get learn language
-        cat_learn = category.get(learn_lang)
-        if not cat_learn:
-            cat_learn = category.get("en", "").strip()
-        cat_learn = cat_learn or "Unknown"
+            lines.append("")  # empty line between sections
+            f.write(("\n" if i else "") + "\n".join(lines))
 
-        # get native language
-        cat_native = category.get(native_lang, "").strip() or "Unknown"
+    log.info(f"Markdown file created: {md_output_path}")
 
-        lines.append(f"### {cat_learn} - {cat_native}")
+def category_heading(category: dict, learn_lang: str, native_lang: str) -> str:
+    """
+    Returns the '<learn> - <native>' heading of a JSON category
+    (English when the learn language is missing, "Unknown" when empty).
+    """
+    # get learn language
+    cat_learn = category.get(learn_lang)
+    if not cat_learn:
+        cat_learn = category.get("en", "").strip()
+    cat_learn = cat_learn or "Unknown"
 
-        for phrase in section.get("phrases", []):
-            level = phrase.get("level", "A1")
-            enabled = phrase.get("enabled", False)
-            isword = phrase.get("isword", False)
-            translations = phrase.get("translations")
+    # get native language
+    cat_native = category.get(native_lang, "").strip() or "Unknown"
+    return f"{cat_learn} - {cat_native}"
 
-            # skip if doesn't valid
-            if not isinstance(translations, dict):
-                continue
 
-            left = translations.get(learn_lang) or translations.get("en")
-            right = translations.get(native_lang)
-            if not left or not right:
-                continue
+def _iter_json_blocks(path: str):
+    # JSON category blocks of a JSON / JSON lines file or of a compiled deck
+    if not is_deck(path):
+        yield from iter_json(path)
+        return
 
-            left = left.strip()
-            right = right.strip()
-            if not left or not right:
+    supported_langs = get_supported_languages()
+    with load_deck(path) as deck:
+        for sec in deck:
+            if sec.category is not None:
+                yield sec.to_json_block(supported_langs)
                 continue
+            # compiled from markdown: same blocks as md2json
+            block = section_to_json_block(sec, deck.learn_lang, deck.native_lang, supported_langs)
+            if block:
+                yield block
 
-            flag_w_p = "W" if isword else "P"
-            flag_e_d = "E" if enabled else "D"
-            flags = f"%%{level},{flag_w_p},{flag_e_d}%%"
-
-            # if enabled -> bold
-            if enabled:
-                line = f"- {flags} **{left}** - {right}"
-            else:
-                line = f"- {flags} {left} - {right}"
-
-            lines.append(line)
-
-        lines.append("")  # empty line between sections
-
-    # Create dir if doesn't exist
-    md_output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(md_output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
-
-    print(f"Markdown file created: {md_output_path}")
 
 # def add_prefix_on_markdown(md_input_path: str, md_output_path: str, prefix: str = "%%A2,W,D%%") -> None:
 #     """
@@ -139,6 +164,7 @@ def Convert_json2md(json_path: str, md_output_path: str, learn_lang: str, native
 #     print(f"Created prefixed markdown file : {output_path}")
     
 
+@traced("md2json", is_stage=True)
 def Convert_md2json(
     md_input_path: str,
     json_output_path: str,
@@ -146,82 +172,143 @@ def Convert_md2json(
     native_lang: str,
 ) -> None:
     """
-    Converts parsed Markdown phrases (from get_phrases_markdown) into structured JSON.
+    Converts parsed Markdown phrases (from iter_sections_markdown) into structured JSON.
+
+    Sections are streamed: each one is converted and written as soon as it is
+    parsed, so memory use doesn't grow with the input size. A .jsonl output
+    gets one compact category block per line.
     """
 
-    print("start Convert_md2json")
+    log.debug("start Convert_md2json")
 
-    phrases = get_phrases_markdown(md_input_path, learn_lang, native_lang)
+    supported_langs = get_supported_languages()
+    ensure_dir(str(Path(json_output_path).parent))
+    parsed = 0
 
-    if not phrases:
-        print("ERROR: phrases is empty array!")
-        return
+    with json_writer_class(json_output_path)(json_output_path) as writer:
+        for i, sec in enumerate(iter_sections_markdown(md_input_path, learn_lang, native_lang)):
+            parsed += 1
+            log.debug(f"Section {i}: {sec['title']} ({len(sec['phrases'])} phrases)")
 
-    # Debug print
-    for i, sec in enumerate(phrases):
-        print(f"Section {i}: {sec['title']}")
-        for j, phrase in enumerate(sec["phrases"]):
-            print(f"  [{i}][{j}] {phrase}")
+            block = section_to_json_block(sec, learn_lang, native_lang, supported_langs)
+            if block:
+                writer.write(block)
 
-    sections = []
-    supported_langs = get_supported_languages()
+    if not parsed:
+        Path(json_output_path).unlink()
+        log.error("phrases is empty array!")
+        return
 
-    for sec in phrases:
-        # --- CATEGORY (section title) ---
-        title_text = normalize_separator(sec["title"])
-        parts = title_text.split(" - ", maxsplit=1)
-
-        # Uvek napravi category sa svim jezicima
-        category = {}
-        for lang in supported_langs:
-            if len(parts) == 2:
-                if lang == learn_lang:
-                    category[lang] = parts[0].strip()
-                elif lang == native_lang:
-                    category[lang] = parts[1].strip()
-                else:
-                    category[lang] = ""
-            else:
-                # Ako nema separatora " - "
-                if lang in (learn_lang, native_lang):
-                    category[lang] = title_text.strip()
-                else:
-                    category[lang] = ""
+    log.info(f"Created JSON file : {json_output_path}")
 
-        current_phrases = []
 
-        for phrase in sec["phrases"]:
-            # Primer: {'flags': ['A2', 'W', 'E'], 'only_learn': False, 'hu': 'lazy', 'sr': 'lenj'}
+def Watch_md2json(
+    md_input_path: str,
+    json_output_path: str,
+    learn_lang: str,
+    native_lang: str,
+    debounce: float = DEFAULT_DEBOUNCE,
+    poll: bool = False,
+) -> None:
+    """
+    Converts Markdown to JSON (like Convert_md2json), then again after every
+    save until interrupted.
 
-            flags = phrase.get("flags", [])
-            level = flags[0] if len(flags) > 0 else ""
-            isword = "W" in flags
-            enabled = "E" in flags
+    Only the sections whose text changed are reparsed and converted; the
+    JSON of the other sections is kept from the previous run. The output is
+    replaced atomically, so readers never see a partial file.
+    """
+    log.debug("start Watch_md2json")
 
-            # --- TRANSLATIONS: popuni sve jezike iz supported liste ---
-            translations = {}
-            for lang in supported_langs:
-                if lang == learn_lang or lang == native_lang:
-                    translations[lang] = phrase.get(lang, "")
-                else:
-                    translations[lang] = ""
+    supported_langs = get_supported_languages()
+    ensure_dir(str(Path(json_output_path).parent))
+    parser = IncrementalMarkdownParser(md_input_path, learn_lang, native_lang)
+    writer_class = json_writer_class(json_output_path)
+    blocks = {}   # section text -> encoded JSON block ("" if the section has no phrases)
+
+    def build():
+        start = time.perf_counter()
+        try:
+            reparsed = parser.update()
+            if reparsed is None and os.path.isfile(json_output_path):
+                log.info("No section changed")
+                return
+
+            encoded = {}
+            for key, sec in zip(parser.keys, parser.sections):
+                if key not in encoded:
+                    text = blocks.get(key)
+                    if text is None:
+                        block = section_to_json_block(sec, learn_lang, native_lang, supported_langs)
+                        text = writer_class.encode(block) if block else ""
+                    encoded[key] = text
+            blocks.clear()
+            blocks.update(encoded)
+
+            tmp_path = f"{json_output_path}.tmp"
+            with writer_class(tmp_path) as writer:
+                for key in parser.keys:
+                    if blocks[key]:
+                        writer.write_encoded(blocks[key])
+            os.replace(tmp_path, json_output_path)
+        except Exception as e:
+            # keep watching: the next save may fix it
+            log.debug("conversion failed", exc_info=True)
+            log.error(f"Conversion failed: {type(e).__name__}: {e}")
+            return
+        log.info(f"Updated {json_output_path}: {len(reparsed or [])} of {len(parser.sections)} sections reparsed "
+                 f"({time.perf_counter() - start:.3f}s)")
+
+    try:
+        with FileWatcher(md_input_path, debounce, poll=poll) as watcher:
+            build()
+            log.info(f"Watching {md_input_path} ({watcher.mode}), press Ctrl+C to stop")
+            while True:
+                watcher.wait()
+                build()
+    except KeyboardInterrupt:
+        log.info("Stopped watching")
+
+
+def section_to_json_block(sec: Section, learn_lang: str, native_lang: str, supported_langs: list[str]) -> dict | None:
+    """
+    Converts one parsed markdown section into a JSON category block.
 
-            current_phrases.append({
-                "level": level,
-                "enabled": enabled,
-                "isword": isword,
-                "translations": translations
-            })
+    Returns:
+        dict | None: {"category": ..., "phrases": [...]}, or None if the section has no phrases.
+    """
+    # --- CATEGORY (section title) ---
+    title_text = normalize_separator(sec["title"])
+    parts = title_text.split(" - ", maxsplit=1)
+
+    # Uvek napravi category sa svim jezicima
+    category = {}
+    for lang in supported_langs:
+        if len(parts) == 2:
+            if lang == learn_lang:
+                category[lang] = parts[0].strip()
+            elif lang == native_lang:
+                category[lang] = parts[1].strip()
+            else:
+                category[lang] = ""
+        else:
+            # Ako nema separatora " - "
+            if lang in (learn_lang, native_lang):
+                category[lang] = title_text.strip()
+            else:
+                category[lang] = ""
 
-        if current_phrases:
-            sections.append({
-                "category": category,
-                "phrases": current_phrases
-            })
+    if not sec.phrases:
+        return None
 
-    ensure_dir(str(Path(json_output_path).parent))
-    write_json(sections, json_output_path)
-    print(f"Created JSON file : {json_output_path}")
+    # translations only exist in the learn/native columns; others are ""
+    block = sec.to_json_block(supported_langs, category)
+
+    # learn-only phrases have no native translation (null, not "")
+    for record, phrase in zip(sec.flags(), block["phrases"]):
+        if record.only_learn and native_lang in phrase["translations"]:
+            phrase["translations"][native_lang] = None
+    return block
 
 
 # def Convert_json2csv(json_input_path: str, csv_output_path: str) -> None:
@@ -276,181 +363,314 @@ def Convert_md2json(
 #             writer.writerow([])
             
 
+# Named styles of exported decks: (font size, bold, fill color, centered)
+XLSX_STYLES = {
+    "KSL Header": (None, False, None, True),
+    "KSL Category": (13, True, "D9EAF7", False),
+    "KSL Enabled": (12, False, "C6EFCE", False),
+    "KSL Enabled Flag": (12, False, "C6EFCE", True),
+    "KSL Disabled": (12, False, "FFC7CE", False),
+    "KSL Disabled Flag": (12, False, "FFC7CE", True),
+}
+
+
+def _add_xlsx_styles(wb) -> dict:
+    # Registers XLSX_STYLES in the workbook and returns their style arrays,
+    # so every cell shares a named style instead of getting its own
+    from openpyxl.styles import DEFAULT_FONT, Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    side = Side(style="thin", color="B0B0B0")
+    gray_border = Border(left=side, right=side, top=side, bottom=side)
+
+    arrays = {}
+    for name, (size, bold, color, centered) in XLSX_STYLES.items():
+        style = NamedStyle(name=name, font=DEFAULT_FONT)
+        if centered:
+            style.alignment = Alignment(horizontal="center")
+        if size:
+            style.font = Font(size=size, bold=bold)
+            style.border = gray_border
+        if color:
+            style.fill = PatternFill(fill_type="solid", fgColor=color)
+        wb.add_named_style(style)
+        arrays[name] = style.as_tuple()
+    return arrays
+
+
+@traced("json2xlsx", is_stage=True)
 def Convert_json2xlsx(json_path: str, xlsx_path: str) -> None:
-    print("start Convert_json2xlsx")
-
-    supported_langs = get_supported_languages()
+    """
+    Exports a JSON (or JSON lines) file or a compiled deck to a formatted XLSX sheet.
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    Category blocks are read one at a time and the sheet is written row by
+    row (openpyxl write-only mode), so neither is kept in memory; cells
+    share the named styles of XLSX_STYLES.
+    """
+    log.debug("start Convert_json2xlsx")
 
-    wb = Workbook()
-    ws = wb.active
+    # heavy dependencies are imported only by the commands that need them
+    from openpyxl import Workbook
+    from openpyxl.cell import Cell
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import PatternFill
+    from openpyxl.utils import get_column_letter
 
-    category_font = Font(size=13, bold=True)
-    phrase_font = Font(size=12, bold=False)
+    supported_langs = get_supported_languages()
 
-    category_fill = PatternFill(fill_type="solid", fgColor="D9EAF7")
-    red_fill = PatternFill(fill_type="solid", fgColor="FFC7CE")
-    green_fill = PatternFill(fill_type="solid", fgColor="C6EFCE")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    styles = _add_xlsx_styles(wb)
 
-    gray_border = Border(
-        left=Side(style="thin", color="B0B0B0"),
-        right=Side(style="thin", color="B0B0B0"),
-        top=Side(style="thin", color="B0B0B0"),
-        bottom=Side(style="thin", color="B0B0B0")
-    )
+    def styled_row(values, style, flag_style=None):
+        return [Cell(ws, row=1, column=1, value=value, style_array=flag_style if i < 3 and flag_style else style)
+                for i, value in enumerate(values)]
 
-    # Header row
-    header_row = ["Enabled", "Level", "IsWord"] + [lang.upper() for lang in supported_langs]
-    ws.append(header_row)
+    # Column and sheet settings must come before the rows
     ws.freeze_panes = "A2"
-
-    # Set fixed width on language columns
     for i, lang in enumerate(supported_langs, start=4):  # Columns D, E, ...
-        col_letter = get_column_letter(i)
-        ws.column_dimensions[col_letter].width = 30
+        ws.column_dimensions[get_column_letter(i)].width = 30
 
-    # Center align header
-    for cell in ws[1]:
-        cell.alignment = Alignment(horizontal="center")
+    # Header row
+    header_row = ["Enabled", "Level", "IsWord"] + [lang.upper() for lang in supported_langs]
+    ws.append(styled_row(header_row, styles["KSL Header"]))
+    rows = 1
 
-    for block in data:
+    for block in _iter_json_blocks(json_path):
         category = block["category"]
-        phrases = block["phrases"]
 
         # CATEGORY ROW
         category_row = ["", "", ""] + [category.get(lang, "") for lang in supported_langs]
-        ws.append(category_row)
-
-        for cell in ws[ws.max_row]:
-            cell.font = category_font
-            cell.fill = category_fill
-            cell.border = gray_border
+        ws.append(styled_row(category_row, styles["KSL Category"]))
 
         # PHRASES
-        for phrase in phrases:
+        for phrase in block["phrases"]:
+            enabled = phrase.get("enabled", False)
             row = [
-                "1" if phrase.get("enabled", False) else "0",
+                "1" if enabled else "0",
                 phrase.get("level", ""),
                 "1" if phrase.get("isword", False) else "0",
             ] + [
                 phrase["translations"].get(lang, "") for lang in supported_langs
             ]
-
-            ws.append(row)
-            current_row = ws[ws.max_row]
-            is_disabled = row[0] == "0"
-
-            for i, cell in enumerate(current_row, start=1):
-                cell.border = gray_border
-                cell.font = phrase_font
-                if i in (1, 2, 3):  # Enabled, Level, IsWord
-                    cell.alignment = Alignment(horizontal="center")
-
-                cell.fill = red_fill if is_disabled else green_fill
+            if enabled:
+                ws.append(styled_row(row, styles["KSL Enabled"], styles["KSL Enabled Flag"]))
+            else:
+                ws.append(styled_row(row, styles["KSL Disabled"], styles["KSL Disabled Flag"]))
 
         # Empty row between categories
         ws.append([])
+        rows += len(block["phrases"]) + 2
 
-    # Conditional formatting
-    max_row = ws.max_row
+    # Conditional formatting reacting to the Enabled value of every row
     last_col = get_column_letter(3 + len(supported_langs))  # Example: "F", "G", ...
-    ws.conditional_formatting.add(
-        f"A2:{last_col}{max_row}",
-        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=1)'], fill=green_fill)
-    )
-    ws.conditional_formatting.add(
-        f"A2:{last_col}{max_row}",
-        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=0)'], fill=red_fill)
-    )
-
-    wb.save(xlsx_path)
-    print(f"XLSX saved to {xlsx_path}")
-
-
-
-    # Dodaj uslovno formatiranje koje reaguje na vrednost A u svakom redu
-    max_row = ws.max_row
-    ws.conditional_formatting.add(
-        f"A2:F{max_row}",
-        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=1)'], fill=green_fill)
-    )
-
-    ws.conditional_formatting.add(
-        f"A2:F{max_row}",
-        FormulaRule(formula=['AND(ISNUMBER($A2), $A2=0)'], fill=red_fill)
-    )
-
-    # Save to XLSX file
-    wb.save(xlsx_path)
-    print(f"XLSX saved to {json_path}")
-    
-    
+    cells = f"A2:{last_col}{rows}"
+    ws.conditional_formatting.add(cells, FormulaRule(
+        formula=['AND(ISNUMBER($A2), $A2=1)'], fill=PatternFill(fill_type="solid", fgColor="C6EFCE")))
+    ws.conditional_formatting.add(cells, FormulaRule(
+        formula=['AND(ISNUMBER($A2), $A2=0)'], fill=PatternFill(fill_type="solid", fgColor="FFC7CE")))
 
-def Convert_xlsx2json(xlsx_path: str, json_path: str) -> None:
-    print("start Convert_xlsx2json")
+    with span("xlsx.save"):
+        wb.save(xlsx_path)
+    log.info(f"XLSX saved to {xlsx_path}")
 
-    langs = get_supported_languages()
 
-    wb = load_workbook(xlsx_path)
-    ws = wb.active
+XLSX_FLAG_COLUMNS = ("ENABLED", "LEVEL", "ISWORD")
 
-    rows = list(ws.iter_rows(min_row=2, values_only=True))  # skip header
-    data = []
-    current_block = None
 
-    for row in rows:
-        if row is None:
-            continue
+@traced("xlsx2json", is_stage=True)
+def Convert_xlsx2json(xlsx_path: str, json_path: str, all_sheets: bool = False) -> None:
+    """
+    Imports an XLSX deck (as written by Convert_json2xlsx) to JSON.
 
-        # Ensure row length
-        row = list(row)
+    The workbook is read in read-only mode and rows are streamed: categories
+    are written to the JSON file as soon as they are complete, so memory use
+    doesn't grow with the sheet size.
 
-        # Extract core flags
-        enabled = row[0]
-        level   = row[1]
-        isword  = row[2]
+    Args:
+        xlsx_path (str): Input workbook.
+        json_path (str): Output JSON file.
+        all_sheets (bool): Convert every deck sheet (one per deck) instead of
+            only the active one; each goes to <json_path stem>-<sheet><ext>.
+    """
+    log.debug("start Convert_xlsx2json")
 
-        # Remaining columns = translations
-        values = row[3 : 3 + len(langs)]
+    from openpyxl import load_workbook
 
-        translations = {lang: "" for lang in langs}
-        for i, lang in enumerate(langs):
-            if i < len(values):
-                translations[lang] = values[i] or ""
+    with span("xlsx.load"):
+        wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+
+    try:
+        if not all_sheets:
+            _xlsx_sheet_to_json(wb.active, json_path)
+            log.info(f"JSON saved to {json_path}")
+            return
+
+        base, ext = os.path.splitext(json_path)
+        for ws in wb.worksheets:
+            sheet_name = re.sub(r"[^\w.-]+", "_", ws.title)
+            sheet_json_path = f"{base}-{sheet_name}{ext}"
+            if _xlsx_sheet_to_json(ws, sheet_json_path, decks_only=True):
+                log.info(f"Sheet '{ws.title}': JSON saved to {sheet_json_path}")
+            else:
+                log.info(f"Sheet '{ws.title}' skipped (no Enabled/Level/IsWord header)")
+    finally:
+        wb.close()
+
+
+def _xlsx_sheet_to_json(ws, json_path: str, decks_only: bool = False) -> bool:
+    # Streams one sheet into a JSON file; with decks_only, sheets without the
+    # deck header are skipped (returns False)
+    sections = _xlsx_sheet_sections(ws, decks_only)
+    if sections is None:
+        return False
+
+    langs = get_supported_languages()
+    with json_writer_class(json_path)(json_path) as writer:
+        for sec in sections:
+            writer.write(sec.to_json_block(langs))
+    return True
 
+
+def _xlsx_sheet_sections(ws, decks_only: bool = False, table: PhraseTable | None = None):
+    # Returns an iterator over the categories of a sheet, or None for a sheet
+    # without the deck header when decks_only. Categories are added to `table`,
+    # or each to its own PhraseTable so only one is in memory
+    langs = get_supported_languages()
+    rows = ws.iter_rows(values_only=True)
+    header = [str(c).strip().upper() if c is not None else "" for c in next(rows, None) or ()]
+
+    if tuple(header[:3]) == XLSX_FLAG_COLUMNS:
+        # translation columns by their header, so sheets may order or omit languages
+        columns = {lang: header.index(lang.upper()) for lang in langs if lang.upper() in header[3:]}
+    elif decks_only:
+        return None
+    else:
+        columns = {lang: 3 + i for i, lang in enumerate(langs)}
+    return _read_xlsx_rows(rows, columns, langs, table)
+
+
+def _read_xlsx_rows(rows, columns: dict, langs: list[str], table: PhraseTable | None):
+    section = None   # the category being read
+
+    for row in rows:
         # Check if whole row is empty → skip
-        if all(c is None or str(c).strip() == "" for c in row):
+        if not row or all(c is None or str(c).strip() == "" for c in row):
             continue
 
+        # Extract core flags
+        enabled, level, isword = (tuple(row[:3]) + (None, None, None))[:3]
+
+        translations = {lang: "" for lang in langs}
+        for lang, col in columns.items():
+            if col < len(row) and row[col] is not None:
+                translations[lang] = str(row[col])
+
         # Category row (no flags)
         if not enabled and not level and not isword:
-            current_block = {
-                "category": translations,
-                "phrases": []
-            }
-            data.append(current_block)
+            if section is not None:
+                yield section
+            section = (table if table is not None else PhraseTable()).add_section("", translations)
             continue
 
         # Phrase row
-        phrase = OrderedDict([
-            ("level",   (str(level).strip() if level else "")),
-            ("enabled", str(enabled).strip() == "1" or enabled is True),
-            ("isword",  str(isword).strip()  == "1" or isword is True),
-            ("translations", translations)
-        ])
-
-        if current_block is not None:
-            current_block["phrases"].append(phrase)
+        if section is not None:
+            section.table.add_phrase(
+                translations,
+                level=str(level).strip() if level else "",
+                enabled=str(enabled).strip() == "1" or enabled is True,
+                isword=str(isword).strip() == "1" or isword is True,
+            )
+        else:
+            log.warning("phrase appeared before first category → skipped")
+
+    if section is not None:
+        yield section
+
+
+@traced("compile", is_stage=True)
+def Compile_deck(input_path: str, deck_path: str, learn_lang: str | None = None,
+                 native_lang: str | None = None, force: bool = False) -> dict:
+    """
+    Compiles a markdown, JSON (or JSON lines) or XLSX deck into a binary
+    deck (see kslingo.parsers.deck), which later commands load without
+    parsing.
+
+    The deck is only rewritten when the source file (or the languages)
+    changed, unless force.
+
+    Args:
+        input_path (str): Markdown, JSON/JSONL or XLSX (active sheet) file.
+        deck_path (str): Output deck.
+        learn_lang, native_lang (str | None): Languages; required for
+            markdown, for JSON/XLSX they make the section titles
+            '<learn> - <native>' (as json2md does).
+        force (bool): Compile even if the deck is up to date.
+
+    Returns:
+        dict: Sections, phrases and sections changed since the previous deck.
+
+    Raises:
+        ValueError: If a markdown input is given without languages.
+    """
+    log.debug("start Compile_deck")
+
+    learn_lang = learn_lang or ""
+    native_lang = native_lang or ""
+    ext = os.path.splitext(input_path)[1].lower()
+    if ext == ".md" and not (learn_lang and native_lang):
+        raise ValueError("learn and native languages are required to compile markdown")
+
+    source_hash = file_sha256(input_path)
+    previous = set()
+    if is_deck(deck_path):
+        try:
+            with load_deck(deck_path) as old:
+                if (not force and old.source_hash == source_hash
+                        and (old.learn_lang, old.native_lang) == (learn_lang, native_lang)):
+                    log.info(f"Deck is up to date: {deck_path}")
+                    return {"sections": len(old), "phrases": old.phrase_count, "changed": 0}
+                previous = {old.section_hash(i) for i in range(len(old))}
+        except ValueError as e:
+            log.info(f"Replacing deck: {e}")
+
+    with span("compile.read"):
+        if ext == ".md":
+            table = get_phrases_markdown(input_path, learn_lang, native_lang)
         else:
-            print("WARNING: phrase appeared before first category → skipped")
+            table = PhraseTable()
+            if ext == ".xlsx":
+                from openpyxl import load_workbook
+
+                wb = load_workbook(input_path, read_only=True, data_only=True)
+                try:
+                    for _ in _xlsx_sheet_sections(wb.active, table=table):
+                        pass
+                finally:
+                    wb.close()
+            else:
+                for block in iter_json(input_path):
+                    table.add_section("", block.get("category", {}))
+                    for phrase in block.get("phrases", []):
+                        table.add_phrase(phrase.get("translations") or {}, level=phrase.get("level", ""),
+                                         enabled=phrase.get("enabled", False), isword=phrase.get("isword", False))
+            table.titles = [_deck_title(category, learn_lang, native_lang) for category in table.categories]
+
+    with span("compile.write"):
+        write_deck(table, deck_path, learn_lang, native_lang, source_hash)
+
+    with load_deck(deck_path) as deck:
+        changed = sum(deck.section_hash(i) not in previous for i in range(len(deck)))
+    log.info(f"Deck saved to {deck_path}: {len(table)} sections, {table.phrase_count} phrases ({changed} sections changed)")
+    return {"sections": len(table), "phrases": table.phrase_count, "changed": changed}
 
-    write_json(data, json_path)
 
-    print(f"JSON saved to {json_path}")
+def _deck_title(category: dict, learn_lang: str, native_lang: str) -> str:
+    if learn_lang and native_lang:
+        return category_heading(category, learn_lang, native_lang)
+    return category.get("en") or next((name for name in category.values() if name), "")
 
 
+@traced("pdf", is_stage=True)
 def Generate_pdf_from_md(md_path: str, pdf_path: str) -> str:
     """
     Converts a Markdown (.md) file to PDF and saves it to the specified directory.
@@ -463,7 +683,10 @@ def Generate_pdf_from_md(md_path: str, pdf_path: str) -> str:
         str: Path to the generated PDF file.
     """
     
-    print("start Generate_pdf_from_md")
+    log.debug("start Generate_pdf_from_md")
+
+    import markdown
+    from weasyprint import HTML
 
     validate_file(md_path, ".md")
 
@@ -472,12 +695,84 @@ def Generate_pdf_from_md(md_path: str, pdf_path: str) -> str:
         md_text = f.read()
 
     # convert MD to HTML
-    html_text = markdown.markdown(md_text)
+    with span("pdf.markdown"):
+        html_text = markdown.markdown(md_text)
 
     # convert HTML to PDF
-    HTML(string=html_text).write_pdf(pdf_path)
+    with span("pdf.weasyprint"):
+        HTML(string=html_text).write_pdf(pdf_path)
 
     validate_file(pdf_path, ".pdf")
 
     return
 
+
+# convert command: (converter, input extension(s), output extension, takes learn/native languages)
+CONVERSIONS = {
+    "json2md": (Convert_json2md, (".json", ".jsonl", DECK_EXT), ".md", True),
+    "md2json": (Convert_md2json, ".md", ".json", True),
+    "json2xlsx": (Convert_json2xlsx, (".json", ".jsonl", DECK_EXT), ".xlsx", False),
+    "xlsx2json": (Convert_xlsx2json, ".xlsx", ".json", False),
+}
+
+
+def Convert_glob(command: str, pattern: str, out_dir: str, learn_lang: str | None = None,
+                 native_lang: str | None = None, procs: int = 1, out_ext: str | None = None) -> list[dict]:
+    """
+    Runs one conversion for every file matching a glob pattern, in one process
+    or spread over `procs` worker processes (0 = one per CPU core).
+
+    Outputs mirror the input paths under out_dir (relative to the deepest
+    directory containing all matches), e.g. vault/a/b.md -> out_dir/a/b.json.
+    A failing file doesn't stop the batch. `out_ext` overrides the output
+    extension, e.g. ".jsonl" for JSON lines.
+
+    Returns:
+        list[dict]: Per-file results, also written to <out_dir>/batch-summary.json.
+    """
+    log.debug("start Convert_glob")
+
+    _, in_ext, default_ext, _ = CONVERSIONS[command]
+    out_ext = out_ext or default_ext
+    files = [path for path in expand_glob(pattern) if path.lower().endswith(in_ext)]
+    log.info(f"{command}: {len(files)} files match {pattern}")
+
+    root = common_root(files)
+    tasks = [(command, path, output_path(os.path.abspath(path), root, out_dir, out_ext), learn_lang, native_lang)
+             for path in files]
+
+    procs = procs or os.cpu_count() or 1
+    if procs <= 1 or len(tasks) <= 1:
+        results = [_convert_one(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=procs, initializer=_init_convert_worker,
+                                 initargs=(logging_config(),)) as executor:
+            results = list(executor.map(_convert_one, tasks))
+
+    write_batch_summary(results, out_dir)
+    return results
+
+
+def _init_convert_worker(log_config):
+    setup_logging(**log_config)
+
+
+def _convert_one(task) -> dict:
+    command, in_path, out_path, learn_lang, native_lang = task
+    start = time.perf_counter()
+    result = {"input": in_path, "output": out_path}
+    try:
+        ensure_dir(os.path.dirname(out_path))
+        converter, _, _, with_langs = CONVERSIONS[command]
+        if with_langs:
+            converter(in_path, out_path, learn_lang, native_lang)
+        else:
+            converter(in_path, out_path)
+        result["status"] = "ok"
+    except Exception as e:
+        log.debug("conversion failed", exc_info=True)
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
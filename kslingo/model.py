@@ -0,0 +1,523 @@
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain, repeat
+
+
+# Flags of a phrase, stored once per distinct combination (see PhraseTable.codes)
+PhraseFlags = namedtuple("PhraseFlags", "flags level enabled isword only_learn")
+
+
+class StringColumn:
+    """
+    Append-only column of strings, stored as UTF-8 in one buffer with the
+    end offset of every row. Empty strings only cost their offset.
+    """
+
+    __slots__ = ("_data", "_ends")
+
+    def __init__(self, rows: int = 0):
+        self._data = bytearray()
+        self._ends = array("Q", bytes(8 * rows))   # `rows` leading empty strings
+
+    def append(self, text: str) -> None:
+        if text:
+            self._data += text.encode("utf-8")
+        self._ends.append(len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, row: int) -> str:
+        if row < 0:
+            row += len(self._ends)
+        end = self._ends[row]
+        start = self._ends[row - 1] if row else 0
+        return self._data[start:end].decode("utf-8") if end > start else ""
+
+    def iter(self, start: int, stop: int):
+        """
+        Yields the strings of rows start..stop-1.
+        """
+        # indexed, not sliced: a slice of _ends would copy the offsets, and a
+        # memoryview would lock the column against appends while iterating
+        data, ends = self._data, self._ends
+        begin = ends[start - 1] if start else 0
+        for row in range(start, stop):
+            end = ends[row]
+            yield data[begin:end].decode("utf-8") if end > begin else ""
+            begin = end
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) + self._ends.itemsize * len(self._ends)
+
+
+class PhraseTable(Sequence):
+    """
+    Columnar store of phrase sections, shared by the markdown parser, the
+    converters and the audio pipeline.
+
+    Instead of one dict per phrase (with a flags list and a key per
+    language), a table keeps:
+      - one StringColumn per language, created when the language first has
+        a non-empty text (missing translations cost 8 bytes, not a string),
+      - one code per phrase into a list of distinct PhraseFlags,
+      - the title (and JSON category, if any) of every section and the
+        phrase offset where each section starts.
+
+    The table is a sequence of Section views; sections and their phrases
+    are read through views, without copying (see Section and Phrase).
+
+    Usage:
+        table = PhraseTable()
+        table.add_section("Greetings - Pozdravi")
+        table.add_phrase({"en": "hello", "sr": "zdravo"}, ["A1", "W", "E"])
+        for section in table:
+            for learn, native in zip(section.texts("en"), section.texts("sr")):
+                ...
+    """
+
+    __slots__ = ("titles", "categories", "offsets", "codes", "columns", "records", "_record_codes")
+
+    def __init__(self):
+        self.titles = []
+        self.categories = []              # JSON category dict of every section, or None
+        self.offsets = array("Q", [0])    # section i = phrases offsets[i]..offsets[i + 1] - 1
+        self.codes = array("I")           # index into records, per phrase
+        self.columns = {}                 # lang -> StringColumn
+        self.records = []                 # distinct PhraseFlags
+        self._record_codes = {}
+
+    def add_section(self, title: str, category: dict | None = None) -> "Section":
+        """
+        Starts a new section; the following phrases are added to it.
+        """
+        self.titles.append(title)
+        self.categories.append(category)
+        self.offsets.append(self.offsets[-1])
+        return Section(self, len(self.titles) - 1)
+
+    def add_phrase(self, texts: dict, flags: list[str] | None = None, level: str = "",
+                   enabled: bool = False, isword: bool = False, only_learn: bool = False) -> None:
+        """
+        Adds a phrase to the last section.
+
+        Args:
+            texts (dict): Text per language; None and "" are stored as "".
+            flags (list[str] | None): Markdown flags (e.g. ["A2", "W", "E"]);
+                level, enabled and isword are derived from them when given.
+            level, enabled, isword: Flags of a JSON/XLSX phrase.
+            only_learn (bool): The phrase has no translation (markdown).
+
+        Raises:
+            ValueError: If no section was started.
+        """
+        if not self.titles:
+            raise ValueError("add_section() must be called before add_phrase()")
+
+        if flags is None:
+            flags = (level, "W" if isword else "P", "E" if enabled else "D")
+        else:
+            flags = tuple(flags)
+            level = flags[0] if flags else ""
+            isword = "W" in flags
+            enabled = "E" in flags
+        record = PhraseFlags(flags, level, enabled, isword, only_learn)
+
+        code = self._record_codes.get(record)
+        if code is None:
+            code = self._record_codes[record] = len(self.records)
+            self.records.append(record)
+
+        rows = len(self.codes)
+        for lang, text in texts.items():
+            if text and lang not in self.columns:
+                self.columns[lang] = StringColumn(rows)
+        self.codes.append(code)
+        for lang, column in self.columns.items():
+            column.append(texts.get(lang) or "")
+        self.offsets[-1] += 1
+
+    @property
+    def phrase_count(self) -> int:
+        return len(self.codes)
+
+    @property
+    def langs(self) -> list[str]:
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate size of the phrase data (columns, codes and offsets).
+        """
+        return (sum(column.nbytes for column in self.columns.values())
+                + self.codes.itemsize * len(self.codes) + self.offsets.itemsize * len(self.offsets))
+
+    def flag_index(self) -> "FlagIndex":
+        """
+        Builds the FlagIndex of the phrases added so far (a compiled deck
+        stores its index instead).
+        """
+        return FlagIndex.build(self.codes, len(self.records))
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Section(self, i) for i in range(*index.indices(len(self.titles)))]
+        if index < 0:
+            index += len(self.titles)
+        if not 0 <= index < len(self.titles):
+            raise IndexError("section index out of range")
+        return Section(self, index)
+
+
+class Section(Mapping):
+    """
+    View of one section of a PhraseTable.
+
+    Also readable like the section dicts of the parsers:
+    section["title"], section["phrases"] (a PhraseSlice) and
+    section["category"] (JSON category dict, or None).
+    """
+
+    __slots__ = ("table", "index", "start")
+
+    _KEYS = ("title", "category", "phrases")
+
+    def __init__(self, table: PhraseTable, index: int):
+        self.table = table
+        self.index = index
+        self.start = table.offsets[index]
+
+    @property
+    def title(self) -> str:
+        return self.table.titles[self.index]
+
+    @property
+    def category(self) -> dict | None:
+        return self.table.categories[self.index]
+
+    @property
+    def stop(self) -> int:
+        # the last section grows while phrases are added
+        return self.table.offsets[self.index + 1]
+
+    @property
+    def phrases(self) -> "PhraseSlice":
+        return PhraseSlice(self.table, self.start, self.stop)
+
+    def texts(self, lang: str):
+        """
+        Yields the text of every phrase in `lang` ("" where it has none).
+        """
+        stop = self.stop
+        column = self.table.columns.get(lang)
+        if column is None:
+            return repeat("", stop - self.start)
+        return column.iter(self.start, stop)
+
+    def flags(self):
+        """
+        Yields the PhraseFlags of every phrase.
+        """
+        records, codes = self.table.records, self.table.codes
+        for row in range(self.start, self.stop):
+            yield records[codes[row]]
+
+    def to_json_block(self, langs: list[str], category: dict | None = None) -> dict:
+        """
+        Returns the section as a JSON category block with a translation
+        for every language of `langs`.
+
+        Args:
+            langs (list[str]): Languages of the translations (supported languages).
+            category (dict | None): Category, if not the section's own.
+        """
+        columns = [self.texts(lang) for lang in langs]
+        phrases = []
+        for record, *texts in zip(self.flags(), *columns):
+            phrases.append({
+                "level": record.level,
+                "enabled": record.enabled,
+                "isword": record.isword,
+                "translations": dict(zip(langs, texts)),
+            })
+        return {
+            "category": category if category is not None else self.category or {},
+            "phrases": phrases,
+        }
+
+    def __getitem__(self, key):
+        if key == "title":
+            return self.title
+        if key == "category":
+            return self.category
+        if key == "phrases":
+            return self.phrases
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"<Section {self.index} {self.title!r}: {len(self.phrases)} phrases>"
+
+
+class SectionSubset(Section):
+    """
+    View of some phrases of a section (rows of its table, in order),
+    e.g. those matching a PhraseQuery. Reads like a Section, except that
+    section["phrases"] is a list of Phrase views.
+    """
+
+    __slots__ = ("rows",)
+
+    def __init__(self, table: PhraseTable, index: int, rows: Sequence[int]):
+        super().__init__(table, index)
+        self.rows = rows
+
+    @property
+    def phrases(self) -> list["Phrase"]:
+        return [Phrase(self.table, row) for row in self.rows]
+
+    def texts(self, lang: str):
+        column = self.table.columns.get(lang)
+        if column is None:
+            return repeat("", len(self.rows))
+        return (column[row] for row in self.rows)
+
+    def flags(self):
+        records, codes = self.table.records, self.table.codes
+        for row in self.rows:
+            yield records[codes[row]]
+
+
+class PhraseSlice(Sequence):
+    """
+    Phrases start..stop-1 of a PhraseTable, as Phrase views.
+    Slicing returns another PhraseSlice, without copying.
+    """
+
+    __slots__ = ("table", "start", "stop")
+
+    def __init__(self, table: PhraseTable, start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("PhraseSlice doesn't support steps")
+            return PhraseSlice(self.table, self.start + start, self.start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("phrase index out of range")
+        return Phrase(self.table, self.start + index)
+
+    def __iter__(self):
+        for row in range(self.start, self.stop):
+            yield Phrase(self.table, row)
+
+
+class Phrase(Mapping):
+    """
+    View of one phrase of a PhraseTable, readable like the phrase dicts of
+    the parsers: phrase["flags"], phrase["only_learn"], phrase[lang], and
+    also "level", "enabled" and "isword".
+    """
+
+    __slots__ = ("table", "row")
+
+    _FLAG_KEYS = ("flags", "only_learn", "level", "enabled", "isword")
+
+    def __init__(self, table: PhraseTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def record(self) -> PhraseFlags:
+        return self.table.records[self.table.codes[self.row]]
+
+    def __getitem__(self, key):
+        column = self.table.columns.get(key)
+        if column is not None:
+            return column[self.row]
+        if key == "flags":
+            return list(self.record.flags)
+        if key in self._FLAG_KEYS:
+            return getattr(self.record, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self._FLAG_KEYS
+        yield from self.table.columns
+
+    def __len__(self) -> int:
+        return len(self._FLAG_KEYS) + len(self.table.columns)
+
+    def __repr__(self) -> str:
+        return f"<Phrase {dict(self)!r}>"
+
+
+class PhraseQuery:
+    """
+    Selects phrases by their flags, e.g. the phrases of levels A1 and A2
+    that are enabled words: PhraseQuery({"A1", "A2"}, enabled_only=True, words_only=True).
+
+    A query is evaluated once per distinct PhraseFlags record, not per phrase
+    (see codes() and select_sections()).
+
+    Args:
+        levels (Iterable[str] | None): Levels to keep (case-insensitive), or None for all.
+        enabled_only (bool): Keep only enabled phrases ("E" flag).
+        words_only (bool): Keep only words ("W" flag).
+        translated_only (bool): Skip phrases without a translation.
+    """
+
+    __slots__ = ("levels", "enabled_only", "words_only", "translated_only")
+
+    def __init__(self, levels: Iterable[str] | None = None, enabled_only: bool = False, words_only: bool = False,
+                 translated_only: bool = False):
+        self.levels = frozenset(level.strip().upper() for level in levels or () if level.strip()) or None
+        self.enabled_only = enabled_only
+        self.words_only = words_only
+        self.translated_only = translated_only
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        True if the query selects every phrase.
+        """
+        return not (self.levels or self.enabled_only or self.words_only or self.translated_only)
+
+    def matches(self, record: PhraseFlags) -> bool:
+        return ((self.levels is None or record.level.upper() in self.levels)
+                and (record.enabled or not self.enabled_only)
+                and (record.isword or not self.words_only)
+                and not (record.only_learn and self.translated_only))
+
+    def codes(self, records: Sequence[PhraseFlags]) -> list[int]:
+        """
+        Returns the codes of the matching flag records (see PhraseTable.records).
+        """
+        return [code for code, record in enumerate(records) if self.matches(record)]
+
+    def settings(self) -> dict:
+        """
+        Returns the query as a JSON-serializable dict (e.g. for the build manifest).
+        """
+        return {
+            "levels": sorted(self.levels) if self.levels else None,
+            "enabled_only": self.enabled_only,
+            "words_only": self.words_only,
+            "translated_only": self.translated_only,
+        }
+
+    @property
+    def slug(self) -> str:
+        """
+        Returns a file name for the query's outputs, e.g. "query-A1-A2-enabled-words".
+        """
+        parts = sorted(self.levels) if self.levels else []
+        parts += [name.split("_")[0] for name in ("enabled_only", "words_only", "translated_only") if getattr(self, name)]
+        return "-".join(["query"] + ["".join(c for c in part if c.isalnum()) or "_" for part in parts])
+
+    def __repr__(self) -> str:
+        parts = [f"levels {','.join(sorted(self.levels))}"] if self.levels else []
+        parts += [name.replace("_", " ") for name in ("enabled_only", "words_only", "translated_only")
+                  if getattr(self, name)]
+        return f"<PhraseQuery {', '.join(parts) or 'all'}>"
+
+
+class FlagIndex:
+    """
+    Inverted index of a table's phrases by flag record: the rows of the
+    phrases of record `code` are rows[offsets[code]:offsets[code + 1]],
+    in ascending order.
+
+    Selecting phrases with a PhraseQuery then costs one test per distinct
+    flag record plus the matching rows, instead of a scan of every phrase.
+    """
+
+    __slots__ = ("offsets", "rows")
+
+    def __init__(self, offsets: Sequence[int], rows: Sequence[int]):
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def build(cls, codes: Sequence[int], n_records: int) -> "FlagIndex":
+        # counting sort of the rows by code
+        offsets = array("Q", bytes(8 * (n_records + 1)))
+        for code in codes:
+            offsets[code + 1] += 1
+        for code in range(n_records):
+            offsets[code + 1] += offsets[code]
+        rows = array("I", bytes(4 * len(codes)))
+        ends = array("Q", offsets[:-1])
+        for row, code in enumerate(codes):
+            rows[ends[code]] = row
+            ends[code] += 1
+        return cls(offsets, rows)
+
+    def rows_of(self, code: int) -> Sequence[int]:
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+    def select(self, codes: Iterable[int]) -> Sequence[int]:
+        """
+        Returns the rows of the phrases with any of `codes`, in ascending order.
+        """
+        parts = [self.rows_of(code) for code in codes]
+        if len(parts) == 1:
+            return parts[0]
+        return sorted(chain.from_iterable(parts))
+
+
+def select_sections(sections: Iterable[Section], query: PhraseQuery | None) -> Iterator[tuple[int, Section]]:
+    """
+    Yields (position, section) for the sections with phrases matching `query`,
+    as SectionSubset views of the matching phrases. Positions are those in
+    `sections`, so output names don't change with the query.
+
+    Without a query (or an empty one) every section is yielded as is. On a
+    whole PhraseTable or compiled deck, the phrases are looked up in its
+    flag index, and sections without matches aren't read at all.
+    """
+    if query is None or query.is_empty:
+        yield from enumerate(sections)
+        return
+
+    if hasattr(sections, "flag_index"):
+        rows = sections.flag_index().select(query.codes(sections.records))
+        offsets = sections.offsets
+        start = 0
+        while start < len(rows):
+            index = bisect_right(offsets, rows[start]) - 1
+            stop = bisect_right(rows, offsets[index + 1] - 1, start)
+            yield index, SectionSubset(sections, index, rows[start:stop])
+            start = stop
+        return
+
+    # a stream of sections, usually each in its own table
+    table = codes = None
+    for position, section in enumerate(sections):
+        if section.table is not table:
+            table = section.table
+            codes = frozenset(query.codes(table.records))
+        rows = [row for row in range(section.start, section.stop) if table.codes[row] in codes]
+        if rows:
+            yield position, SectionSubset(table, section.index, rows)
@@ -0,0 +1,305 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from kslingo.model import FlagIndex, PhraseFlags, PhraseTable, Section
+
+
+DECK_EXT = ".kdeck"
+DECK_MAGIC = b"KSLDECK\0"
+DECK_VERSION = 2
+
+# magic, version, byte order mark, languages, records, sections, phrases,
+# strings, learn/native language (string ids), sha256 of the source file
+_HEADER = struct.Struct("<8sHHIIIQQII32s")
+_BYTE_ORDER = 0x0102 if sys.byteorder == "little" else 0x0201
+
+_NO_CATEGORY = 0xFFFFFFFF
+_FLAG_ENABLED, _FLAG_ISWORD, _FLAG_ONLY_LEARN = 1, 2, 4
+
+
+def is_deck(path: str | Path) -> bool:
+    """
+    Tells whether a file is a compiled deck (by its magic bytes, not its name).
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(DECK_MAGIC)) == DECK_MAGIC
+    except OSError:
+        return False
+
+
+def file_sha256(path: str | Path) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def write_deck(table: PhraseTable, deck_path: str | Path, learn_lang: str = "", native_lang: str = "",
+               source_hash: bytes = b"") -> None:
+    """
+    Writes a PhraseTable as a compiled deck.
+
+    Layout (native byte order, every block aligned to 8 bytes):
+      header, string end offsets (u64), language ids (u32), flag records
+      (3 x u32: flags, level, bits), section phrase offsets (u64), section
+      titles (u32), section categories (u32 per language), section content
+      hashes (16 bytes), phrase records (u32 flag code + u32 string id per
+      language), flag index offsets (u64) and rows (u32, see FlagIndex),
+      string data (UTF-8).
+
+    Strings are stored once; string 0 is "". The file is written to a
+    temporary name and renamed, so readers never see a partial deck.
+    """
+    strings = {"": 0}
+    data = bytearray()
+    ends = array("Q", [0])
+
+    def string_id(text: str) -> int:
+        sid = strings.get(text)
+        if sid is None:
+            sid = strings[text] = len(ends)
+            data.extend(text.encode("utf-8"))
+            ends.append(len(data))
+        return sid
+
+    langs = list(table.columns)
+    for category in table.categories:
+        for lang in category or ():
+            if lang not in langs:
+                langs.append(lang)
+    lang_ids = array("I", (string_id(lang) for lang in langs))
+
+    records = array("I")
+    for record in table.records:
+        bits = (_FLAG_ENABLED * record.enabled) | (_FLAG_ISWORD * record.isword) | (_FLAG_ONLY_LEARN * record.only_learn)
+        records.extend((string_id(",".join(record.flags)), string_id(record.level), bits))
+
+    titles = array("I")
+    categories = array("I")
+    hashes = bytearray()
+    phrases = array("I")
+    for section in table:
+        titles.append(string_id(section.title))
+        category = section.category
+        if category is None:
+            categories.extend([_NO_CATEGORY] * len(langs))
+        else:
+            categories.extend(string_id(str(category.get(lang) or "")) for lang in langs)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(section.title.encode("utf-8"))
+        for lang in langs:
+            digest.update(b"\0" + str((category or {}).get(lang) or "").encode("utf-8"))
+        codes = table.codes[section.start:section.stop]
+        for code, *texts in zip(codes, *(section.texts(lang) for lang in langs)):
+            phrases.append(code)
+            phrases.extend(string_id(text) for text in texts)
+            digest.update(b"\1" + repr((table.records[code], texts)).encode("utf-8"))
+        hashes.extend(digest.digest())
+
+    index = table.flag_index()
+    header = _HEADER.pack(DECK_MAGIC, DECK_VERSION, _BYTE_ORDER, len(langs), len(table.records), len(table),
+                          table.phrase_count, len(ends) - 1, string_id(learn_lang), string_id(native_lang),
+                          source_hash.ljust(32, b"\0")[:32])
+
+    deck_path = Path(deck_path)
+    deck_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = deck_path.with_name(deck_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        for block in (header, ends, lang_ids, records, table.offsets, titles, categories, hashes, phrases,
+                      index.offsets, index.rows, data):
+            f.write(block)
+            f.write(b"\0" * (-f.tell() % 8))
+    os.replace(tmp_path, deck_path)
+
+
+class Deck(Sequence):
+    """
+    A compiled deck, memory-mapped: nothing is parsed when it is opened.
+
+    A deck reads like a PhraseTable (a sequence of Section views, with the
+    same columns, codes and offsets attributes), so the converters and the
+    audio pipeline use it as is. Strings are decoded when they are read.
+
+    Attributes:
+        learn_lang, native_lang: Languages given when compiling ("" if none).
+        source_hash: sha256 of the compiled source file.
+    """
+
+    def __init__(self, deck_path: str | Path):
+        self.path = str(deck_path)
+        with open(deck_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._map()
+        except Exception:
+            self.close()
+            raise
+
+    def _map(self) -> None:
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"{self.path}: not a compiled deck")
+        (magic, version, byte_order, n_langs, n_records, n_sections, n_phrases, n_strings,
+         learn_id, native_id, self.source_hash) = _HEADER.unpack_from(self._mm)
+        if magic != DECK_MAGIC:
+            raise ValueError(f"{self.path}: not a compiled deck")
+        if version != DECK_VERSION:
+            raise ValueError(f"{self.path}: deck version {version} isn't supported (expected {DECK_VERSION}), compile it again")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError(f"{self.path}: deck was compiled on a machine with another byte order, compile it again")
+
+        offset = _HEADER.size + (-_HEADER.size % 8)
+
+        def block(fmt: str, count: int):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = memoryview(self._mm)[offset:offset + size]
+            self._views.append(view)
+            offset += size + (-size % 8)
+            return view.cast(fmt) if fmt != "B" else view
+
+        self._string_ends = block("Q", n_strings + 1)
+        lang_ids = block("I", n_langs)
+        records = block("I", 3 * n_records)
+        self.offsets = block("Q", n_sections + 1)
+        self._titles = block("I", n_sections)
+        self._categories = block("I", n_sections * n_langs)
+        self._hashes = block("B", 16 * n_sections)
+        phrases = block("I", n_phrases * (1 + n_langs))
+        self._index = FlagIndex(block("Q", n_records + 1), block("I", n_phrases))
+        self._data = block("B", self._string_ends[-1])
+        self._views.extend([self._string_ends, lang_ids, records, self.offsets, self._titles,
+                            self._categories, phrases, self._index.offsets, self._index.rows])
+
+        self.learn_lang = self.string(learn_id)
+        self.native_lang = self.string(native_id)
+        self.langs = [self.string(sid) for sid in lang_ids]
+        self.records = [
+            PhraseFlags(tuple(flag for flag in self.string(records[i]).split(",") if flag),
+                        self.string(records[i + 1]), bool(records[i + 2] & _FLAG_ENABLED),
+                        bool(records[i + 2] & _FLAG_ISWORD), bool(records[i + 2] & _FLAG_ONLY_LEARN))
+            for i in range(0, len(records), 3)
+        ]
+
+        # phrase records are fixed width: strided views are the columns
+        width = 1 + n_langs
+        self.codes = phrases[0::width]
+        self.columns = {lang: _DeckColumn(self, phrases[1 + j::width]) for j, lang in enumerate(self.langs)}
+        self.titles = _DeckStrings(self, self._titles)
+        self.categories = _DeckCategories(self, n_langs)
+        self._views.extend([self.codes] + [column.ids for column in self.columns.values()])
+
+    def string(self, sid: int) -> str:
+        if not sid:
+            return ""
+        return str(self._data[self._string_ends[sid - 1]:self._string_ends[sid]], "utf-8")
+
+    def section_hash(self, index: int) -> str:
+        """
+        Returns the content hash of a section (hex), which changes whenever
+        its title, category or phrases change.
+        """
+        return self._hashes[16 * index:16 * (index + 1)].hex()
+
+    def flag_index(self) -> FlagIndex:
+        """
+        Returns the flag index stored in the deck.
+        """
+        return self._index
+
+    @property
+    def phrase_count(self) -> int:
+        return len(self.codes)
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Section(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("section index out of range")
+        return Section(self, index)
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        try:
+            self._mm.close()
+        except BufferError:
+            pass   # sections or strings still in use; unmapped once released
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class _DeckColumn:
+    # Same interface as model.StringColumn, over the string ids of one language
+    __slots__ = ("deck", "ids")
+
+    def __init__(self, deck: Deck, ids):
+        self.deck = deck
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row: int) -> str:
+        return self.deck.string(self.ids[row])
+
+    def iter(self, start: int, stop: int):
+        string = self.deck.string
+        for sid in self.ids[start:stop]:
+            yield string(sid)
+
+
+class _DeckStrings(Sequence):
+    def __init__(self, deck: Deck, ids):
+        self.deck = deck
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> str:
+        return self.deck.string(self.ids[index])
+
+
+class _DeckCategories(Sequence):
+    def __init__(self, deck: Deck, n_langs: int):
+        self.deck = deck
+        self.n_langs = n_langs
+
+    def __len__(self) -> int:
+        return len(self.deck)
+
+    def __getitem__(self, index: int) -> dict | None:
+        ids = self.deck._categories[index * self.n_langs:(index + 1) * self.n_langs]
+        if self.n_langs and ids[0] == _NO_CATEGORY:
+            return None
+        return {lang: self.deck.string(sid) for lang, sid in zip(self.deck.langs, ids)}
+
+
+def load_deck(deck_path: str | Path) -> Deck:
+    """
+    Opens a compiled deck (see write_deck()).
+
+    Raises:
+        ValueError: If the file isn't a deck of this version.
+    """
+    return Deck(deck_path)
@@ -3,8 +3,21 @@ import json
 
 
 
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
 def write_json(data, json_path: str | Path) -> None:
     json_path = Path(json_path)
+    if isinstance(data, list) or json_path.suffix.lower() == ".jsonl":
+        # same layout, one item at a time instead of one big string
+        with json_writer_class(json_path)(json_path) as writer:
+            for item in data:
+                writer.write(item)
+        return
+
     json_path.parent.mkdir(parents=True, exist_ok=True)
     with json_path.open("w", encoding="utf-8") as f:
         json.dump(
@@ -14,4 +27,184 @@ def write_json(data, json_path: str | Path) -> None:
             indent=2,         # spaces
             sort_keys=False   # do not sort by abc...
         )
-        f.write("\n")          # new line at the end
\ No newline at end of file
+        f.write("\n")          # new line at the end
+
+class JsonArrayWriter:
+    """
+    Writes a top-level JSON array one item at a time, with the same layout as
+    write_json(), so large outputs never need the whole list in memory.
+
+    Usage:
+        with JsonArrayWriter(path) as writer:
+            for item in items:
+                writer.write(item)
+    """
+
+    def __init__(self, json_path: str | Path):
+        self.json_path = Path(json_path)
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self.json_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.json_path.open("w", encoding="utf-8")
+        self._f.write("[")
+        return self
+
+    def write(self, item) -> None:
+        self.write_encoded(self.encode(item))
+
+    @staticmethod
+    def encode(item) -> str:
+        """
+        Returns an item formatted as an array element, for write_encoded().
+        """
+        return json.dumps(item, ensure_ascii=False, indent=2, sort_keys=False).replace("\n", "\n  ")
+
+    def write_encoded(self, text: str) -> None:
+        """
+        Writes an item already formatted by encode() (e.g. kept from an earlier run).
+        """
+        self._f.write(",\n  " if self.count else "\n  ")
+        self._f.write(text)
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        self._f.write("\n]\n" if self.count else "]\n")
+        self._f.close()
+
+
+class JsonLinesWriter:
+    """
+    Writes JSON lines: one compact item per line. Same interface as
+    JsonArrayWriter, for .jsonl outputs.
+    """
+
+    def __init__(self, json_path: str | Path):
+        self.json_path = Path(json_path)
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self.json_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.json_path.open("w", encoding="utf-8")
+        return self
+
+    def write(self, item) -> None:
+        self.write_encoded(self.encode(item))
+
+    @staticmethod
+    def encode(item) -> str:
+        return json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+    def write_encoded(self, text: str) -> None:
+        self._f.write(text)
+        self._f.write("\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        self._f.close()
+
+
+def json_writer_class(json_path: str | Path):
+    """
+    Returns the writer for an output path: JsonLinesWriter for .jsonl files,
+    JsonArrayWriter otherwise.
+    """
+    return JsonLinesWriter if str(json_path).lower().endswith(".jsonl") else JsonArrayWriter
+
+
+def iter_json(json_path: str | Path, chunk_size: int = CHUNK_SIZE):
+    """
+    Yields the items of a top-level JSON array one at a time, reading the
+    file in chunks, so a deck never has to fit in memory at once.
+
+    JSON lines (one item per line, e.g. from JsonLinesWriter) are detected
+    by the content and read line by line.
+
+    :param json_path: JSON or JSON lines file
+    :param chunk_size: characters read at a time
+    :raises ValueError: if the file isn't a JSON array or JSON lines
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        buf = f.read(chunk_size)
+        pos = _skip_whitespace(buf, 0)
+        while pos == len(buf):
+            more = f.read(chunk_size)
+            if not more:
+                return   # empty file
+            buf, pos = more, _skip_whitespace(more, 0)
+
+        if buf[pos] != "[":
+            f.seek(0)
+            yield from _iter_json_lines(f, json_path)
+            return
+
+        decoder = json.JSONDecoder()
+        pos += 1
+        eof = False
+        expect_item = True   # after "[" or ","
+        first = True
+        while True:
+            pos = _skip_whitespace(buf, pos)
+            if pos == len(buf):
+                if eof:
+                    raise ValueError(f"{json_path}: unexpected end of JSON array")
+                buf, pos, eof = _refill(f, buf, pos, chunk_size)
+                continue
+
+            if not expect_item:
+                if buf[pos] == "]":
+                    return
+                if buf[pos] != ",":
+                    raise ValueError(f"{json_path}: expected ',' or ']' in JSON array")
+                expect_item = True
+                pos += 1
+                continue
+
+            if first and buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"{json_path}: invalid item in JSON array ({e.msg})") from None
+                end = None
+            # an item cut by the chunk boundary continues in the next chunk;
+            # so may a number decoded from a prefix of its text ("12." of "12.75")
+            if not eof and (end is None or end == len(buf)
+                            or type(item) in (int, float) and _number_may_continue(buf, end)):
+                buf, pos, eof = _refill(f, buf, pos, chunk_size)
+                continue
+
+            yield item
+            pos = end
+            expect_item = first = False
+
+
+def _refill(f, buf: str, pos: int, chunk_size: int):
+    # drops the consumed part of the buffer and appends the next chunk; the
+    # chunk grows with the buffer, so a huge item takes few rereads
+    more = f.read(max(chunk_size, len(buf) - pos))
+    return buf[pos:] + more, 0, not more
+
+
+def _number_may_continue(buf: str, end: int) -> bool:
+    while end < len(buf) and buf[end] in _NUMBER_CHARS:
+        end += 1
+    return end == len(buf)
+
+
+def _iter_json_lines(f, json_path):
+    for number, line in enumerate(f, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{json_path}:{number}: not a JSON array or JSON lines ({e})") from None
+
+
+def _skip_whitespace(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
@@ -1,3 +1,4 @@
+import io
 import os
 import re
 from kslingo.utils.fs import validate_file
@@ -10,130 +11,338 @@ from kslingo.utils.text import  remove_markdown_bold, \
                                 bold_prefix_before_separator
 
 from kslingo.utils.text import normalize_separator
+from kslingo.utils.text import BOLD_RE, ITALIC_RE, LEADING_DASH_RE
+from kslingo.utils.profiling import count, span, traced
+from kslingo.utils.log import get_logger
+from kslingo.model import PhraseTable, Section
+from kslingo.parsers.deck import Deck, is_deck, load_deck
 # from kslingo.convert.file import Generate_pdf_from_md
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 
-def get_phrases_markdown(file_path: str, learn_lang: str, native_lang: str) -> List[Dict[str, any]]:
-    """
-    Parses a markdown file and extracts phrase sections for language learning.
+log = get_logger(__name__)
 
-    Each section starts with a line beginning with '###', followed by one or more phrase lines.
 
-    Phrase line formats:
-    1. With flags and translation:
-        %%FLAG1,FLAG2,FLAG3%% Hungarian phrase - Serbian translation
-    2. Without translation (fallback):
-        Hungarian phrase only (used for recognition or input exercises)
+# Line kinds returned by tokenize_markdown_line()
+LINE_BLANK = "blank"
+LINE_FENCE = "fence"
+LINE_HEADING = "heading"
+LINE_PHRASE = "phrase"
+LINE_LEARN_ONLY = "learn_only"
+LINE_SKIP = "skip"
 
-    Rules:
-    - Default flags are ['A2', 'W', 'D'] if none are provided.
-    - Lines inside code blocks (```...```) are ignored.
-    - Lines where either the Hungarian or Serbian part contains '%%' are skipped.
-    - Markdown formatting is cleaned:
-        - Bold (`**text**`)
-        - Italic (`*text*`)
-        - Leading dashes (`- `)
+DEFAULT_FLAGS = "A2,W,D"
+
+FLAGS_RE = re.compile(r'^%%(?P<flags>.*?)%%\s*(.+)')
+
+
+def tokenize_markdown_line(line: str) -> Tuple[str, List[str] | None, str | None, str | None]:
+    """
+    Cleans and classifies one markdown line in a single call.
+
+    Produces the same result as the cleaning steps of get_phrases_markdown()
+    (bold, italic, leading dash, separator normalization, flag extraction),
+    using precompiled patterns and skipping steps that can't match.
+    Code block state is not tracked here; fences are reported as LINE_FENCE.
+
+    :param line: Raw line from the markdown file.
+    :return: (kind, flags, learn, native):
+             - LINE_HEADING: learn is the section title
+             - LINE_PHRASE: flags, learn and native text
+             - LINE_LEARN_ONLY: default flags and learn text, native is None
+             - LINE_BLANK / LINE_FENCE / LINE_SKIP: the rest is None
+    """
+    line = line.strip()
+    if not line:
+        return LINE_BLANK, None, None, None
+    if line.startswith("```"):
+        return LINE_FENCE, None, None, None
+
+    # Clean line
+    if "*" in line:
+        line = BOLD_RE.sub(r"\1", line)
+        line = ITALIC_RE.sub(r"\1", line)
+    if line[:1] == "-" or line[:1].isspace():
+        line = LEADING_DASH_RE.sub("", line)
+    line = normalize_separator(line)
+
+    if line.startswith("###"):
+        return LINE_HEADING, None, line.lstrip("#").strip(), None
+
+    if " - " in line:
+        flags_match = FLAGS_RE.match(line) if line.startswith("%%") else None
+        if flags_match:
+            flags_str = flags_match.group("flags")
+            content = flags_match.group(2)
+        else:
+            flags_str = DEFAULT_FLAGS
+            content = line
+        if content.startswith("-"):
+            content = LEADING_DASH_RE.sub("", content)
+
+        flags = [f.strip() for f in flags_str.split(",") if f.strip()]
+
+        # Split HU i SR based on last separator
+        if " - " in content:
+            hu, sr = content.rsplit(" - ", 1)
+            return LINE_PHRASE, flags, hu.strip(), sr.strip()
+        # separator was inside the flags
+        return LINE_PHRASE, flags, content.strip(), ""
+
+    # fallback: line without flags and translation
+    if "%%" in line:
+        return LINE_SKIP, None, None, None
+
+    if line.startswith("-"):
+        line = LEADING_DASH_RE.sub("", line)
+    return LINE_LEARN_ONLY, DEFAULT_FLAGS.split(","), line, None
+
+
+def iter_phrases_markdown(file_path: str, learn_lang: str, native_lang: str) -> Iterator[Tuple[Dict[str, any], Dict[str, any] | None]]:
+    """
+    Streams a markdown file as (section, phrase) events, reading one line at a time.
+
+    Line formats and cleaning rules are the same as in get_phrases_markdown().
+    For every '###' heading a (section, None) event is yielded first, then one
+    (section, phrase) event per phrase of that section. The section dict is
+    {"index": int, "title": str} and is the same object for all its events.
+
+    Memory use doesn't depend on the file size, so consumers can start working
+    before the whole file is parsed.
 
     :param file_path: Path to the markdown input file.
-    :return: A list of sections. Each section is a dict with:
-             - "title": Section title (str)
-             - "phrases": List of phrases (each a dict with keys: flags, only_learn, hu, sr)
+    :return: Iterator of (section, phrase) tuples.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        yield from iter_phrases_lines(f, learn_lang, native_lang)
+
+
+def iter_phrases_lines(lines: Iterable[str], learn_lang: str, native_lang: str) -> Iterator[Tuple[Dict[str, any], Dict[str, any] | None]]:
     """
+    Same as iter_phrases_markdown(), for markdown lines that are already read.
 
-    print("start get_phrases_markdown")
+    :param lines: Lines of a markdown file (with or without line endings).
+    :return: Iterator of (section, phrase) tuples.
+    """
 
-    phrases = []
-    current_section = None
+    section = None
     inside_code_block = False
+    lines_read = phrases = 0
+
+    try:
+        for line in lines:
+            lines_read += 1
+            kind, flags, learn, native = tokenize_markdown_line(line)
 
-    with open(file_path, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
             # --- CODE BLOCK DETECTION ---
-            if line.startswith("```"):
+            if kind == LINE_FENCE:
                 inside_code_block = not inside_code_block
                 continue
-            if inside_code_block:
+            if inside_code_block or kind == LINE_BLANK or kind == LINE_SKIP:
                 continue
             # --- OUTSIDE OF CODE BLOCK ---
 
-            # Clean line
-            line = remove_markdown_bold(line)
-            line = remove_markdown_italic(line)
-            line = remove_leading_dash(line)
-            line = normalize_separator(line)
-
-            if line.startswith("###"):
+            if kind == LINE_HEADING:
                 # Start new section
-                if current_section:
-                    phrases.append(current_section)
-                title = line.lstrip("#").strip()
-                current_section = {
-                    "title": title,
-                    "phrases": []
+                section = {
+                    "index": section["index"] + 1 if section else 0,
+                    "title": learn,
                 }
-            else:
-                # Try to parse phrase
-                if " - " in line:
-                    flags_match = re.match(r'^%%(?P<flags>.*?)%%\s*(.+)', line)
-                    if flags_match:
-                        flags_str = flags_match.group("flags")
-                        content = flags_match.group(2)
-                        content = remove_leading_dash(content)
-                    else:
-                        flags_str = "A2,W,D"
-                        content = line
-                        content = remove_leading_dash(content)
-
-                    # Split HU i SR based on last separator
-                    if " - " in content:
-                        hu, sr = content.rsplit(" - ", 1)
-                        hu = hu.strip()
-                        sr = sr.strip()
-
-                    flags = [f.strip() for f in flags_str.split(",") if f.strip()]
-                    current_section["phrases"].append({
-                        "flags": flags,
-                        "only_learn": False,
-                        learn_lang: hu,
-                        native_lang: sr
-                    })
+                yield section, None
+                continue
 
-                else:
-                    # fallback: line without flags and translation
+            if section is None:
+                log.warning(f"phrase before first section skipped: {learn}")
+                continue
+
+            phrases += 1
+            yield section, {
+                "flags": flags,
+                "only_learn": kind == LINE_LEARN_ONLY,
+                learn_lang: learn,
+                native_lang: native
+            }
+    finally:
+        # counted once per file, not per line
+        count("markdown.lines", lines_read)
+        count("markdown.sections", section["index"] + 1 if section else 0)
+        count("markdown.phrases", phrases)
+
+
+def iter_sections_markdown(file_path: str, learn_lang: str, native_lang: str) -> Iterator[Section]:
+    """
+    Streams a markdown file section by section.
+
+    Only the section being parsed is held in memory.
+
+    :param file_path: Path to the markdown input file.
+    :return: Iterator of sections, each the only section of its own
+             PhraseTable (see get_phrases_markdown()).
+    """
+    return _group_sections(iter_phrases_markdown(file_path, learn_lang, native_lang), learn_lang, native_lang)
 
-                    if "%%" in line:
-                        continue
-                    
-                    line = remove_leading_dash(line)
 
-                    current_section["phrases"].append({
-                        "flags": ["A2", "W", "D"],
-                        "only_learn": True,
-                        learn_lang: line,
-                        native_lang: None
-                    })
+def _group_sections(events: Iterator[Tuple[Dict[str, any], Dict[str, any] | None]],
+                    learn_lang: str, native_lang: str) -> Iterator[Section]:
+    table = None
+
+    for section, phrase in events:
+        if phrase is None:
+            if table is not None:
+                yield table[0]
+            table = PhraseTable()
+            table.add_section(section["title"])
+        else:
+            _add_phrase(table, phrase, learn_lang, native_lang)
 
     # Add latest section
-    if current_section:
-        phrases.append(current_section)
+    if table is not None:
+        yield table[0]
+
+
+def _add_phrase(table: PhraseTable, phrase: Dict[str, any], learn_lang: str, native_lang: str) -> None:
+    table.add_phrase({learn_lang: phrase[learn_lang], native_lang: phrase[native_lang]},
+                     phrase["flags"], only_learn=phrase["only_learn"])
+
+
+def split_markdown_sections(lines: Iterable[str]) -> Tuple[str, List[str]]:
+    """
+    Splits markdown lines into the text before the first section and the raw
+    text of every section (its heading up to the next heading).
+
+    Headings inside code blocks don't start a section, so every section
+    starts outside a code block and can be parsed on its own.
 
-    # Debug print
-    # for i, sec in enumerate(phrases):
-    #     print(f"Section {i}: {sec['title']}")
-    #     for j, phrase in enumerate(sec["phrases"]):
-    #         print(f"  [{i}][{j}] {phrase}")
+    :param lines: Lines of a markdown file, with line endings.
+    :return: (prologue, sections) - the prologue text and a list of section texts.
+    """
+    chunks = [[]]
+    inside_code_block = False
 
-    return phrases
+    for line in lines:
+        # cleaning only removes characters, so every heading contains '#'
+        if "#" in line and not inside_code_block and tokenize_markdown_line(line)[0] == LINE_HEADING:
+            chunks.append([])
+        elif line.lstrip().startswith("```"):
+            inside_code_block = not inside_code_block
+        chunks[-1].append(line)
 
+    return "".join(chunks[0]), ["".join(chunk) for chunk in chunks[1:]]
+
+
+class IncrementalMarkdownParser:
+    """
+    Keeps a markdown file parsed while it is being edited.
 
+    update() rereads the file, splits it into sections (see
+    split_markdown_sections()) and parses only the sections whose raw text
+    changed; unchanged sections keep their parsed tables. The result is the
+    same as iter_sections_markdown() on the whole file.
+
+    Attributes:
+        sections: Parsed sections, as returned by iter_sections_markdown().
+        keys: Raw text of every section, usable as a cache key for outputs
+              derived from the section.
+    """
+
+    def __init__(self, file_path: str, learn_lang: str, native_lang: str):
+        self.file_path = file_path
+        self.learn_lang = learn_lang
+        self.native_lang = native_lang
+        self.sections = []
+        self.keys = []
+        self._prologue = None
+        self._parsed = {}
+
+    def update(self) -> List[int] | None:
+        """
+        Rereads the file.
+
+        :return: Indices of the sections that were (re)parsed, or None if no
+                 section changed. The list is empty when sections were only
+                 removed or reordered.
+        """
+        with open(self.file_path, encoding="utf-8") as f:
+            prologue, keys = split_markdown_sections(f.readlines())
+
+        if prologue != self._prologue:
+            # only reports the phrases before the first section
+            self._prologue = prologue
+            for _ in iter_phrases_lines(io.StringIO(prologue), self.learn_lang, self.native_lang):
+                pass
+
+        if keys == self.keys:
+            return None
+
+        parsed = {}
+        reparsed = []
+        for i, key in enumerate(keys):
+            if key in parsed:
+                continue
+            if key in self._parsed:
+                parsed[key] = self._parsed[key]
+            else:
+                parsed[key] = next(_group_sections(iter_phrases_lines(io.StringIO(key), self.learn_lang, self.native_lang),
+                                                   self.learn_lang, self.native_lang))
+                reparsed.append(i)
+
+        self._parsed = parsed
+        self.keys = keys
+        self.sections = [parsed[key] for key in keys]
+        return reparsed
+
+
+def get_phrases_markdown(file_path: str, learn_lang: str, native_lang: str) -> PhraseTable:
+    """
+    Parses a markdown file and extracts phrase sections for language learning.
+
+    Each section starts with a line beginning with '###', followed by one or more phrase lines.
+
+    Phrase line formats:
+    1. With flags and translation:
+        %%FLAG1,FLAG2,FLAG3%% Hungarian phrase - Serbian translation
+    2. Without translation (fallback):
+        Hungarian phrase only (used for recognition or input exercises)
+
+    Rules:
+    - Default flags are ['A2', 'W', 'D'] if none are provided.
+    - Lines inside code blocks (```...```) are ignored.
+    - Lines where either the Hungarian or Serbian part contains '%%' are skipped.
+    - Markdown formatting is cleaned:
+        - Bold (`**text**`)
+        - Italic (`*text*`)
+        - Leading dashes (`- `)
+
+    For large files prefer iter_sections_markdown() / iter_phrases_markdown(),
+    which don't materialize the whole file.
+
+    :param file_path: Path to the markdown input file.
+    :return: A PhraseTable with one section per heading. Sections read like
+             dicts with "title" and "phrases", phrases like dicts with keys
+             flags, only_learn, hu, sr (see kslingo.model).
+    """
+
+    log.debug("start get_phrases_markdown")
+
+    table = PhraseTable()
+    with span("markdown.parse"):
+        for section, phrase in iter_phrases_markdown(file_path, learn_lang, native_lang):
+            if phrase is None:
+                table.add_section(section["title"])
+            else:
+                _add_phrase(table, phrase, learn_lang, native_lang)
+    return table
+
+
+@traced("reparse", is_stage=True)
 def just_only_reparse_md(input_file: str, output_file: str):
-    print("start just_only_reparse_md")
-    print(f"input_file={input_file}")
+    log.debug("start just_only_reparse_md")
+    log.debug(f"input_file={input_file}")
+
+    if is_deck(input_file):
+        with load_deck(input_file) as deck:
+            reparse_deck_md(deck, output_file)
+        return
 
     inside_code_block = False
 
@@ -180,7 +389,7 @@ def just_only_reparse_md(input_file: str, output_file: str):
             flag_list = [f.strip() for f in flags.split(",") if f.strip()]
 
             if len(flag_list) > 3:
-                print("Error: Too much flags!")
+                log.error("Too much flags!")
                 return
 
 
@@ -198,12 +407,42 @@ def just_only_reparse_md(input_file: str, output_file: str):
             else:
                 fout.write(f"- %%{flags}%% *{raw}*\n")
 
-    print(f"\nFinish! File saved: {output_file}")
+    log.info(f"Finish! File saved: {output_file}")
     return
 
 
+def reparse_deck_md(deck: Deck, output_file: str) -> None:
+    """
+    Writes a compiled deck in the format of just_only_reparse_md(): a
+    '###' heading per section and one '- %%flags%% phrase' line per phrase,
+    with a blank line after every section. The deck holds parsed content,
+    so headings are normalized and comments and code blocks are gone.
+
+    :param deck: Deck compiled with learn and native languages.
+    :param output_file: Path to the output markdown file.
+    :raises ValueError: if the deck has no learn/native languages.
+    """
+    if not (deck.learn_lang and deck.native_lang):
+        raise ValueError(f"{deck.path} was compiled without learn/native languages, compile it with -learn and -native")
+
+    with open(output_file, "w", encoding="utf-8") as fout:
+        for section in deck:
+            fout.write(f"### {section.title}\n")
+            for record, hu, sr in zip(section.flags(), section.texts(deck.learn_lang), section.texts(deck.native_lang)):
+                flags = ",".join(record.flags)
+                if record.only_learn:
+                    fout.write(f"- %%{flags}%% *{hu}*\n")
+                elif record.enabled:
+                    fout.write(f"- %%{flags}%% **{hu}** - {sr}\n")
+                else:
+                    fout.write(f"- %%{flags}%% {hu} - {sr}\n")
+            fout.write("\n")
+
+    log.info(f"Finish! File saved: {output_file}")
+
+
 def generate_output_md_from_phrases(
-        phrases: List[Dict[str, any]],
+        phrases: Iterable[Dict[str, any]],
         output_file: str,
         learn_lang: str,
         native_lang: str
@@ -211,38 +450,32 @@ def generate_output_md_from_phrases(
     """
     Generates a markdown file from a parsed list of sections and phrases.
 
-    :param phrases: List of section dictionaries with 'title' and 'phrases'.
+    :param phrases: Parsed sections (a PhraseTable or a stream of sections).
     :param output_file: Path to the output markdown file.
     """
 
-    print("start generate_output_md_from_phrases")
-
-    # only debug
-    # for i, sec in enumerate(phrases):
-    #     print(f"Section {i}: {sec['title']}")
-    #     for j, phrase in enumerate(sec["phrases"]):
-    #         print(f"  [{i}][{j}] {phrase}")
+    log.debug("start generate_output_md_from_phrases")
 
     with open(output_file, "w", encoding="utf-8") as f:
         for section in phrases:
-            title = section.get("title", "Untitled")
-            f.write(f"### {title}\n")
-
-            for phrase in section.get("phrases", []):
-                hu = phrase.get(learn_lang, "").strip()
-                sr = phrase.get(native_lang, "")
-                sr = sr.strip() if sr else ""
-                flags = phrase.get("flags", [])
-                only_learn = phrase.get("only_learn", False)
-
-                # format flags
-                flags_str = f"%%{','.join(flags)}%%" if flags else ""
-
-                if only_learn:
-                    # only HU text (no translation)
-                    f.write(f"- *{hu}*\n")
-                else:
-                    # full phrase with flags
-                    f.write(f"- **{hu}** - {sr}\n")
+            write_section_md(f, section, learn_lang, native_lang)
+
+
+def write_section_md(f, section: Section, learn_lang: str, native_lang: str) -> None:
+    """
+    Writes one parsed section in the cleaned markdown format to an open file.
+    """
+    f.write(f"### {section.title}\n")
+
+    for record, hu, sr in zip(section.flags(), section.texts(learn_lang), section.texts(native_lang)):
+        hu = hu.strip()
+        sr = sr.strip()
+
+        if record.only_learn:
+            # only HU text (no translation)
+            f.write(f"- *{hu}*\n")
+        else:
+            # full phrase with flags
+            f.write(f"- **{hu}** - {sr}\n")
 
-            f.write(f"---\n")
+    f.write(f"---\n")
@@ -3,9 +3,14 @@ from kslingo.utils.text import split_pair
 from kslingo.utils.text import normalize_separator
 
 from kslingo.utils.fs import validate_file
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
 
 def ReadFromTxtFile(input_file):    
-    print("start ReadFromTxtFile")
+    log.debug("start ReadFromTxtFile")
     
     phrases = []
     
@@ -0,0 +1,238 @@
+import importlib
+import os
+import threading
+from kslingo.audio.cache import ClipCache
+from kslingo.audio.engines import ENGINES, get_engine
+from kslingo.audio.assets import get_timing_profile
+from kslingo.audio.encoder import get_encoding
+from kslingo.model import PhraseQuery
+from kslingo.utils.batch import SUMMARY_NAME, parse_shard, shard_name
+from kslingo.utils.fs import ensure_dir
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+# Modules imported once at startup instead of on the first job
+PRELOAD_MODULES = ["kslingo.audio.tts", "kslingo.convert.file", "pydub", "markdown", "openpyxl", "weasyprint"]
+
+# A warm clip table is replaced once it holds this many encoded clips
+MAX_WARM_CLIPS = 50000
+
+CONVERT_COMMANDS = ["json2md", "md2json", "json2xlsx", "xlsx2json"]
+PARSE_COMMANDS = ["only-reparse-markdown"]
+
+# job type -> {param: default}; None marks a required parameter
+JOB_PARAMS = {
+    "audio": {
+        "txt": "", "markdown": "", "vault": "", "out": "output", "learn": None, "native": None,
+        "engine": "gtts", "timing": "default", "end_sound": "", "procs": 1,
+        "force": False, "cache": True, "level": "", "enabled_only": False, "words_only": False,
+        "translated_only": False, "shard": "", "codec": "mp3", "bitrate": "", "vbr": -1, "channels": 0,
+        "sample_rate": 0,
+    },
+    "convert": {
+        "command": None, "input": "", "glob": "", "out": "output", "learn": "", "native": "", "procs": 1,
+        "jsonl": False,
+    },
+    "parse": {
+        "command": "only-reparse-markdown", "input": None, "output": "output/Only-Reparsed.md",
+    },
+}
+
+
+def prepare_job(kind: str, params: dict) -> dict:
+    """
+    Validates the parameters of a job request and fills in defaults.
+
+    Paths are made absolute, so a job doesn't depend on the server's
+    working directory changing later.
+
+    Raises:
+        ValueError: If the job type or a parameter is invalid.
+    """
+    if kind not in JOB_PARAMS:
+        raise ValueError(f"Unknown job type '{kind}'. Choose one of: {', '.join(JOB_PARAMS)}")
+    defaults = JOB_PARAMS[kind]
+
+    unknown = sorted(set(params) - set(defaults))
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for '{kind}' job: {', '.join(unknown)}")
+
+    prepared = {}
+    for name, default in defaults.items():
+        value = params.get(name, default)
+        if value is None:
+            raise ValueError(f"Parameter '{name}' is required for '{kind}' job")
+        if default is not None and not isinstance(value, type(default)):
+            raise ValueError(f"Parameter '{name}' must be {type(default).__name__}")
+        prepared[name] = value
+
+    if kind == "audio":
+        modes = [mode for mode in ("txt", "markdown", "vault") if prepared[mode]]
+        if len(modes) != 1:
+            raise ValueError("Exactly one of 'txt', 'markdown' or 'vault' is required for 'audio' job")
+        if prepared["engine"] not in ENGINES:
+            raise ValueError(f"Unknown TTS engine '{prepared['engine']}'. Choose one of: {', '.join(ENGINES)}")
+        if prepared["txt"] and any(prepared[name] for name in ("level", "enabled_only", "words_only", "translated_only", "shard")):
+            raise ValueError("'level', 'enabled_only', 'words_only', 'translated_only' and 'shard' need 'markdown' or 'vault'")
+        if prepared["shard"]:
+            parse_shard(prepared["shard"])
+        _job_encoding(prepared)
+        paths = ["txt", "markdown", "vault", "out", "end_sound"]
+    elif kind == "convert":
+        if prepared["command"] not in CONVERT_COMMANDS:
+            raise ValueError(f"Unknown convert command '{prepared['command']}'. Choose one of: {', '.join(CONVERT_COMMANDS)}")
+        if bool(prepared["input"]) == bool(prepared["glob"]):
+            raise ValueError("Exactly one of 'input' or 'glob' is required for 'convert' job")
+        if prepared["command"] in ("json2md", "md2json") and not (prepared["learn"] and prepared["native"]):
+            raise ValueError(f"'learn' and 'native' are required for '{prepared['command']}'")
+        if prepared["jsonl"] and prepared["command"] not in ("md2json", "xlsx2json"):
+            raise ValueError("'jsonl' only applies to md2json and xlsx2json")
+        paths = ["input", "glob", "out"]
+    else:
+        if prepared["command"] not in PARSE_COMMANDS:
+            raise ValueError(f"Unknown parse command '{prepared['command']}'. Choose one of: {', '.join(PARSE_COMMANDS)}")
+        paths = ["input", "output"]
+
+    for name in paths:
+        if prepared[name]:
+            prepared[name] = os.path.abspath(prepared[name])
+    return prepared
+
+
+def _job_encoding(params: dict) -> dict:
+    # 0 / -1 / "" mean the encoder default
+    return get_encoding(params["codec"], params["bitrate"] or None, params["vbr"] if params["vbr"] >= 0 else None,
+                        params["channels"] or None, params["sample_rate"] or None)
+
+
+class Workspace:
+    """
+    Warm state shared by the jobs of a `kslingo serve` process.
+
+    Heavy modules are imported once, and TTS engines (with their HTTP
+    sessions), clip caches and clip tables (synthesized and decoded clips)
+    live as long as the server, so a job only pays for what changed.
+    """
+
+    def __init__(self, cache_dir: str | None = None, tts_jobs: int = 1, preload: bool = True):
+        self.cache_dir = cache_dir
+        self.tts_jobs = tts_jobs
+        self._engines = {}
+        self._clips = {}
+        self._cache = None
+        self._lock = threading.Lock()
+        if preload:
+            self.preload()
+
+    def preload(self) -> None:
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                # optional backends (e.g. WeasyPrint without its system
+                # libraries) fail again in the jobs that need them
+                log.warning(f"Preloading {name} failed: {type(e).__name__}: {e}")
+
+    def cache(self) -> ClipCache:
+        with self._lock:
+            if self._cache is None:
+                self._cache = ClipCache(self.cache_dir)
+            return self._cache
+
+    def engine(self, name: str):
+        with self._lock:
+            if name not in self._engines:
+                self._engines[name] = get_engine(name)
+            return self._engines[name]
+
+    def clips(self, engine, cache):
+        """
+        Returns the warm clip table of an engine and cache, starting a new
+        one when it grew past MAX_WARM_CLIPS.
+        """
+        from kslingo.audio.clips import ClipTable
+
+        key = (engine.name, cache is not None)
+        with self._lock:
+            table = self._clips.get(key)
+            if table is None or table.stats()["unique"] > MAX_WARM_CLIPS:
+                table = self._clips[key] = ClipTable(engine, cache, self.tts_jobs)
+            return table
+
+    def stats(self) -> dict:
+        stats = {"engines": sorted(self._engines), "clips": {}}
+        for (engine, cached), table in self._clips.items():
+            stats["clips"][f"{engine}{'' if cached else ' (no cache)'}"] = table.stats()
+        if self._cache is not None:
+            stats["cache"] = {"cache_dir": self._cache.cache_dir, "hits": self._cache.hits, "misses": self._cache.misses}
+        return stats
+
+    def run(self, kind: str, params: dict):
+        """
+        Runs a job prepared by prepare_job() and returns its result.
+        """
+        return getattr(self, f"_run_{kind}")(params)
+
+    def _run_audio(self, params: dict):
+        from kslingo.audio.tts import Generate_Txt_Audio_mp3, Generate_Markdown_Audio_mp3, Generate_Vault_Audio_mp3
+
+        ensure_dir(params["out"])
+        cache = self.cache() if params["cache"] else None
+        engine = self.engine(params["engine"])
+        timing = get_timing_profile(params["timing"], params["end_sound"] or None)
+        clips = self.clips(engine, cache)
+        jobs = self.tts_jobs
+        query = PhraseQuery(params["level"].split(","), params["enabled_only"], params["words_only"],
+                            params["translated_only"])
+        shard = parse_shard(params["shard"]) if params["shard"] else None
+        encoding = _job_encoding(params)
+
+        if params["txt"]:
+            Generate_Txt_Audio_mp3(params["txt"], params["out"], params["learn"], params["native"],
+                                   cache, jobs, engine, None, timing, clips, encoding)
+            return {"out": params["out"]}
+        if params["markdown"]:
+            return Generate_Markdown_Audio_mp3(params["markdown"], params["out"], params["learn"], params["native"],
+                                               cache, jobs, engine, params["procs"], params["force"],
+                                               None, timing, clips, query=query, shard=shard,
+                                               encoding=encoding)
+
+        results = Generate_Vault_Audio_mp3(params["vault"], params["out"], params["learn"], params["native"],
+                                           cache, jobs, engine, params["procs"], params["force"],
+                                           None, timing, clips, query, shard, encoding)
+        failed = [result["input"] for result in results if result["status"] == "failed"]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(results)} files failed (see {params['out']}/{shard_name(SUMMARY_NAME, shard)})")
+        return {"files": len(results)}
+
+    def _run_convert(self, params: dict):
+        from kslingo.convert.file import CONVERSIONS, Convert_glob
+
+        command = params["command"]
+        jsonl_ext = ".jsonl" if params["jsonl"] else None
+        ensure_dir(params["out"])
+        if params["glob"]:
+            results = Convert_glob(command, params["glob"], params["out"],
+                                   params["learn"] or None, params["native"] or None, params["procs"], jsonl_ext)
+            failed = [result["input"] for result in results if result["status"] == "failed"]
+            if failed:
+                raise RuntimeError(f"{len(failed)} of {len(results)} files failed (see {params['out']}/batch-summary.json)")
+            return {"files": len(results)}
+
+        # same output names as the convert command
+        converter, _, out_ext, with_langs = CONVERSIONS[command]
+        output_file = os.path.join(params["out"], f"{command}{jsonl_ext or out_ext}")
+        if with_langs:
+            converter(params["input"], output_file, params["learn"], params["native"])
+        else:
+            converter(params["input"], output_file)
+        return {"output": output_file}
+
+    def _run_parse(self, params: dict):
+        from kslingo.parsers.markdown import just_only_reparse_md
+
+        ensure_dir(os.path.dirname(params["output"]))
+        just_only_reparse_md(params["input"], params["output"])
+        return {"output": params["output"]}
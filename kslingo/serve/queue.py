@@ -0,0 +1,249 @@
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from kslingo.utils.log import LOGGER_NAME, get_logger
+
+
+log = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """
+    One queued parse/convert/audio request and its outcome.
+    """
+
+    LOG_LINES = 200
+
+    def __init__(self, job_id: str, kind: str, params: dict):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.log = deque(maxlen=self.LOG_LINES)
+        self.done = threading.Event()
+
+    @property
+    def signature(self) -> str:
+        return json.dumps([self.kind, self.params], sort_keys=True, ensure_ascii=False)
+
+    @property
+    def target(self) -> str | None:
+        # jobs writing to the same place never run at the same time
+        return self.params.get("out") or self.params.get("output")
+
+    def to_dict(self, with_log: bool = False) -> dict:
+        data = {
+            "id": self.id,
+            "type": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created": round(self.created, 3),
+            "started": round(self.started, 3) if self.started else None,
+            "finished": round(self.finished, 3) if self.finished else None,
+            "seconds": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            "result": self.result,
+            "error": self.error,
+        }
+        if with_log:
+            data["log"] = list(self.log)
+        return data
+
+
+class JobQueue:
+    """
+    FIFO job queue run by a fixed number of worker threads.
+
+    - At most `workers` jobs run at a time; at most `max_queued` wait.
+    - Submitting a job identical to one that is still waiting returns the
+      waiting job instead of queueing a second build (editor save hooks
+      fire repeatedly).
+    - Jobs with the same output target run one after another.
+    - Finished jobs are kept for status queries, up to `history` of them.
+
+    `runner(kind, params)` does the work and returns a JSON-serializable result.
+    """
+
+    def __init__(self, runner, workers: int = 1, max_queued: int = 100, history: int = 200):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.history = history
+        self.jobs = OrderedDict()
+        self._pending = deque()
+        self._running = {}
+        self._targets = set()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._threads = []
+        self._log_handler = _JobLogHandler(self)
+
+    def start(self) -> None:
+        logging.getLogger(LOGGER_NAME).addHandler(self._log_handler)
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"kslingo-job-{n + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Cancels waiting jobs and waits for running ones to finish.
+        """
+        with self._cond:
+            self._stopping = True
+            while self._pending:
+                self._finish(self._pending.popleft(), CANCELLED)
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        logging.getLogger(LOGGER_NAME).removeHandler(self._log_handler)
+
+    def submit(self, kind: str, params: dict) -> tuple[Job, bool]:
+        """
+        Queues a job.
+
+        Returns:
+            tuple[Job, bool]: The job, and whether an identical waiting job was reused.
+
+        Raises:
+            QueueFull: If `max_queued` jobs are already waiting.
+        """
+        job = Job("", kind, params)
+        with self._cond:
+            for waiting in self._pending:
+                if waiting.signature == job.signature:
+                    return waiting, True
+            if self._stopping:
+                raise QueueFull("Server is shutting down")
+            if len(self._pending) >= self.max_queued:
+                raise QueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+            job.id = str(next(self._ids))
+            self.jobs[job.id] = job
+            self._pending.append(job)
+            self._trim_history()
+            self._cond.notify()
+        log.info(f"Job {job.id} queued: {kind}")
+        return job, False
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a waiting job. Running jobs can't be cancelled.
+        """
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            self._pending.remove(job)
+            self._finish(job, CANCELLED)
+        log.info(f"Job {job_id} cancelled")
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "queued": len(self._pending),
+                "running": len(self._running),
+                "jobs": counts,
+            }
+
+    def job_for_thread(self, thread_id: int) -> Job | None:
+        return self._running.get(thread_id)
+
+    def _next_job(self) -> Job | None:
+        # first waiting job whose target isn't being written by a running job
+        for job in self._pending:
+            if job.target is None or job.target not in self._targets:
+                self._pending.remove(job)
+                return job
+        return None
+
+    def _work(self) -> None:
+        thread_id = threading.get_ident()
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping and (job := self._next_job()) is None:
+                    self._cond.wait()
+                if job is None:
+                    return
+                job.status = RUNNING
+                job.started = time.time()
+                self._running[thread_id] = job
+                if job.target is not None:
+                    self._targets.add(job.target)
+
+            log.info(f"Job {job.id} started: {job.kind}")
+            try:
+                result = self.runner(job.kind, job.params)
+                status, error = DONE, None
+            except Exception as e:
+                log.debug(f"Job {job.id} failed", exc_info=True)
+                result, status, error = None, FAILED, f"{type(e).__name__}: {e}"
+
+            with self._cond:
+                del self._running[thread_id]
+                self._targets.discard(job.target)
+                job.result = result
+                self._finish(job, status, error)
+                self._cond.notify_all()
+            log.log(logging.ERROR if error else logging.INFO,
+                    f"Job {job.id} {status} in {job.finished - job.started:.2f}s" + (f": {error}" if error else ""))
+
+    def _finish(self, job: Job, status: str, error: str | None = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+        job.done.set()
+
+    def _trim_history(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+
+class _JobLogHandler(logging.Handler):
+    """
+    Copies the messages logged by a job's worker thread into the job.
+    """
+
+    def __init__(self, queue: JobQueue):
+        super().__init__(logging.DEBUG)
+        self.queue = queue
+
+    def emit(self, record):
+        job = self.queue.job_for_thread(record.thread)
+        if job is None or record.levelno < logging.INFO:
+            return
+        message = record.getMessage()
+        if record.levelno >= logging.WARNING:
+            message = f"{record.levelname}: {message}"
+        job.log.append(message)
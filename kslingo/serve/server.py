@@ -0,0 +1,219 @@
+import json
+import os
+import signal
+import socketserver
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from kslingo.version import __version__
+from kslingo.serve.jobs import Workspace, prepare_job
+from kslingo.serve.queue import FINISHED, JobQueue, QueueFull
+from kslingo.utils.profiling import profiler
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of `kslingo serve`:
+
+      GET    /health              liveness check
+      GET    /status              queue, warm state and counters
+      GET    /jobs                all known jobs
+      POST   /jobs[?wait=S]       queue a job {"type": ..., <params>}; with wait,
+                                  answer when it finished or after S seconds
+      GET    /jobs/<id>[?wait=S]  one job with its log
+      DELETE /jobs/<id>           cancel a waiting job
+    """
+
+    server_version = f"kslingo/{__version__}"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path, query = self._route()
+        if path == ["health"]:
+            self._send(200, {"status": "ok", "version": __version__})
+        elif path == ["status"]:
+            self._send(200, self.server.app.status())
+        elif path == ["jobs"]:
+            self._send(200, {"jobs": [job.to_dict() for job in list(self.server.app.queue.jobs.values())]})
+        elif len(path) == 2 and path[0] == "jobs":
+            job = self.server.app.queue.get(path[1])
+            if job is None:
+                self._send(404, {"error": f"No job '{path[1]}'"})
+                return
+            self._wait(job, query)
+            self._send(200, job.to_dict(with_log=True))
+        else:
+            self._send(404, {"error": f"Unknown endpoint '{self.path}'"})
+
+    def do_POST(self):
+        path, query = self._route()
+        if path != ["jobs"]:
+            self._send(404, {"error": f"Unknown endpoint '{self.path}'"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                raise ValueError(f"Request body is larger than {MAX_BODY_BYTES} bytes")
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            params = dict(body)
+            kind = params.pop("type", None)
+            params = prepare_job(kind, params)
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        try:
+            job, coalesced = self.server.app.queue.submit(kind, params)
+        except QueueFull as e:
+            self._send(503, {"error": str(e)})
+            return
+
+        self._wait(job, query)
+        data = job.to_dict(with_log=job.status in FINISHED)
+        data["coalesced"] = coalesced
+        self._send(200 if job.status in FINISHED else 202, data)
+
+    def do_DELETE(self):
+        path, _ = self._route()
+        if len(path) != 2 or path[0] != "jobs":
+            self._send(404, {"error": f"Unknown endpoint '{self.path}'"})
+            return
+        job = self.server.app.queue.get(path[1])
+        if job is None:
+            self._send(404, {"error": f"No job '{path[1]}'"})
+        elif self.server.app.queue.cancel(job.id):
+            self._send(200, job.to_dict())
+        else:
+            self._send(409, {"error": f"Job {job.id} is {job.status} and can't be cancelled"})
+
+    def _route(self) -> tuple[list[str], dict]:
+        url = urlsplit(self.path)
+        path = [part for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        return path, query
+
+    def _wait(self, job, query: dict) -> None:
+        if "wait" in query:
+            try:
+                timeout = float(query["wait"] or "inf")
+            except ValueError:
+                timeout = 0
+            job.done.wait(None if timeout == float("inf") else max(0.0, timeout))
+
+    def _send(self, status: int, data: dict) -> None:
+        body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8") + b"\n"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # client_address is empty on a Unix socket
+        log.debug(f"{self.command} {self.path} - {format % args}")
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+class App:
+    """
+    A running `kslingo serve` instance: the warm workspace and the job queue.
+    """
+
+    def __init__(self, workers: int = 1, max_queued: int = 100, cache_dir: str | None = None,
+                 tts_jobs: int = 1, preload: bool = True):
+        self.started = time.time()
+        self.workspace = Workspace(cache_dir, tts_jobs, preload)
+        self.queue = JobQueue(self.workspace.run, workers, max_queued)
+
+    def status(self) -> dict:
+        return {
+            "version": __version__,
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started, 1),
+            "queue": self.queue.stats(),
+            "warm": self.workspace.stats(),
+            "counters": dict(profiler.counters),
+        }
+
+
+def create_server(app: App, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: str | None = None):
+    """
+    Creates the HTTP server of `app`, on a TCP port or on a Unix socket
+    (only accessible to the current user).
+
+    Raises:
+        FileExistsError: If socket_path exists and isn't a socket.
+    """
+    if socket_path:
+        _remove_stale_socket(socket_path)
+        # created 0600 from the start, not chmod'ed after it is reachable
+        old_umask = os.umask(0o177)
+        try:
+            server = _UnixHTTPServer(socket_path, ApiHandler)
+        finally:
+            os.umask(old_umask)
+    else:
+        server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.app = app
+    return server
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    # A socket left by an earlier run is replaced; anything else is kept
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"'{socket_path}' exists and isn't a socket")
+    os.remove(socket_path)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: str | None = None,
+          workers: int = 1, max_queued: int = 100, cache_dir: str | None = None, tts_jobs: int = 1) -> None:
+    """
+    Runs `kslingo serve` until SIGINT/SIGTERM. Waiting jobs are cancelled on
+    shutdown; running jobs are finished first.
+    """
+    app = App(workers, max_queued, cache_dir, tts_jobs)
+    server = create_server(app, host, port, socket_path)
+    app.queue.start()
+
+    address = socket_path or f"http://{host}:{server.server_address[1]}"
+    log.info(f"Serving on {address} ({app.queue.workers} workers, up to {max_queued} queued jobs)")
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever(), so it can't run in this thread
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.info("Shutting down")
+        server.server_close()
+        app.queue.stop()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,140 @@
+import glob
+import hashlib
+import json
+import os
+from kslingo.utils.fs import ensure_dir
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+SUMMARY_NAME = "batch-summary.json"
+
+
+def find_files(root: str, ext: str, exclude: list[str] | None = None) -> list[str]:
+    """
+    Recursively finds files with the given extension under a directory.
+
+    Hidden directories (e.g. .obsidian, .git) and the `exclude` directories
+    (e.g. the output directory, when it lives inside the vault) are skipped.
+
+    Returns:
+        list[str]: Sorted file paths.
+    """
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Directory '{root}' doesn't exist!")
+
+    excluded = {os.path.abspath(path) for path in exclude or []}
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames
+                       if not d.startswith(".") and os.path.abspath(os.path.join(dirpath, d)) not in excluded]
+        for name in filenames:
+            if name.lower().endswith(ext.lower()) and not name.startswith("."):
+                found.append(os.path.join(dirpath, name))
+    return sorted(found)
+
+
+def expand_glob(pattern: str) -> list[str]:
+    """
+    Returns the files matching a glob pattern ('**' matches subdirectories), sorted.
+    Batch summaries of earlier runs are skipped.
+    """
+    return sorted(path for path in glob.glob(pattern, recursive=True)
+                  if os.path.isfile(path) and not _is_batch_summary(os.path.basename(path)))
+
+
+def _is_batch_summary(name: str) -> bool:
+    stem, ext = os.path.splitext(SUMMARY_NAME)
+    return name == SUMMARY_NAME or name.startswith(f"{stem}-") and name.endswith(ext)
+
+
+def output_path(input_file: str, root: str, out_dir: str, ext: str = "") -> str:
+    """
+    Mirrors an input file's path relative to `root` under `out_dir`,
+    replacing its extension with `ext` ('' drops it, e.g. for an output directory).
+    """
+    relative = os.path.splitext(os.path.relpath(input_file, root))[0]
+    return os.path.join(out_dir, relative + ext)
+
+
+def common_root(files: list[str]) -> str:
+    """
+    Returns the deepest directory containing all files.
+    """
+    if not files:
+        return "."
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """
+    Parses a shard spec "K/N" (shard K of N, 1 <= K <= N).
+
+    Raises:
+        ValueError: If the spec is malformed.
+    """
+    k, sep, n = text.partition("/")
+    try:
+        k, n = int(k), int(n)
+    except ValueError:
+        k = n = 0
+    if not sep or not 1 <= k <= n:
+        raise ValueError(f"Invalid shard '{text}', expected K/N with 1 <= K <= N (e.g. 2/4)")
+    return k, n
+
+
+def in_shard(key: str, shard: tuple[int, int] | None) -> bool:
+    """
+    Tells whether the work item `key` (e.g. a section title) belongs to
+    shard (K, N). The assignment only depends on the key, so every machine
+    building the same input with the same N splits it the same way.
+    """
+    if shard is None:
+        return True
+    k, n = shard
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % n == k - 1
+
+
+def shard_name(name: str, shard: tuple[int, int] | None) -> str:
+    """
+    Returns the per-shard name of a bookkeeping file, so shards can share
+    an output directory (e.g. batch-summary.json -> batch-summary-2of4.json).
+    """
+    if shard is None:
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}-{shard[0]}of{shard[1]}{ext}"
+
+
+def write_batch_summary(results: list[dict], out_dir: str, name: str = SUMMARY_NAME) -> str:
+    """
+    Logs a per-file result table and writes it to <out_dir>/<name>
+    (batch-summary.json by default).
+
+    Every result has at least "input", "status" ("ok", "empty" or "failed")
+    and "seconds"; failed ones also have "error".
+
+    Returns:
+        str: Path of the summary file.
+    """
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        line = f"{result['status'].upper():<6} {result['input']} ({result['seconds']:.2f}s)"
+        if result["status"] == "failed":
+            log.error(f"{line}: {result['error']}")
+        else:
+            log.info(line)
+
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    log.info(f"Batch: {len(results)} files" + (f" ({summary})" if summary else ""))
+
+    ensure_dir(out_dir)
+    path = os.path.join(out_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"files": len(results), "counts": counts, "results": results}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    log.info(f"Batch summary saved to {path}")
+    return path
@@ -2,6 +2,10 @@ import os
 import sys
 import shutil
 import tempfile
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
 
 
 def validate_file(input_file: str, ext: str):
@@ -56,7 +60,7 @@ def remove_dir_if_exists(path: str):
     """
     if os.path.exists(path):
         shutil.rmtree(path)
-        print(f"Removed directory : {path}")
+        log.info(f"Removed directory : {path}")
         
         
 def create_temp_dir(prefix="kslingo_") -> str:
@@ -64,4 +68,17 @@ def create_temp_dir(prefix="kslingo_") -> str:
     Creates a unique temporary directory and returns its path.
     Default location is system temp (e.g., /tmp/...).
     """
-    return tempfile.mkdtemp(prefix=prefix)
\ No newline at end of file
+    return tempfile.mkdtemp(prefix=prefix)
+
+def get_cache_dir(name: str = "clips") -> str:
+    """
+    Returns the kslingo cache directory for the given cache name.
+
+    Honors KSLINGO_CACHE_DIR, then XDG_CACHE_HOME, and falls back to
+    ~/.cache/kslingo/<name>.
+    """
+    base = os.environ.get("KSLINGO_CACHE_DIR")
+    if base:
+        return os.path.join(base, name)
+    xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(xdg, "kslingo", name)
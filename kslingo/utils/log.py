@@ -0,0 +1,166 @@
+import json
+import logging
+import sys
+import time
+
+
+LOGGER_NAME = "kslingo"
+
+# verbosity (-q/-v count) -> level
+LEVELS = {-2: logging.ERROR, -1: logging.WARNING, 0: logging.INFO, 1: logging.DEBUG}
+
+_config = {"verbosity": 0, "json_lines": False}
+
+
+class PlainFormatter(logging.Formatter):
+    """
+    Human readable output: the bare message, prefixed with the level for
+    warnings and errors ("WARNING: ...").
+    """
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.levelno >= logging.WARNING:
+            message = f"{record.levelname}: {message}"
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record: ts, level, logger, msg, plus the fields passed
+    in `extra={"data": {...}}` (e.g. progress events).
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "data", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(verbosity: int = 0, json_lines: bool = False, stream=None) -> None:
+    """
+    Configures the 'kslingo' logger for the CLI.
+
+    Args:
+        verbosity (int): -2 errors only, -1 warnings, 0 info (default), 1+ debug.
+        json_lines (bool): Emit machine-readable JSON lines instead of plain text.
+        stream: Output stream (default: stdout).
+    """
+    _config.update(verbosity=verbosity, json_lines=json_lines)
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonLinesFormatter() if json_lines else PlainFormatter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers[:] = [handler]
+    logger.setLevel(LEVELS[max(-2, min(1, verbosity))])
+    logger.propagate = False
+
+
+def logging_config() -> dict:
+    """
+    Returns the arguments of the last setup_logging() call (for worker processes).
+    """
+    return dict(_config)
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+class Progress:
+    """
+    Rate-limited progress reporting with throughput and ETA.
+
+    update() is cheap and can be called for every item; output is produced at
+    most once per `interval` seconds:
+      - plain mode on a terminal: a single redrawn bar on stderr,
+      - plain mode otherwise: an info log line,
+      - JSON-lines mode: an info record with a "progress" event.
+    Nothing is shown when info messages are disabled (-q).
+    """
+
+    BAR_WIDTH = 30
+
+    def __init__(self, total: int | None = None, unit: str = "phrases", label: str = "",
+                 interval: float = 0.5, logger: logging.Logger | None = None):
+        self.total = total
+        self.unit = unit
+        self.label = label
+        self.done = 0
+        self.logger = logger or logging.getLogger(LOGGER_NAME)
+        self.start = time.perf_counter()
+        self._last = self.start
+        self._enabled = self.logger.isEnabledFor(logging.INFO)
+        self._bar = self._enabled and not _config["json_lines"] and sys.stderr.isatty()
+        # a log line every `interval` would flood files, so non-tty output is sparser
+        self.interval = interval if self._bar else max(interval, 5.0)
+
+    def update(self, n: int = 1) -> None:
+        self.done += n
+        if not self._enabled:
+            return
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._report(now)
+
+    def close(self) -> None:
+        if not self._enabled or not self.done:
+            return
+        self._report(time.perf_counter(), final=True)
+        if self._bar:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _report(self, now: float, final: bool = False) -> None:
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if self.total and rate else None
+
+        counter = f"{self.done}/{self.total}" if self.total else f"{self.done}"
+        text = f"{self.label}{counter} {self.unit}, {rate:.1f} {self.unit}/s"
+        if eta is not None and not final:
+            text += f", ETA {_format_seconds(eta)}"
+
+        if self._bar:
+            if self.total:
+                filled = int(self.BAR_WIDTH * min(1.0, self.done / self.total))
+                text = f"[{'#' * filled}{'.' * (self.BAR_WIDTH - filled)}] {text}"
+            sys.stderr.write(f"\r{text}\033[K")
+            sys.stderr.flush()
+            return
+
+        data = {
+            "event": "progress",
+            "label": self.label.strip(" :"),
+            "done": self.done,
+            "total": self.total,
+            "unit": self.unit,
+            "rate": round(rate, 2),
+            "eta_s": round(eta, 1) if eta is not None else None,
+            "final": final,
+        }
+        self.logger.info(text, extra={"data": data})
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
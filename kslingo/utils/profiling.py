@@ -0,0 +1,193 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+
+_NULL_SPAN = nullcontext()
+
+
+class Profiler:
+    """
+    Lightweight instrumentation: timed spans, counters and optional cProfile
+    dumps per stage.
+
+    Counters are always kept (they are cheap and printed in run summaries).
+    Spans are only recorded after enable(); until then span() and stage()
+    return a shared no-op context manager.
+
+    Spans are stored as Chrome trace events ("X" complete events, timestamps
+    in microseconds), which chrome://tracing, Perfetto and speedscope open directly.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.counters = {}
+        self.cprofile_dir = None
+        self._profiles = {}
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def enable(self, cprofile_dir: str | None = None) -> None:
+        """
+        Starts recording spans. With cprofile_dir, every stage() is also
+        profiled with cProfile and dumped to <cprofile_dir>/<stage>.prof.
+        """
+        self.enabled = True
+        self.cprofile_dir = cprofile_dir
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def span(self, name: str, **args):
+        """
+        Returns a context manager that records `name` as a span with `args`.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def stage(self, name: str, **args):
+        """
+        Like span(), and with cProfile enabled also profiles the stage.
+        Nested stages are exclusive: the outer stage profile pauses while an
+        inner one runs, so each .prof file only holds its own stage.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args, self.cprofile_dir is not None)
+
+    def _push_profile(self, name: str) -> None:
+        if self._stack:
+            self._stack[-1].disable()
+        profile = self._profiles.setdefault(name, cProfile.Profile())
+        self._stack.append(profile)
+        profile.enable()
+
+    def _pop_profile(self) -> None:
+        self._stack.pop().disable()
+        if self._stack:
+            self._stack[-1].enable()
+
+    def _record(self, name: str, start_ns: int, end_ns: int, args: dict) -> None:
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def drain(self) -> dict:
+        """
+        Returns and clears recorded events and counters
+        (used to send a worker process's data back to the parent).
+        """
+        with self._lock:
+            data = {"events": self.events, "counters": self.counters}
+            self.events = []
+            self.counters = {}
+        return data
+
+    def merge(self, data: dict) -> None:
+        """
+        Adds events and counters returned by drain() in another process.
+        """
+        with self._lock:
+            self.events.extend(data.get("events", []))
+        for name, n in data.get("counters", {}).items():
+            self.count(name, n)
+
+    def totals(self) -> dict:
+        """
+        Returns total seconds and number of calls per span name.
+        """
+        totals = {}
+        for event in self.events:
+            seconds, calls = totals.get(event["name"], (0.0, 0))
+            totals[event["name"]] = (seconds + event["dur"] / 1e6, calls + 1)
+        return totals
+
+    def write_trace(self, path: str) -> None:
+        """
+        Writes spans and final counter values as a Chrome trace JSON file,
+        and the cProfile stats of every stage if enabled.
+        """
+        events = list(self.events)
+        end = max((e["ts"] + e["dur"] for e in events), default=time.perf_counter_ns() / 1000)
+        for name, value in sorted(self.counters.items()):
+            events.append({"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "args": {"value": value}})
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"counters": self.counters}}, f, ensure_ascii=False)
+
+        if self.cprofile_dir:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            for name, profile in self._profiles.items():
+                profile.dump_stats(os.path.join(self.cprofile_dir, f"{name}.prof"))
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "cprofile", "start")
+
+    def __init__(self, profiler: Profiler, name: str, args: dict, cprofile: bool = False):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.cprofile = cprofile
+
+    def __enter__(self):
+        if self.cprofile:
+            self.profiler._push_profile(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if self.cprofile:
+            self.profiler._pop_profile()
+        self.profiler._record(self.name, self.start, end, self.args)
+        return False
+
+
+# Process-wide profiler used by the whole package
+profiler = Profiler()
+
+
+def span(name: str, **args):
+    return profiler.span(name, **args)
+
+
+def stage(name: str, **args):
+    return profiler.stage(name, **args)
+
+
+def count(name: str, n: int = 1) -> None:
+    profiler.count(name, n)
+
+
+def traced(name: str, is_stage: bool = False):
+    """
+    Decorator recording every call of the function as a span (or stage) `name`.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with (profiler.stage(name) if is_stage else profiler.span(name)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
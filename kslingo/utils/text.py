@@ -1,6 +1,17 @@
 import re
 
 
+# Precompiled patterns, shared by the helpers below and the markdown line tokenizer.
+#   SEPARATOR_CHARS: separator-like characters (en dash, em dash, minus, equals)
+#   FREE_HYPHEN_RE:  a hyphen that is not part of a word (no word character on either side)
+SEPARATOR_CHARS = "–—−="
+FREE_HYPHEN_RE = re.compile(r"-(?<!\w-)(?!\w)")
+MULTISPACE_RE = re.compile(r"\s{2,}")
+BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+ITALIC_RE = re.compile(r"\*(.*?)\*")
+LEADING_DASH_RE = re.compile(r"^\s*-\s*")
+
+
 def normalize_separator(text: str) -> str:
     """
     Normalizes phrase separators (en dash, em dash, minus, equals)
@@ -11,18 +22,19 @@ def normalize_separator(text: str) -> str:
     """
     text = text.strip()
 
-    # Step 1: Replace separator-like characters with placeholder
-    text = re.sub(r"[–—−=]", " <SEP> ", text)
+    # Step 1: Replace separator-like characters with ' - '
+    for char in SEPARATOR_CHARS:
+        if char in text:
+            text = text.replace(char, " - ")
 
     # Step 2: Replace remaining hyphens that are not part of a word (i.e., not between letters)
-    # i.e., space-hyphen-space or similar
-    text = re.sub(r"(?<!\w)-{1}(?!\w)", " <SEP> ", text)
-
-    # Step 3: Normalize placeholder to standard ' - '
-    text = re.sub(r"\s*<SEP>\s*", " - ", text)
+    if "-" in text:
+        text = FREE_HYPHEN_RE.sub(" - ", text)
 
-    # Step 4: Normalize multiple spaces
-    text = re.sub(r"\s{2,}", " ", text)
+    # Step 3: Normalize whitespace around separators and multiple spaces.
+    # Only single plain spaces are printable whitespace, so most lines skip the regex.
+    if "  " in text or not text.isprintable():
+        text = MULTISPACE_RE.sub(" ", text)
 
     return text.strip()
 
@@ -108,7 +120,7 @@ def remove_markdown_bold(text: str) -> str:
     Returns:
         str: Cleaned string without ** markers.
     """
-    return re.sub(r"\*\*(.*?)\*\*", r"\1", text)
+    return BOLD_RE.sub(r"\1", text)
 
 
 def remove_markdown_italic(text: str) -> str:
@@ -121,7 +133,7 @@ def remove_markdown_italic(text: str) -> str:
     Returns:
         str: Cleaned string without * markers.
     """
-    return re.sub(r"\*(.*?)\*", r"\1", text)
+    return ITALIC_RE.sub(r"\1", text)
 
 def remove_leading_dash(text: str) -> str:
     """
@@ -133,7 +145,7 @@ def remove_leading_dash(text: str) -> str:
     Returns:
         str: String without the leading dash.
     """
-    return re.sub(r"^\s*-\s*", "", text)
+    return LEADING_DASH_RE.sub("", text)
 
 
 def ensure_dash_prefix(text: str) -> str:
@@ -0,0 +1,154 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from kslingo.utils.log import get_logger
+
+
+log = get_logger(__name__)
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.5
+
+# <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+
+# editors save in place (modify, close) or write a temp file and rename it over the original
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT = struct.Struct("iIII")   # wd, mask, cookie, name length
+
+
+class FileWatcher:
+    """
+    Waits for changes of one file, with inotify on Linux and stat() polling
+    elsewhere (or with poll=True, e.g. for network drives where inotify
+    doesn't see remote changes).
+
+    The parent directory is watched, so saves that replace the file
+    (write to a temp file, then rename) are seen too. wait() returns once
+    the file changed and then stayed quiet for `debounce` seconds, so a
+    burst of saves causes one rebuild.
+
+    Usage:
+        with FileWatcher(path) as watcher:
+            while True:
+                watcher.wait()
+                rebuild()
+    """
+
+    def __init__(self, path: str, debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, poll: bool = False):
+        self.path = os.path.abspath(path)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._signature = self._stat()
+        if not poll:
+            self._fd = _inotify_watch(os.path.dirname(self.path))
+        self.mode = "inotify" if self._fd is not None else "poll"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self) -> None:
+        """
+        Blocks until the file changed and has been quiet for `debounce` seconds.
+        """
+        while True:
+            if self._fd is not None:
+                self._wait_inotify()
+            else:
+                self._wait_poll()
+
+            # a save that is still being renamed into place, or a touch
+            # without a change, doesn't count
+            signature = self._stat()
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                return
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _wait_inotify(self) -> None:
+        name = os.fsencode(os.path.basename(self.path))
+        timeout = None
+        while True:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+            if not ready:
+                return   # quiet for `debounce` seconds after the last event
+            if self._read_events(name):
+                timeout = self.debounce
+
+    def _read_events(self, name: bytes) -> bool:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        changed = False
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            event_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW or (mask & WATCH_MASK and event_name == name):
+                changed = True
+        return changed
+
+    def _wait_poll(self) -> None:
+        last = self._signature
+        changed_at = None
+        while True:
+            time.sleep(self.poll_interval if changed_at is None else min(self.poll_interval, self.debounce))
+            signature = self._stat()
+            now = time.monotonic()
+            if signature != last:
+                last = signature
+                changed_at = now
+            elif changed_at is not None and now - changed_at >= self.debounce:
+                return
+
+
+def _inotify_watch(directory: str) -> int | None:
+    # Returns a non-blocking inotify descriptor watching `directory`,
+    # or None when inotify isn't available
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError) as e:
+        log.debug(f"inotify unavailable ({e}), polling")
+        return None
+    if fd < 0:
+        log.debug(f"inotify_init1 failed ({os.strerror(ctypes.get_errno())}), polling")
+        return None
+
+    if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        log.debug(f"inotify_add_watch failed ({os.strerror(ctypes.get_errno())}), polling")
+        os.close(fd)
+        return None
+    return fd